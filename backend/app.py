@@ -2,18 +2,51 @@
 
 import os
 import re
-import math
+import time
+import asyncio
+import queue
+import functools
+import hmac
 import logging
-from collections import OrderedDict
+import threading
+from collections import Counter, OrderedDict
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from flask_caching import Cache
 from dotenv import load_dotenv
 
 import openai
+import numpy as np
 import pandas as pd
-import pandasql as psql
+
+from utils.cache import get_cache_config, completion_cache_key
+from utils.concurrency import TokenBucket, call_with_backoff, iter_in_parallel
+from utils.async_openai import AsyncOpenAIClient
+from utils.token_usage import TokenUsage
+from utils.query_engine import QueryEngine, namespaced_path, prune_database_files
+from utils.pipeline import Pipeline, StageFailed
+from utils.trait_cache import TraitCache
+from utils.search_cache import search_cache_key
+from utils.pagination import (
+    decode_page_token, paginate_sql, count_sql, page_info, quote_columns, strip_sql_terminator
+)
+from utils.ranking import has_order_by, verdict_score, school_rating_score, price_fit_score, top_k_order
+from utils.semantic_cache import SemanticQueryCache
+from utils.query_parser import parse_structured_query
+from utils.trait_rules import parse_trait_rule, evaluate_trait_rule
+from utils.feature_index import FeatureIndex, parse_feature_trait
+from utils.data_manager import DataManager
+from utils.trait_prompt import (
+    COMPACT_TRAIT_INSTRUCTIONS, COMPACT_TRAIT_BATCH_INSTRUCTIONS,
+    compact_prompt_context, format_compact_details, nearby_city_index
+)
+from utils.data_utils import (
+    compute_data_version, diff_by_id, load_zillow_data as parse_zillow_csv, schema_version, ZILLOW_SCHEMA
+)
+from utils.snapshot import read_snapshot, write_snapshot
+from utils.serialization import FastJSONProvider, frame_to_records
+from utils.compression import COMPRESSIBLE_MIMETYPES, choose_encoding, compress_body
 
 # Load environment variables from .env file
 load_dotenv()
@@ -22,9 +55,11 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Configure Flask-Caching
-app.config['CACHE_TYPE'] = 'SimpleCache'  # Simple in-memory cache
-app.config['CACHE_DEFAULT_TIMEOUT'] = 300  # Cache timeout in seconds
+# Serialize JSON responses with orjson when it is installed (see utils/serialization.py)
+app.json = FastJSONProvider(app)
+
+# Configure Flask-Caching (shared SQLite file cache by default, see utils/cache.py)
+app.config.update(get_cache_config())
 cache = Cache(app)
 
 # Initialize logging
@@ -38,48 +73,85 @@ if not OPENAI_API_KEY:
     exit(1)
 openai.api_key = OPENAI_API_KEY
 
+# OpenAI concurrency and rate-limit settings
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+openai_rate_limiter = TokenBucket(OPENAI_REQUESTS_PER_MINUTE, capacity=OPENAI_MAX_CONCURRENCY)
+
+# Tokens reported by OpenAI per call type, served by /api/cache_stats
+token_usage = TokenUsage()
+
+# Seconds a deterministic (temperature 0) completion stays in the shared cache
+OPENAI_CACHE_TIMEOUT = int(os.getenv("OPENAI_CACHE_TIMEOUT", "604800"))
+
+# Helper function to call the OpenAI chat API under the shared rate limit
+def create_chat_completion(**kwargs):
+    """
+    Calls openai.ChatCompletion.create after taking a token from the shared rate limiter,
+    retrying with exponential backoff on rate-limit (429) and transient server errors.
+    Deterministic completions are served from and stored in the shared cache.
+    The optional usage_label names the call type under which its token usage is recorded.
+    """
+    usage_label = kwargs.pop('usage_label', 'other')
+    cacheable = kwargs.get('temperature') == 0.0
+    if cacheable:
+        cache_key = completion_cache_key(**kwargs)
+        cached_response = cache.get(cache_key)
+        if cached_response is not None:
+            return cached_response
+
+    def _create():
+        openai_rate_limiter.acquire()
+        return openai.ChatCompletion.create(**kwargs)
+
+    response = call_with_backoff(
+        _create,
+        retry_on=(openai.error.RateLimitError, openai.error.ServiceUnavailableError, openai.error.Timeout),
+        max_retries=OPENAI_MAX_RETRIES
+    )
+    token_usage.record(usage_label, response)
+    if cacheable:
+        if hasattr(response, 'to_dict_recursive'):
+            response = response.to_dict_recursive()
+        cache.set(cache_key, response, timeout=OPENAI_CACHE_TIMEOUT)
+    return response
+
+# Async OpenAI client sharing the rate limit and completion cache with create_chat_completion
+async_openai = AsyncOpenAIClient(
+    openai_rate_limiter,
+    max_concurrency=OPENAI_MAX_CONCURRENCY,
+    max_retries=OPENAI_MAX_RETRIES,
+    cache=cache,
+    cache_timeout=OPENAI_CACHE_TIMEOUT,
+    token_usage=token_usage
+)
+
+# Binary snapshot of the preprocessed Zillow data (see build_snapshot.py); rebuilt by the first
+# process that finds it missing or stale unless ZILLOW_SNAPSHOT_AUTOBUILD is disabled
+ZILLOW_SNAPSHOT_PATH = os.getenv("ZILLOW_SNAPSHOT_PATH", "data/snapshots/Zillow_Data.snapshot")
+ZILLOW_SNAPSHOT_AUTOBUILD = os.getenv("ZILLOW_SNAPSHOT_AUTOBUILD", "true").lower() in ("1", "true", "yes")
+ZILLOW_SCHEMA_VERSION = schema_version(ZILLOW_SCHEMA)
+
 # Load and preprocess Zillow data
 def load_zillow_data(file_path='data/Zillow_Data.csv') -> pd.DataFrame:
     try:
         if not os.path.exists(file_path):
             logger.error(f"Zillow data CSV file not found at path: {file_path}")
             return pd.DataFrame()
-        df = pd.read_csv(file_path)
-        df.columns = df.columns.str.strip().str.lower()
-
-        # Drop 'crawl_url_result' if present
-        if 'crawl_url_result' in df.columns:
-            df = df.drop(columns=['crawl_url_result'])
-
-        # Convert 'price' to numeric
-        if 'price' in df.columns:
-            df['price'] = pd.to_numeric(df['price'].astype(str).str.replace(',', ''), errors='coerce')
-        else:
-            logger.warning("'price' column not found in Zillow data.")
-
-        # Convert 'beds' and 'baths' to numeric
-        for col in ['beds', 'baths']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            else:
-                logger.warning(f"'{col}' column not found in Zillow data.")
-
-        # Standardize 'city' and 'state'
-        for col in ['city', 'state']:
-            if col in df.columns:
-                if col == 'city':
-                    df[col] = df[col].str.title()
-                elif col == 'state':
-                    df[col] = df[col].str.upper()
-            else:
-                logger.warning(f"'{col}' column not found in Zillow data.")
-
-        # Ensure 'zip_code' is string
-        if 'zip_code' in df.columns:
-            df['zip_code'] = df['zip_code'].astype(str)
-        else:
-            logger.warning("'zip_code' column not found in Zillow data.")
 
+        # Reuse the preprocessed snapshot when it was built from this exact CSV
+        df = read_snapshot(ZILLOW_SNAPSHOT_PATH, file_path, schema=ZILLOW_SCHEMA_VERSION)
+        if df is not None:
+            logger.info(f"Loaded {len(df)} listings from snapshot {ZILLOW_SNAPSHOT_PATH}.")
+            return df
+
+        df = parse_zillow_csv(file_path)
+        if ZILLOW_SNAPSHOT_AUTOBUILD:
+            try:
+                write_snapshot(df, ZILLOW_SNAPSHOT_PATH, file_path, schema=ZILLOW_SCHEMA_VERSION)
+            except Exception as e:
+                logger.warning(f"Could not write Zillow data snapshot: {e}")
         return df
     except Exception as e:
         logger.error(f"Error loading Zillow data: {e}")
@@ -111,36 +183,214 @@ def load_broker_data(file_path='data/broker_data.csv') -> pd.DataFrame:
         logger.error(f"Error loading Broker data: {e}")
         return pd.DataFrame()
 
-# Load data at startup
-zillow_data = load_zillow_data()
-broker_data = load_broker_data()
-
 # Extract unique cities
 def get_unique_cities(df: pd.DataFrame) -> list:
     if 'city' in df.columns:
         return sorted(df['city'].dropna().unique())
     return []
 
-unique_cities = get_unique_cities(zillow_data)
-logger.info(f"Loaded {len(unique_cities)} unique cities from Zillow data.")
+# Data files watched for changes, and how often (in seconds) to check them; 0 disables the watcher
+ZILLOW_DATA_PATH = os.getenv("ZILLOW_DATA_PATH", "data/Zillow_Data.csv")
+BROKER_DATA_PATH = os.getenv("BROKER_DATA_PATH", "data/broker_data.csv")
+DATA_RELOAD_INTERVAL = float(os.getenv("DATA_RELOAD_INTERVAL", "60"))
+
+# SQLite file holding the listings table, shared by the worker processes serving the same data
+# file ('' keeps a private in-memory copy per process); /dev/shm keeps it in RAM. The file name
+# gets a hash of the data file's path and the data version, so other instances on the host and
+# other data versions use files of their own.
+QUERY_ENGINE_PATH = os.getenv(
+    "QUERY_ENGINE_PATH",
+    os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else 'cache', 'real_estate_listings.sqlite3')
+)
+
+# Seconds the file of a superseded data version is kept for workers that have not reloaded yet
+QUERY_ENGINE_FILE_RETENTION = float(os.getenv("QUERY_ENGINE_FILE_RETENTION", str(max(600, 10 * DATA_RELOAD_INTERVAL))))
+
+# Helper function to create the persistent SQL engine of one data version
+def new_query_engine(data_version: str) -> QueryEngine:
+    """
+    Each data version gets a database of its own, kept in the data state, so building the next
+    version never touches the one being queried and the state swap switches to it.
+    """
+    path = namespaced_path(QUERY_ENGINE_PATH, os.path.abspath(ZILLOW_DATA_PATH), version=data_version)
+    return QueryEngine(table_name='zillow_data', path=path)
 
-# Define allowed cities for trait matching
-ALLOWED_CITIES = unique_cities  # Reuse the unique cities from Zillow data
+# Token required by /api/admin/reload; without one the endpoint only accepts local requests
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
-# Helper function to sanitize data
-def sanitize_data(obj):
+# Apply listing feed updates as a diff by id (inserts, updates, deletes) when at most this share
+# of the listings changed, instead of rebuilding the SQL table and feature index from scratch
+DELTA_INGESTION_ENABLED = os.getenv("DELTA_INGESTION_ENABLED", "true").lower() in ("1", "true", "yes")
+DELTA_MAX_CHANGED_FRACTION = float(os.getenv("DELTA_MAX_CHANGED_FRACTION", "0.3"))
+
+# Helper function to update the SQL table and feature index with only the changed listings
+def apply_listings_delta(previous: dict, query_engine: QueryEngine, zillow_data: pd.DataFrame, data_version: str):
     """
-    Recursively replace NaN values with None and remove 'crawl_url_result' from dictionaries.
+    Diff the new listings against the current ones by 'id' and apply the difference, building
+    the new version's query engine from a copy of the previous one.
+
+    Trait verdicts need no explicit invalidation: their cache keys include a hash of the
+    listing, so changed listings are re-evaluated and unchanged ones keep their verdicts.
+
+    Returns:
+    - FeatureIndex: The updated feature index, or None if the delta could not be applied
+      and the caller should rebuild everything.
     """
-    if isinstance(obj, list):
-        return [sanitize_data(item) for item in obj]
-    elif isinstance(obj, dict):
-        obj.pop('crawl_url_result', None)
-        return {k: sanitize_data(v) for k, v in obj.items()}
-    elif isinstance(obj, float) and math.isnan(obj):
+    delta = diff_by_id(previous['zillow_data'], zillow_data, id_column='id')
+    if delta is None:
+        logger.info("Listings cannot be diffed by id; rebuilding.")
         return None
-    else:
-        return obj
+    changed = len(delta['upserts']) + len(delta['deleted'])
+    if changed > DELTA_MAX_CHANGED_FRACTION * max(len(zillow_data), 1):
+        logger.info(f"{changed} of {len(zillow_data)} listings changed; rebuilding.")
+        return None
+
+    applied = query_engine.apply_delta(delta['upserts'], delta['deleted'], id_column='id', version=data_version,
+                                       base_version=previous['data_version'], base=previous['query_engine'])
+    if not applied:
+        logger.info("Previous query engine is not at the previous data version; rebuilding.")
+        return None
+    logger.info(f"Listings delta: {len(delta['inserted'])} inserted, {len(delta['updated'])} updated, "
+                f"{len(delta['deleted'])} deleted, {len(zillow_data) - len(delta['upserts'])} unchanged.")
+    return previous['feature_index'].apply_delta(delta['upserts'], delta['deleted'])
+
+# Broker columns returned by /api/get_broker_details, with their display names
+BROKER_DISPLAY_COLUMNS = {
+    'broker': 'Broker Name',
+    'city': 'City',
+    'state': 'State',
+    'zip_code': 'Zip Code',
+    'reviews': 'Reviews',
+    'recent_homes_sold': 'Recent Homes Sold',
+    'negotiations_done': 'Negotiations Done',
+    'years_of_experience': 'Years of Experience',
+    'rating': 'Rating'
+}
+
+# Helper function to render the /api/get_broker_details response of every zip code
+def build_broker_index(broker_data: pd.DataFrame) -> dict:
+    """
+    Group the brokers by zip code and serialize each group's response body once, so that a
+    request is a dictionary lookup.
+
+    Returns:
+    - dict: Zip code to the JSON body (bytes) of its broker list.
+    """
+    if 'zip_code' not in broker_data.columns:
+        return {}
+    columns = [col for col in BROKER_DISPLAY_COLUMNS if col in broker_data.columns]
+    missing = set(BROKER_DISPLAY_COLUMNS) - set(columns)
+    if missing:
+        logger.warning(f"Broker data is missing columns: {sorted(missing)}")
+    display_brokers = broker_data[columns].rename(columns=BROKER_DISPLAY_COLUMNS)
+
+    broker_index = {}
+    for zip_code, brokers in display_brokers.groupby(broker_data['zip_code'], sort=False):
+        broker_index[zip_code] = app.json.response({'brokers': frame_to_records(brokers)}).get_data()
+    logger.info(f"Built broker index over {len(broker_data)} brokers in {len(broker_index)} zip codes.")
+    return broker_index
+
+# Helper function to load the data files and build everything derived from them
+def build_data_state(previous: dict = None) -> dict:
+    """
+    Load the Zillow and broker data and build the listings table, feature index, city list and
+    data version from them. When a previous state is given, only the listings that changed
+    are applied to copies of its table and index. The previous state is left untouched, so
+    requests keep reading it until the new state is swapped in.
+
+    Returns:
+    - dict: The new data state.
+    """
+    zillow_data = load_zillow_data(ZILLOW_DATA_PATH)
+    if zillow_data.empty and previous is not None:
+        raise ValueError(f"No listings could be loaded from {ZILLOW_DATA_PATH}.")
+    broker_data = load_broker_data(BROKER_DATA_PATH)
+
+    # Fingerprint of the listings data; part of every whole-query cache key
+    data_version = compute_data_version(zillow_data)
+
+    feature_index = None
+    if previous is not None and previous['data_version'] == data_version:
+        feature_index, query_engine = previous['feature_index'], previous['query_engine']
+    elif previous is not None and DELTA_INGESTION_ENABLED:
+        query_engine = new_query_engine(data_version)
+        feature_index = apply_listings_delta(previous, query_engine, zillow_data, data_version)
+    if feature_index is None:
+        query_engine = new_query_engine(data_version)
+        query_engine.load(zillow_data, version=data_version)
+        # Precomputed record of which listings mention each known feature in 'neighborhood_desc'
+        feature_index = FeatureIndex(zillow_data, id_column='id', text_column='neighborhood_desc')
+
+    unique_cities = get_unique_cities(zillow_data)
+    logger.info(f"Loaded {len(unique_cities)} unique cities from Zillow data.")
+    return {
+        'zillow_data': zillow_data,
+        'broker_data': broker_data,
+        'broker_index': build_broker_index(broker_data),
+        'feature_index': feature_index,
+        # Indexed SQL table of this data version, used by execute_sql_query
+        'query_engine': query_engine,
+        # Cities for trait matching, query parsing and the prompts
+        'unique_cities': unique_cities,
+        'nearby_cities': nearby_city_index(zillow_data),
+        'data_version': data_version,
+    }
+
+# Helper function to invalidate caches derived from the previous data
+def on_data_reload(state: dict, previous: dict):
+    get_trait_prompt_context.cache_clear()
+    semantic_cache.set_guard_terms(state['unique_cities'])
+    if previous is not None:
+        logger.info(f"Swapped data version {previous['data_version']} for {state['data_version']}.")
+    keep = [state['query_engine'].path] + ([previous['query_engine'].path] if previous is not None else [])
+    prune_database_files(namespaced_path(QUERY_ENGINE_PATH, os.path.abspath(ZILLOW_DATA_PATH)), keep,
+                         QUERY_ENGINE_FILE_RETENTION)
+
+data_manager = DataManager(
+    build_data_state,
+    watch_paths=[ZILLOW_DATA_PATH, BROKER_DATA_PATH],
+    poll_interval=DATA_RELOAD_INTERVAL,
+    on_reload=on_data_reload
+)
+
+# Maximum number of /api/search pipeline stages running at once
+SEARCH_PIPELINE_WORKERS = int(os.getenv("SEARCH_PIPELINE_WORKERS", "4"))
+
+# Seconds a complete /api/search response stays cached
+SEARCH_CACHE_TIMEOUT = int(os.getenv("SEARCH_CACHE_TIMEOUT", "3600"))
+
+# Default and largest number of properties per /api/search page; traits are only evaluated
+# for the properties of the requested page
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "25"))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", "100"))
+
+# Order search results by relevance: the share of traits decided 'yes' locally, the fit of
+# the price to a requested range and the school ratings, weighted as below. Queries whose SQL
+# has its own ORDER BY keep that order.
+SEARCH_RANKING_ENABLED = os.getenv("SEARCH_RANKING_ENABLED", "true").lower() in ("1", "true", "yes")
+RANK_TRAIT_WEIGHT = float(os.getenv("RANK_TRAIT_WEIGHT", "1.0"))
+RANK_PRICE_WEIGHT = float(os.getenv("RANK_PRICE_WEIGHT", "0.3"))
+RANK_SCHOOL_WEIGHT = float(os.getenv("RANK_SCHOOL_WEIGHT", "0.3"))
+
+# Columns fetched for every candidate row to rank it
+RANK_COLUMNS = ['id', 'city', 'beds', 'baths', 'price', 'school_ratings']
+
+# Listing columns returned per search result unless the request asks for other 'fields'
+# (a list, a comma-separated string, or '*' for every column); these are what Results.js renders
+SEARCH_DEFAULT_FIELDS = [
+    field.strip() for field in
+    os.getenv("SEARCH_DEFAULT_FIELDS", "id,listingurl,price,neighborhood_desc,zip_code").split(',')
+    if field.strip()
+]
+
+# Minimum share of query words the rule-based parser must explain to skip the LLM stages
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.8"))
+
+# Nearest-neighbour cache of intent, traits, key phrases and SQL for paraphrased queries
+semantic_cache = SemanticQueryCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9")),
+    max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "500"))
+)
 
 # Helper function to extract SQL from OpenAI response
 def extract_sql_from_response(response):
@@ -226,50 +476,113 @@ def extract_feature_from_trait(trait):
     # Return the cleaned trait
     return cleaned_trait
 
-# Initialize a simple in-memory cache for trait evaluations using Flask-Caching
-def initialize_trait_cache():
-    # Flask-Caching is already initialized as 'cache'
-    pass  # No additional setup needed
+# Number of properties scored per batched trait-evaluation request (0 disables batching)
+TRAIT_BATCH_SIZE = int(os.getenv("TRAIT_BATCH_SIZE", "10"))
 
-initialize_trait_cache()
+# Columns sent to OpenAI when evaluating traits for a property
+TRAIT_RELEVANT_COLUMNS = [
+    'price', 'beds', 'baths', 'area', 'listing_agent', 'year_built',
+    'property_tax', 'school_ratings', 'neighborhood_desc',
+    'broker', 'city', 'state', 'zip_code', 'hoa_fees'
+]
 
-# Function to determine if a trait is matched, with caching
-def is_trait_matched(property_record: dict, trait: str) -> str:
+VALID_TRAIT_RESPONSES = ('yes', 'no', 'unsure')
+
+# Decide traits about city, beds, baths, price and known features locally instead of asking OpenAI
+TRAIT_RULES_ENABLED = os.getenv("TRAIT_RULES_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# 'full' sends every relevant column, six examples and all cities with each trait prompt;
+# 'compact' sends only the columns and cities a trait refers to, after a static instruction prefix
+TRAIT_PROMPT_MODE = os.getenv("TRAIT_PROMPT_MODE", "full").lower()
+
+# Seconds a trait verdict stays cached; keys include a hash of the listing, so they do not go stale
+TRAIT_CACHE_TIMEOUT = int(os.getenv("TRAIT_CACHE_TIMEOUT", "86400"))
+
+# Initialize the content-addressed cache for trait evaluations using Flask-Caching
+def initialize_trait_cache() -> TraitCache:
+    return TraitCache(cache, TRAIT_RELEVANT_COLUMNS, id_column='id', timeout=TRAIT_CACHE_TIMEOUT)
+
+trait_cache = initialize_trait_cache()
+
+# Helper function to format property details for trait prompts
+def format_property_details(property_record: dict) -> str:
+    return "\n".join([
+        f"{col.replace('_', ' ').title()}: {property_record.get(col, 'N/A')}"
+        for col in TRAIT_RELEVANT_COLUMNS
+    ])
+
+# Helper function to pick the columns and cities a compact trait prompt needs
+@functools.lru_cache(maxsize=1024)
+def get_trait_prompt_context(traits: tuple) -> tuple:
     """
-    Determines if a property matches a given trait using OpenAI.
-    
-    Utilizes caching to avoid redundant API calls for the same property-trait pair.
-    
-    Parameters:
-    - property_record (dict): A dictionary representing a property's details.
-    - trait (str): The trait to evaluate.
-    
+    Memoizes the column and city selection per set of traits; the selection only depends on
+    the traits and the loaded cities, so it is cleared when the data is reloaded.
+
     Returns:
-    - str: 'yes', 'no', or 'unsure' based on the evaluation.
+    - tuple: (columns to send, candidate cities) for the given traits.
     """
-    # Create a unique key for caching
-    property_id = f"{property_record.get('zip_code', '')}_{property_record.get('price', '')}"
-    cache_key = f"{property_id}_{trait.lower()}"
+    state = data_manager.state
+    return compact_prompt_context(list(traits), TRAIT_RELEVANT_COLUMNS, state['unique_cities'], state['nearby_cities'])
 
-    # Check if result is cached
-    cached_result = cache.get(cache_key)
-    if cached_result:
-        return cached_result
+# Helper function to build the compact OpenAI request for a single trait evaluation
+def build_compact_trait_match_request(property_record: dict, trait: str) -> dict:
+    """
+    Builds a trait prompt holding only the fields relevant to the trait and the cities it
+    refers to or that lie near them. The instructions and examples are a static system
+    message, identical across calls; it is shorter than the minimum prefix the API caches, so
+    the saving comes from the smaller prompt rather than from prompt caching.
+    """
+    columns, cities = get_trait_prompt_context((trait,))
+    prompt = f"Property: {format_compact_details(property_record, columns)}\n"
+    if cities:
+        prompt += f"Candidate Cities: {', '.join(cities)}\n"
+    prompt += f"Trait: {trait}\nAnswer:"
+
+    return dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": COMPACT_TRAIT_INSTRUCTIONS},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=3,
+        temperature=0.0,
+        stop=["\n"],
+        usage_label='trait_match'
+    )
 
-    try:
-        # Construct property details string
-        relevant_columns = [
-            'price', 'beds', 'baths', 'area', 'listing_agent', 'year_built',
-            'property_tax', 'school_ratings', 'neighborhood_desc',
-            'broker', 'city', 'state', 'zip_code', 'hoa_fees'
-        ]
-
-        property_details = "\n".join([
-            f"{col.replace('_', ' ').title()}: {property_record.get(col, 'N/A')}"
-            for col in relevant_columns
-        ])
-
-        prompt = (
+# Helper function to build the compact OpenAI request for a batched trait evaluation
+def build_compact_trait_batch_request(property_records: list, traits: list) -> dict:
+    columns, cities = get_trait_prompt_context(tuple(traits))
+    traits_block = "\n".join([f"T{idx}: {trait}" for idx, trait in enumerate(traits, start=1)])
+    properties_block = "\n".join([
+        f"P{idx}: {format_compact_details(record, columns)}"
+        for idx, record in enumerate(property_records, start=1)
+    ])
+    prompt = f"Traits:\n{traits_block}\n"
+    if cities:
+        prompt += f"Candidate Cities: {', '.join(cities)}\n"
+    prompt += f"Properties:\n{properties_block}\nAnswer:"
+
+    return dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": COMPACT_TRAIT_BATCH_INSTRUCTIONS},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=len(property_records) * (4 * len(traits) + 6),
+        temperature=0.0,
+        usage_label='trait_batch'
+    )
+
+# Helper function to build the OpenAI request for a single trait evaluation
+def build_trait_match_request(property_record: dict, trait: str) -> dict:
+    if TRAIT_PROMPT_MODE == 'compact':
+        return build_compact_trait_match_request(property_record, trait)
+
+    # Construct property details string
+    property_details = format_property_details(property_record)
+
+    prompt = (
         "You are an intelligent assistant specialized in real estate analysis. "
         "Given the detailed information about a property and a specific trait, determine whether the property satisfies the trait. "
         "If a property value is closely related to a trait even though it's not an exact match (e.g., 'redwood' instead of 'Redwood City'), map it accordingly. "
@@ -285,7 +598,7 @@ def is_trait_matched(property_record: dict, trait: str) -> str:
         "- If the property details lack sufficient information to determine the trait, or if the match is partial, respond with 'unsure'.\n"
         "- For city-related traits, map any partial or misspelled city names to the correct full name from the allowed cities list.\n\n"
         "### Allowed Cities:\n"
-        f"{', '.join(ALLOWED_CITIES)}\n\n"
+        f"{', '.join(data_manager.state['unique_cities'])}\n\n"
         "### Examples:\n\n"
         "#### Example 1:\n"
         "**Property Details:**\n"
@@ -403,139 +716,454 @@ def is_trait_matched(property_record: dict, trait: str) -> str:
         "**Response:**"
     )
 
-        
-        # Make the API call
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=3,
-            temperature=0.0,
-            stop=["\n"]
-        )
+    return dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=3,
+        temperature=0.0,
+        stop=["\n"],
+        usage_label='trait_match'
+    )
+
+# Function to determine if a trait is matched, with caching
+def is_trait_matched(property_record: dict, trait: str, count_lookup: bool = True) -> str:
+    """
+    Determines if a property matches a given trait using OpenAI.
+    
+    Utilizes caching to avoid redundant API calls for the same property-trait pair.
+    
+    Parameters:
+    - property_record (dict): A dictionary representing a property's details.
+    - trait (str): The trait to evaluate.
+    - count_lookup (bool): Count the cache lookup in the trait cache stats; False when the
+      caller already looked the pair up.
+    
+    Returns:
+    - str: 'yes', 'no', or 'unsure' based on the evaluation.
+    """
+    # Check if result is cached
+    cached_result = trait_cache.get(property_record, trait, count=count_lookup)
+    if cached_result:
+        return cached_result
+
+    try:
+        response = create_chat_completion(**build_trait_match_request(property_record, trait))
 
         # Extract and clean the response
         trait_response = response['choices'][0]['message']['content'].strip().lower()
 
         # Validate the response
-        if trait_response in ['yes', 'no', 'unsure']:
-            cache.set(cache_key, trait_response)
+        if trait_response in VALID_TRAIT_RESPONSES:
+            trait_cache.set(property_record, trait, trait_response)
             return trait_response
         else:
             # Default to 'unsure' if unexpected response
-            cache.set(cache_key, 'unsure')
+            trait_cache.set(property_record, trait, 'unsure')
             return 'unsure'
     except Exception as e:
         logger.error(f"Error in is_trait_matched: {e}")
         return 'unsure'
 
+# Awaitable function to determine if a trait is matched, with caching
+async def is_trait_matched_async(property_record: dict, trait: str, count_lookup: bool = True) -> str:
+    """
+    Awaitable counterpart of is_trait_matched, for the async OpenAI client's event loop.
+    """
+    # Check if result is cached (the cache is blocking, so it is read off the event loop)
+    cached_result = await asyncio.to_thread(trait_cache.get, property_record, trait, count=count_lookup)
+    if cached_result:
+        return cached_result
+
+    try:
+        response = await async_openai.create(**build_trait_match_request(property_record, trait))
+
+        # Extract and clean the response
+        trait_response = response['choices'][0]['message']['content'].strip().lower()
+
+        # Validate the response, defaulting to 'unsure' if unexpected
+        if trait_response not in VALID_TRAIT_RESPONSES:
+            trait_response = 'unsure'
+        await asyncio.to_thread(trait_cache.set, property_record, trait, trait_response)
+        return trait_response
+    except Exception as e:
+        logger.error(f"Error in is_trait_matched: {e}")
+        return 'unsure'
+
+# Helper function to parse a batched trait verdict matrix
+def parse_trait_matrix(response_text: str, num_properties: int, num_traits: int) -> list:
+    """
+    Parses a batched trait evaluation reply of the form 'P1: yes, no, unsure'.
+
+    Parameters:
+    - response_text (str): The raw reply from OpenAI.
+    - num_properties (int): Number of properties that were sent in the batch.
+    - num_traits (int): Number of traits each property was evaluated against.
+
+    Returns:
+    - list: One entry per property; a list of verdicts, or None if that row could not be parsed.
+    """
+    matrix = [None] * num_properties
+    for line in response_text.splitlines():
+        match = re.match(r'^\W*P?\s*(\d+)\s*[:.)\-]\s*(.+)$', line.strip(), re.IGNORECASE)
+        if not match:
+            continue
+        row = int(match.group(1)) - 1
+        if row < 0 or row >= num_properties:
+            continue
+        verdicts = [v.strip(" '\"`.").lower() for v in re.split(r'[,|\s]+', match.group(2)) if v.strip(" '\"`.")]
+        if len(verdicts) == num_traits and all(v in VALID_TRAIT_RESPONSES for v in verdicts):
+            matrix[row] = verdicts
+    return matrix
+
+# Helper function to build the OpenAI request for a batched trait evaluation
+def build_trait_batch_request(property_records: list, traits: list) -> dict:
+    if TRAIT_PROMPT_MODE == 'compact':
+        return build_compact_trait_batch_request(property_records, traits)
+
+    properties_block = "\n\n".join([
+        f"#### P{idx}:\n{format_property_details(record)}"
+        for idx, record in enumerate(property_records, start=1)
+    ])
+    traits_block = "\n".join([f"T{idx}: {trait}" for idx, trait in enumerate(traits, start=1)])
+
+    prompt = (
+        "You are an intelligent assistant specialized in real estate analysis. "
+        "Given the detailed information about several properties and a list of traits, determine for every property whether it satisfies each trait. "
+        "If a property value is closely related to a trait even though it's not an exact match (e.g., 'redwood' instead of 'Redwood City'), map it accordingly.\n\n"
+        "### Guidelines:\n"
+        "- Use 'yes' if the trait is clearly satisfied by the property details.\n"
+        "- Use 'no' if the trait is clearly not satisfied by the property details.\n"
+        "- Use 'unsure' if the property details lack sufficient information to determine the trait, or if the match is partial.\n"
+        "- For city-related traits, map any partial or misspelled city names to the correct full name from the allowed cities list.\n"
+        "- Answer with exactly one line per property, in the format 'P<number>: <verdict for T1>, <verdict for T2>, ...'.\n"
+        "- Do not include any additional text.\n\n"
+        "### Allowed Cities:\n"
+        f"{', '.join(data_manager.state['unique_cities'])}\n\n"
+        "### Example:\n"
+        "**Traits:**\n"
+        "T1: Has a swimming pool.\n"
+        "T2: Located in Irvine.\n"
+        "T3: Has a fireplace.\n"
+        "**Response:**\n"
+        "P1: yes, no, unsure\n"
+        "P2: no, yes, no\n\n"
+        "---\n\n"
+        "### Traits:\n"
+        f"{traits_block}\n\n"
+        "### Properties:\n\n"
+        f"{properties_block}\n\n"
+        "**Response:**"
+    )
+
+    return dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=len(property_records) * (4 * len(traits) + 6),
+        temperature=0.0,
+        usage_label='trait_batch'
+    )
+
+# Function to evaluate a batch of properties against all traits in one request
+def is_trait_matched_batch(property_records: list, traits: list) -> list:
+    """
+    Determines, in a single OpenAI request, whether each property matches each trait.
+
+    Parameters:
+    - property_records (list): Property dictionaries to evaluate.
+    - traits (list): The traits to evaluate.
+
+    Returns:
+    - list: One entry per property; a list of verdicts or None if the reply for that row
+      could not be parsed.
+    """
+    try:
+        response = create_chat_completion(**build_trait_batch_request(property_records, traits))
+        matrix_response = response['choices'][0]['message']['content'].strip()
+        return parse_trait_matrix(matrix_response, len(property_records), len(traits))
+    except Exception as e:
+        logger.error(f"Error in is_trait_matched_batch: {e}")
+        return [None] * len(property_records)
+
+# Awaitable function to evaluate a batch of properties against all traits in one request
+async def is_trait_matched_batch_async(property_records: list, traits: list) -> list:
+    """
+    Awaitable counterpart of is_trait_matched_batch, for the async OpenAI client's event loop.
+    """
+    try:
+        response = await async_openai.create(**build_trait_batch_request(property_records, traits))
+        matrix_response = response['choices'][0]['message']['content'].strip()
+        return parse_trait_matrix(matrix_response, len(property_records), len(traits))
+    except Exception as e:
+        logger.error(f"Error in is_trait_matched_batch_async: {e}")
+        return [None] * len(property_records)
+
+# Helper function to look up the cached verdicts of all traits for all properties
+def get_cached_trait_verdicts(result: list, traits: list) -> list:
+    return [[trait_cache.get(record, trait) for trait in traits] for record in result]
+
+# Helper function to cache the verdicts of all traits for one property
+def set_cached_trait_verdicts(record: dict, traits: list, verdicts: list):
+    for trait, verdict in zip(traits, verdicts):
+        trait_cache.set(record, trait, verdict)
+
+# Helper function to evaluate all traits for all properties using batched requests
+def iter_trait_verdicts(result: list, traits: list):
+    """
+    Evaluates every (property, trait) pair, serving cached verdicts first and sending the
+    remaining properties to OpenAI in chunks of TRAIT_BATCH_SIZE. Properties whose batch
+    reply cannot be parsed fall back to per-trait evaluation with is_trait_matched.
+    Requests run concurrently, up to OPENAI_MAX_CONCURRENCY at a time.
+
+    Yields:
+    - tuple: (index of the property in result, list of verdicts in the order of traits),
+      as soon as all verdicts for that property are known.
+    """
+    verdicts = get_cached_trait_verdicts(result, traits)
+    pending = []
+    for idx, row in enumerate(verdicts):
+        if all(row):
+            yield idx, row
+        else:
+            pending.append(idx)
+    fallback = list(pending) if TRAIT_BATCH_SIZE <= 0 else []
+
+    if TRAIT_BATCH_SIZE > 0:
+        chunks = [pending[start:start + TRAIT_BATCH_SIZE] for start in range(0, len(pending), TRAIT_BATCH_SIZE)]
+        batches = iter_in_parallel(
+            lambda chunk: is_trait_matched_batch([result[idx] for idx in chunk], traits),
+            chunks,
+            OPENAI_MAX_CONCURRENCY
+        )
+        for chunk_idx, matrix in batches:
+            for idx, row in zip(chunks[chunk_idx], matrix):
+                if row is None:
+                    logger.warning(f"Unparseable batch verdicts for property {idx}; falling back to per-trait evaluation.")
+                    fallback.append(idx)
+                    continue
+                set_cached_trait_verdicts(result[idx], traits, row)
+                yield idx, row
+
+    # Evaluate remaining uncached (property, trait) pairs individually, in parallel; their
+    # cache lookups were already counted above
+    pairs = [(idx, pos) for idx in fallback for pos in range(len(traits)) if verdicts[idx][pos] is None]
+    outstanding = Counter(idx for idx, _ in pairs)
+    pair_verdicts = iter_in_parallel(
+        lambda pair: is_trait_matched(result[pair[0]], traits[pair[1]], count_lookup=False),
+        pairs,
+        OPENAI_MAX_CONCURRENCY
+    )
+    for pair_idx, verdict in pair_verdicts:
+        idx, pos = pairs[pair_idx]
+        verdicts[idx][pos] = verdict
+        outstanding[idx] -= 1
+        if outstanding[idx] == 0:
+            yield idx, verdicts[idx]
+
+    logger.info(f"Evaluated {len(traits)} traits for {len(result)} properties "
+                f"({len(pending)} uncached, {len(pairs)} single-trait requests). "
+                f"Trait cache: {trait_cache.stats()}")
+
+# Helper function to build the OpenAI request for user intent extraction
+def build_user_intent_request(query) -> dict:
+    user_intent_prompt = (
+        "Analyze the following real estate query and extract the user intent. "
+        "Provide the intent as a concise paragraph without any additional text or explanations."
+        "If some location or keyword is incomplete, fill them with the most appropriate value from the data, e.g., replace 'redwood' with 'Redwood City'.\n\n"
+        "### Example 1:\n"
+        "**Query:** \"Looking for a 3 bedroom house with a big backyard in San Francisco.\"\n"
+        "**User Intent:** The user is searching for a spacious three-bedroom house in San Francisco, prioritizing properties with large backyards. They likely value outdoor space for activities such as gardening or entertaining.\n\n"
+        "### Example 2:\n"
+        "**Query:** \"Seeking a 2 bedroom apartment near downtown Seattle with modern amenities.\"\n"
+        "**User Intent:** The user is interested in a two-bedroom apartment near downtown Seattle, emphasizing modern amenities. They likely prioritize convenience and contemporary living spaces.\n\n"
+        "### Example 3:\n"
+        "**Query:** \"2 bed 2 bath in Irvine and 3 bed 2 bath in Redwood under 1600000.\"\n"
+        "**User Intent:** The user is looking for both a 2-bedroom, 2-bathroom house in Irvine and a 3-bedroom, 2-bathroom property in Redwood City, with a combined budget under 1,600,000. They seek multiple options within a specific price range.\n\n"
+        "### Example 4:\n"
+        "**Query:** \"Looking for a 4-bedroom villa in Redwood with a pool and sea view, priced below 2 million.\"\n"
+        "**User Intent:** The user desires a luxurious four-bedroom villa in Redwood City that includes a pool and offers a sea view, with a budget below 2 million. They prioritize luxury and scenic views.\n\n"
+        "### Example 5:\n"
+        "**Query:** \"Searching for 1 bed 1 bath condo in Redwood and 2 bed 2 bath townhouse in Boston under 750000.\"\n"
+        "**User Intent:** The user is seeking both a 1-bedroom, 1-bathroom condo in Redwood City and a 2-bedroom, 2-bathroom townhouse in Boston, with a maximum budget of 750,000. They are interested in multiple property types across different cities within a specified price range.\n\n"
+        "---\n\n"
+        "**User Intent:**\n"
+        f"{query}\n"
+        "**User Intent:**"
+    )
+
+    return dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
+            {"role": "user", "content": user_intent_prompt}
+        ],
+        max_tokens=150,
+        temperature=0.0,
+        usage_label='user_intent'
+    )
+
+# Awaitable helper function to evaluate all traits for all properties using batched requests
+async def iter_trait_verdicts_async(result: list, traits: list):
+    """
+    Awaitable counterpart of iter_trait_verdicts. All uncached requests are started at once as
+    tasks on the async OpenAI client's event loop, which bounds their concurrency; the blocking
+    trait cache is read and written in the loop's default executor.
+
+    Yields:
+    - tuple: (index of the property in result, list of verdicts in the order of traits),
+      as soon as all verdicts for that property are known.
+    """
+    verdicts = await asyncio.to_thread(get_cached_trait_verdicts, result, traits)
+    pending = []
+    for idx, row in enumerate(verdicts):
+        if all(row):
+            yield idx, row
+        else:
+            pending.append(idx)
+    fallback = list(pending) if TRAIT_BATCH_SIZE <= 0 else []
+
+    if TRAIT_BATCH_SIZE > 0:
+        async def evaluate_chunk(chunk):
+            return chunk, await is_trait_matched_batch_async([result[idx] for idx in chunk], traits)
+
+        chunks = [pending[start:start + TRAIT_BATCH_SIZE] for start in range(0, len(pending), TRAIT_BATCH_SIZE)]
+        for next_batch in asyncio.as_completed([evaluate_chunk(chunk) for chunk in chunks]):
+            chunk, matrix = await next_batch
+            for idx, row in zip(chunk, matrix):
+                if row is None:
+                    logger.warning(f"Unparseable batch verdicts for property {idx}; falling back to per-trait evaluation.")
+                    fallback.append(idx)
+                    continue
+                await asyncio.to_thread(set_cached_trait_verdicts, result[idx], traits, row)
+                yield idx, row
+
+    # Evaluate remaining uncached (property, trait) pairs individually, concurrently; their
+    # cache lookups were already counted above
+    async def evaluate_pair(idx, pos):
+        return idx, pos, await is_trait_matched_async(result[idx], traits[pos], count_lookup=False)
+
+    pairs = [(idx, pos) for idx in fallback for pos in range(len(traits)) if verdicts[idx][pos] is None]
+    outstanding = Counter(idx for idx, _ in pairs)
+    for next_pair in asyncio.as_completed([evaluate_pair(idx, pos) for idx, pos in pairs]):
+        idx, pos, verdict = await next_pair
+        verdicts[idx][pos] = verdict
+        outstanding[idx] -= 1
+        if outstanding[idx] == 0:
+            yield idx, verdicts[idx]
+
+    logger.info(f"Evaluated {len(traits)} traits for {len(result)} properties "
+                f"({len(pending)} uncached, {len(pairs)} single-trait requests). "
+                f"Trait cache: {trait_cache.stats()}")
+
 # Helper function to extract user intent
 def extract_user_intent(query):
     """
     Extracts user intent from the query using OpenAI.
     """
     try:
-        user_intent_prompt = (
-            "Analyze the following real estate query and extract the user intent. "
-            "Provide the intent as a concise paragraph without any additional text or explanations."
-            "If some location or keyword is incomplete, fill them with the most appropriate value from the data, e.g., replace 'redwood' with 'Redwood City'.\n\n"
-            "### Example 1:\n"
-            "**Query:** \"Looking for a 3 bedroom house with a big backyard in San Francisco.\"\n"
-            "**User Intent:** The user is searching for a spacious three-bedroom house in San Francisco, prioritizing properties with large backyards. They likely value outdoor space for activities such as gardening or entertaining.\n\n"
-            "### Example 2:\n"
-            "**Query:** \"Seeking a 2 bedroom apartment near downtown Seattle with modern amenities.\"\n"
-            "**User Intent:** The user is interested in a two-bedroom apartment near downtown Seattle, emphasizing modern amenities. They likely prioritize convenience and contemporary living spaces.\n\n"
-            "### Example 3:\n"
-            "**Query:** \"2 bed 2 bath in Irvine and 3 bed 2 bath in Redwood under 1600000.\"\n"
-            "**User Intent:** The user is looking for both a 2-bedroom, 2-bathroom house in Irvine and a 3-bedroom, 2-bathroom property in Redwood City, with a combined budget under 1,600,000. They seek multiple options within a specific price range.\n\n"
-            "### Example 4:\n"
-            "**Query:** \"Looking for a 4-bedroom villa in Redwood with a pool and sea view, priced below 2 million.\"\n"
-            "**User Intent:** The user desires a luxurious four-bedroom villa in Redwood City that includes a pool and offers a sea view, with a budget below 2 million. They prioritize luxury and scenic views.\n\n"
-            "### Example 5:\n"
-            "**Query:** \"Searching for 1 bed 1 bath condo in Redwood and 2 bed 2 bath townhouse in Boston under 750000.\"\n"
-            "**User Intent:** The user is seeking both a 1-bedroom, 1-bathroom condo in Redwood City and a 2-bedroom, 2-bathroom townhouse in Boston, with a maximum budget of 750,000. They are interested in multiple property types across different cities within a specified price range.\n\n"
-            "---\n\n"
-            "**User Intent:**\n"
-            f"{query}\n"
-            "**User Intent:**"
-        )
+        response = create_chat_completion(**build_user_intent_request(query))
+        user_intent = response['choices'][0]['message']['content'].strip()
+        return user_intent
+    except Exception as e:
+        logger.error(f"Error extracting user intent: {e}")
+        return None
 
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
-                {"role": "user", "content": user_intent_prompt}
-            ],
-            max_tokens=150,
-            temperature=0.0
-        )
+# Awaitable helper function to extract user intent
+async def extract_user_intent_async(query):
+    """
+    Awaitable counterpart of extract_user_intent, for the async OpenAI client's event loop.
+    """
+    try:
+        response = await async_openai.create(**build_user_intent_request(query))
         user_intent = response['choices'][0]['message']['content'].strip()
         return user_intent
     except Exception as e:
         logger.error(f"Error extracting user intent: {e}")
         return None
 
+# Helper function to build the OpenAI request for trait extraction
+def build_traits_request(user_intent, query) -> dict:
+    traits_prompt = (
+        "From the following real estate query and user intent, extract the key traits."
+        " Provide each trait starting with a verb phrase like 'is', 'has' and so on without any explanations or additional text."
+        " Ensure that each trait is concise and relevant to the user's request."
+        " Do not split numerical values like prices across multiple lines."
+        " If multiple properties are mentioned, list each property separately and combine the budget where applicable."
+        " Do not include any preamble, emojis, or phrases like 'Here are the extracted traits:'."
+        " If it's not explicitly mentioned as a house or property, don't add that as a trait."
+        " If some location or keyword is incomplete, fill them with the most appropriate value from the data, e.g., replace 'redwood' with 'Redwood City'."
+        " Your response should only include the traits, exactly as in the examples, and nothing else.\n\n"
+        "---\n\n"
+        "**Example 1:**\n\n"
+        "**User Intent:** The user is searching for a spacious three-bedroom house in San Francisco, prioritizing properties with large backyards. They likely value outdoor space for activities such as gardening or entertaining.\n\n"
+        "**Query:** \"Looking for a 3 bedroom, 2 bathroom house with a big backyard in San Francisco.\"\n\n"
+        "**Traits:**\n"
+        "    is a house\n"
+        "    has 3 bed, 2 bath\n"
+        "    is in San Francisco\n"
+        "    has a big backyard\n\n"
+        "**Example 2:**\n\n"
+        "**User Intent:** The user is interested in a two-bedroom apartment near downtown Seattle, emphasizing modern amenities. They likely prioritize convenience and contemporary living spaces.\n\n"
+        "**Query:** \"Seeking a 2 bed 1 bath condo in downtown Seattle with modern amenities.\"\n\n"
+        "**Traits:**\n"
+        "    is a condo\n"
+        "    has 2 bed, 1 bath\n"
+        "    is in Seattle\n"
+        "    has modern amenities\n\n"
+        "**Example 3:**\n\n"
+        "**User Intent:** The user is interested in finding a 2-bedroom, 2-bathroom property in Irvine and a 3-bedroom, 3-bathroom property in San Francisco, with a combined budget of $1,595,000.\n\n"
+        "**Query:** \"2 bed 2 bath in Irvine and 3 bed 3 bath in San Francisco both under 1,595,000.\"\n\n"
+        "**Traits:**\n"
+        "    has 2 bed, 2 bath\n"
+        "    is in Irvine\n"
+        "    has 3 bed, 3 bath\n"
+        "    is in San Francisco\n"
+        "    is under $1,595,000.\n\n"
+        "---\n\n"
+        "**User Intent:**\n"
+        f"{user_intent}\n\n"
+        "**Query:**\n"
+        f"\"{query}\"\n\n"
+        "**Traits:**"
+    )
+
+    return dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
+            {"role": "user", "content": traits_prompt}
+        ],
+        max_tokens=200,
+        temperature=0.0,
+        usage_label='traits'
+    )
+
 # Helper function to extract traits
 def extract_traits(user_intent, query):
     """
     Extracts traits from the user intent and query using OpenAI.
     """
     try:
-        traits_prompt = (
-            "From the following real estate query and user intent, extract the key traits."
-            " Provide each trait starting with a verb phrase like 'is', 'has' and so on without any explanations or additional text."
-            " Ensure that each trait is concise and relevant to the user's request."
-            " Do not split numerical values like prices across multiple lines."
-            " If multiple properties are mentioned, list each property separately and combine the budget where applicable."
-            " Do not include any preamble, emojis, or phrases like 'Here are the extracted traits:'."
-            " If it's not explicitly mentioned as a house or property, don't add that as a trait."
-            " If some location or keyword is incomplete, fill them with the most appropriate value from the data, e.g., replace 'redwood' with 'Redwood City'."
-            " Your response should only include the traits, exactly as in the examples, and nothing else.\n\n"
-            "---\n\n"
-            "**Example 1:**\n\n"
-            "**User Intent:** The user is searching for a spacious three-bedroom house in San Francisco, prioritizing properties with large backyards. They likely value outdoor space for activities such as gardening or entertaining.\n\n"
-            "**Query:** \"Looking for a 3 bedroom, 2 bathroom house with a big backyard in San Francisco.\"\n\n"
-            "**Traits:**\n"
-            "    is a house\n"
-            "    has 3 bed, 2 bath\n"
-            "    is in San Francisco\n"
-            "    has a big backyard\n\n"
-            "**Example 2:**\n\n"
-            "**User Intent:** The user is interested in a two-bedroom apartment near downtown Seattle, emphasizing modern amenities. They likely prioritize convenience and contemporary living spaces.\n\n"
-            "**Query:** \"Seeking a 2 bed 1 bath condo in downtown Seattle with modern amenities.\"\n\n"
-            "**Traits:**\n"
-            "    is a condo\n"
-            "    has 2 bed, 1 bath\n"
-            "    is in Seattle\n"
-            "    has modern amenities\n\n"
-            "**Example 3:**\n\n"
-            "**User Intent:** The user is interested in finding a 2-bedroom, 2-bathroom property in Irvine and a 3-bedroom, 3-bathroom property in San Francisco, with a combined budget of $1,595,000.\n\n"
-            "**Query:** \"2 bed 2 bath in Irvine and 3 bed 3 bath in San Francisco both under 1,595,000.\"\n\n"
-            "**Traits:**\n"
-            "    has 2 bed, 2 bath\n"
-            "    is in Irvine\n"
-            "    has 3 bed, 3 bath\n"
-            "    is in San Francisco\n"
-            "    is under $1,595,000.\n\n"
-            "---\n\n"
-            "**User Intent:**\n"
-            f"{user_intent}\n\n"
-            "**Query:**\n"
-            f"\"{query}\"\n\n"
-            "**Traits:**"
-        )
+        response = create_chat_completion(**build_traits_request(user_intent, query))
+        traits_response = response['choices'][0]['message']['content'].strip()
+        traits = [trait.strip('- ').strip() for trait in traits_response.split('\n') if trait.strip()]
+        return traits
+    except Exception as e:
+        logger.error(f"Error extracting traits: {e}")
+        return []
 
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
-                {"role": "user", "content": traits_prompt}
-            ],
-            max_tokens=200,
-            temperature=0.0
-        )
+# Awaitable helper function to extract traits
+async def extract_traits_async(user_intent, query):
+    """
+    Awaitable counterpart of extract_traits, for the async OpenAI client's event loop.
+    """
+    try:
+        response = await async_openai.create(**build_traits_request(user_intent, query))
         traits_response = response['choices'][0]['message']['content'].strip()
         traits = [trait.strip('- ').strip() for trait in traits_response.split('\n') if trait.strip()]
         return traits
@@ -543,77 +1171,82 @@ def extract_traits(user_intent, query):
         logger.error(f"Error extracting traits: {e}")
         return []
 
+# Helper function to build the OpenAI request for key phrase extraction
+def build_key_phrases_request(user_intent, traits, query) -> dict:
+    key_phrases_prompt = (
+        "From the following real estate query, user intent, and traits, extract the top most relevant key phrases that can be used for search optimization or listing purposes."
+        " Provide each key phrase on a separate line without any explanations or additional text."
+        " Do not include any preamble, emojis, or phrases like 'Here are the top most relevant key phrases for search optimization or listing purposes:'."
+        " If some location or keyword is incomplete, fill them with the most appropriate value from the data, e.g., replace 'redwood' with 'Redwood City'."
+        " Your response should only include the key phrases, and structure it exactly as in the examples, and add no extra tokens.\n\n"
+        "---\n\n"
+        "**Example 1:**\n\n"
+        "**User Intent:** The user is searching for a spacious three-bedroom house in San Francisco, prioritizing properties with large backyards. They likely value outdoor space for activities such as gardening or entertaining.\n\n"
+        "**Traits:**\n"
+        "    is a house\n"
+        "    has 3 bed, 2 bath\n"
+        "    is in San Francisco\n"
+        "    has a big backyard\n\n"
+        "**Query:** \"Looking for a 3 bedroom, 2 bathroom house with a big backyard in San Francisco.\"\n\n"
+        "**Key Phrases:**\n"
+        "3 bedroom house\n"
+        "big backyard\n"
+        "San Francisco real estate\n"
+        "spacious home\n"
+        "outdoor space\n"
+        "family-friendly neighborhood\n"
+        "gardening space\n"
+        "entertainment area\n"
+        "pet-friendly home\n"
+        "modern amenities\n\n"
+        "**Example 2:**\n\n"
+        "**User Intent:** The user is interested in a two-bedroom apartment near downtown Seattle, emphasizing modern amenities. They likely prioritize convenience and contemporary living spaces.\n\n"
+        "**Traits:**\n"
+        "    is a condo\n"
+        "    has 2 bed, 1 bath\n"
+        "    is in Seattle\n"
+        "    has modern amenities\n\n"
+        "**Query:** \"Seeking a 2 bed 1 bath condo in downtown Seattle with modern amenities.\"\n\n"
+        "**Key Phrases:**\n"
+        "2 bedroom apartment\n"
+        "downtown Seattle\n"
+        "modern amenities\n"
+        "urban living\n"
+        "convenient location\n"
+        "contemporary design\n"
+        "city views\n"
+        "public transportation access\n"
+        "stylish interiors\n"
+        "efficient layout\n\n"
+        "---\n\n"
+        "**User Intent:**\n"
+        f"{user_intent}\n\n"
+        "**Traits:**\n"
+        f"{', '.join(traits)}\n\n"
+        "**Query:**\n"
+        f"\"{query}\"\n\n"
+        "**Key Phrases:**"
+    )
+
+    return dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
+            {"role": "user", "content": key_phrases_prompt}
+        ],
+        max_tokens=150,
+        temperature=0.0,
+        stop=["\n\n"],
+        usage_label='key_phrases'
+    )
+
 # Helper function to extract key phrases
 def extract_key_phrases(user_intent, traits, query):
     """
     Extracts key phrases from the user intent, traits, and query using OpenAI.
     """
     try:
-        key_phrases_prompt = (
-            "From the following real estate query, user intent, and traits, extract the top most relevant key phrases that can be used for search optimization or listing purposes."
-            " Provide each key phrase on a separate line without any explanations or additional text."
-            " Do not include any preamble, emojis, or phrases like 'Here are the top most relevant key phrases for search optimization or listing purposes:'."
-            " If some location or keyword is incomplete, fill them with the most appropriate value from the data, e.g., replace 'redwood' with 'Redwood City'."
-            " Your response should only include the key phrases, and structure it exactly as in the examples, and add no extra tokens.\n\n"
-            "---\n\n"
-            "**Example 1:**\n\n"
-            "**User Intent:** The user is searching for a spacious three-bedroom house in San Francisco, prioritizing properties with large backyards. They likely value outdoor space for activities such as gardening or entertaining.\n\n"
-            "**Traits:**\n"
-            "    is a house\n"
-            "    has 3 bed, 2 bath\n"
-            "    is in San Francisco\n"
-            "    has a big backyard\n\n"
-            "**Query:** \"Looking for a 3 bedroom, 2 bathroom house with a big backyard in San Francisco.\"\n\n"
-            "**Key Phrases:**\n"
-            "3 bedroom house\n"
-            "big backyard\n"
-            "San Francisco real estate\n"
-            "spacious home\n"
-            "outdoor space\n"
-            "family-friendly neighborhood\n"
-            "gardening space\n"
-            "entertainment area\n"
-            "pet-friendly home\n"
-            "modern amenities\n\n"
-            "**Example 2:**\n\n"
-            "**User Intent:** The user is interested in a two-bedroom apartment near downtown Seattle, emphasizing modern amenities. They likely prioritize convenience and contemporary living spaces.\n\n"
-            "**Traits:**\n"
-            "    is a condo\n"
-            "    has 2 bed, 1 bath\n"
-            "    is in Seattle\n"
-            "    has modern amenities\n\n"
-            "**Query:** \"Seeking a 2 bed 1 bath condo in downtown Seattle with modern amenities.\"\n\n"
-            "**Key Phrases:**\n"
-            "2 bedroom apartment\n"
-            "downtown Seattle\n"
-            "modern amenities\n"
-            "urban living\n"
-            "convenient location\n"
-            "contemporary design\n"
-            "city views\n"
-            "public transportation access\n"
-            "stylish interiors\n"
-            "efficient layout\n\n"
-            "---\n\n"
-            "**User Intent:**\n"
-            f"{user_intent}\n\n"
-            "**Traits:**\n"
-            f"{', '.join(traits)}\n\n"
-            "**Query:**\n"
-            f"\"{query}\"\n\n"
-            "**Key Phrases:**"
-        )
-
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
-                {"role": "user", "content": key_phrases_prompt}
-            ],
-            max_tokens=150,
-            temperature=0.0,
-            stop=["\n\n"]
-        )
+        response = create_chat_completion(**build_key_phrases_request(user_intent, traits, query))
         key_phrases_response = response['choices'][0]['message']['content'].strip()
         key_phrases = [phrase.strip() for phrase in key_phrases_response.split('\n') if phrase.strip()]
         key_phrases = key_phrases[:10]  # Limit to top 10 key phrases
@@ -622,14 +1255,24 @@ def extract_key_phrases(user_intent, traits, query):
         logger.error(f"Error extracting key phrases: {e}")
         return []
 
-# Helper function to generate SQL query
-def generate_sql_query(user_intent, traits, key_phrases, query):
+# Awaitable helper function to extract key phrases
+async def extract_key_phrases_async(user_intent, traits, query):
     """
-    Generates a SQL SELECT query based on user intent, traits, and key phrases using OpenAI.
+    Awaitable counterpart of extract_key_phrases, for the async OpenAI client's event loop.
     """
     try:
-        unique_cities = zillow_data['city'].unique()
-        sql_prompt = (
+        response = await async_openai.create(**build_key_phrases_request(user_intent, traits, query))
+        key_phrases_response = response['choices'][0]['message']['content'].strip()
+        key_phrases = [phrase.strip() for phrase in key_phrases_response.split('\n') if phrase.strip()]
+        key_phrases = key_phrases[:10]  # Limit to top 10 key phrases
+        return key_phrases
+    except Exception as e:
+        logger.error(f"Error extracting key phrases: {e}")
+        return []
+
+# Helper function to build the OpenAI request for SQL generation
+def build_sql_query_request(user_intent, traits, key_phrases, query) -> dict:
+    sql_prompt = (
         "You are a SQL assistant specialized in real estate data. "
         "Based on the user's natural language query, user intent, traits, and key phrases, generate an accurate SQL query to search the properties. "
         "City and other dtring columns should be matched using LIKE instead of IN"
@@ -651,7 +1294,7 @@ def generate_sql_query(user_intent, traits, key_phrases, query):
         "Return only the SQL query as plain text without any explanations, code fences, backticks, markdown formatting, or additional text.\n\n"
 
         "### Available Cities:\n"
-        f"{unique_cities}\n\n"
+        f"{', '.join(data_manager.state['unique_cities'])}\n\n"
 
         "### Example 1:\n"
         "**User Intent:** The user is searching for a spacious three-bedroom house in San Francisco, prioritizing properties with large backyards.\n"
@@ -675,8 +1318,7 @@ def generate_sql_query(user_intent, traits, key_phrases, query):
         "**SQL Query:**\n"
         "SELECT * FROM zillow_data WHERE beds = 3 AND baths = 2 AND city LIKE '%San Francisco%' AND (neighborhood_desc LIKE '%big backyard%');\n\n"
 
-        
-    
+
         "### Example 3:\n"
         "**User Intent:** The user wants a four-bedroom house in Miami with a pool and sea view, under a budget of $2 million.\n"
         "**Traits:**\n"
@@ -1003,16 +1645,47 @@ def generate_sql_query(user_intent, traits, key_phrases, query):
         f"\"{query}\"\n\n"
         "**SQL Query:**"
     )
-       
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
-                {"role": "user", "content": sql_prompt}
-            ],
-            max_tokens=150,
-            temperature=0.0
-        )
+
+    return dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
+            {"role": "user", "content": sql_prompt}
+        ],
+        max_tokens=150,
+        temperature=0.0,
+        usage_label='sql_query'
+    )
+
+# Helper function to generate SQL query
+def generate_sql_query(user_intent, traits, key_phrases, query):
+    """
+    Generates a SQL SELECT query based on user intent, traits, and key phrases using OpenAI.
+    """
+    try:
+        response = create_chat_completion(**build_sql_query_request(user_intent, traits, key_phrases, query))
+        sql_response = response['choices'][0]['message']['content'].strip()
+        sql_query = extract_sql_from_response(sql_response)
+        if not sql_query:
+            logger.error("Failed to extract SQL query from OpenAI response.")
+            return None
+        logger.info(f"Generated SQL Query: {sql_query}")
+        # Validate SQL starts with SELECT
+        if not sql_query.upper().startswith("SELECT"):
+            logger.error("Invalid SQL query generated.")
+            return None
+        return sql_query
+    except Exception as e:
+        logger.error(f"Error generating SQL query: {e}")
+        return None
+
+# Awaitable helper function to generate SQL query
+async def generate_sql_query_async(user_intent, traits, key_phrases, query):
+    """
+    Awaitable counterpart of generate_sql_query, for the async OpenAI client's event loop.
+    """
+    try:
+        response = await async_openai.create(**build_sql_query_request(user_intent, traits, key_phrases, query))
         sql_response = response['choices'][0]['message']['content'].strip()
         sql_query = extract_sql_from_response(sql_response)
         if not sql_query:
@@ -1029,62 +1702,179 @@ def generate_sql_query(user_intent, traits, key_phrases, query):
         return None
 
 # Helper function to execute SQL query
-def execute_sql_query(sql_query):
+def execute_sql_query(sql_query, limit=None, offset=0, columns=None, state=None):
     """
-    Executes the SQL query against the zillow_data DataFrame.
+    Executes the SQL query against the persistent zillow_data table of the given data state
+    (the current one by default).
+    With a limit, only that many rows starting at offset are returned; with columns, only
+    those of them that the query selects.
     """
+    state = state or data_manager.state
+    query_engine, version = state['query_engine'], state['data_version']
     try:
-        result_df = psql.sqldf(sql_query, {'zillow_data': zillow_data})
-        result = result_df.to_dict(orient='records')
+        if columns is not None:
+            columns = available_columns(sql_query, columns, state)
+        if limit is None and columns is None:
+            result_df = query_engine.query(sql_query, version=version)
+        elif limit is None:
+            result_df = query_engine.query(f"SELECT {quote_columns(columns)} FROM ({strip_sql_terminator(sql_query)})",
+                                           version=version)
+        else:
+            result_df = query_engine.query(paginate_sql(sql_query, columns), (int(limit), int(offset)),
+                                           version=version)
+        result = frame_to_records(result_df)
         logger.info(f"SQL Query Executed Successfully. Number of Results: {len(result)}")
         return result
     except Exception as e:
         logger.error(f"Error executing SQL query: {e}")
         return None
 
-# Helper function to generate property keywords
-def generate_property_keywords(query, user_intent, traits, key_phrases, sql_query):
+# Helper function to keep the columns that a SQL query actually selects
+def available_columns(sql_query, columns, state):
     """
-    Generates property keywords based on the provided information using OpenAI.
+    Returns the given columns that the SQL query's result has, in order, so that a generated
+    query selecting only some columns can still be projected; None (all) if it has none of
+    them. Reads no rows.
+    """
+    selected = state['query_engine'].query(f"SELECT * FROM ({strip_sql_terminator(sql_query)}) LIMIT 0",
+                                           version=state['data_version']).columns
+    return [col for col in columns if col in selected] or None
+
+# Helper function to score candidate rows for relevance ranking
+def score_candidates(candidates: pd.DataFrame, traits: list, state: dict = None) -> np.ndarray:
+    """
+    Vectorized relevance score of every candidate row, from the traits decided locally (city,
+    beds, baths, price rules and known features), the price fit and the school ratings.
+    Traits only the model can decide score the same for every row.
+
+    Returns:
+    - np.ndarray: One score per row; higher is more relevant.
+    """
+    state = state or data_manager.state
+    trait_scores = np.zeros(len(candidates))
+    price_min = price_max = None
+    for trait in traits:
+        rule = parse_trait_rule(trait, state['unique_cities'])
+        if rule is not None:
+            verdicts = evaluate_trait_rule(candidates, rule)
+            price_min = rule.get('price_min', price_min)
+            price_max = rule.get('price_max', price_max)
+        else:
+            features = parse_feature_trait(trait)
+            if not features:
+                continue
+            verdicts = state['feature_index'].evaluate_ids(candidates['id'], features)
+        trait_scores += verdict_score(verdicts)
+
+    scores = RANK_TRAIT_WEIGHT * trait_scores / max(len(traits), 1)
+    scores += RANK_PRICE_WEIGHT * price_fit_score(candidates['price'], price_min, price_max)
+    scores += RANK_SCHOOL_WEIGHT * school_rating_score(candidates['school_ratings'])
+    return scores
+
+# Helper function to execute the SQL query and return one page of its rows by relevance
+def execute_ranked_query(sql_query, traits, limit, offset=0, columns=None):
+    """
+    Fetches only the ranking columns of every matching row, scores them, keeps the
+    offset + limit best with a partial sort and then fetches the rows of the requested page,
+    with only the given columns (all when None). Falls back to the SQL order when ranking is
+    disabled, the SQL has its own ORDER BY, or its result lacks the ranking columns.
     """
+    # One data state for every query and score of the page, even if the data is swapped meanwhile
+    state = data_manager.state
+    if not SEARCH_RANKING_ENABLED or has_order_by(sql_query):
+        return execute_sql_query(sql_query, limit, offset, columns, state)
+    base_sql = strip_sql_terminator(sql_query)
+    query_engine, version = state['query_engine'], state['data_version']
     try:
-        property_keywords_prompt = (
-            "Analyze the following real estate query, user intent, traits, key phrases, and SQL query to extract the values used for each column in the SQL statement."
-            " Do not miss any content or value from SQL."
-            " Format the output as a comma-separated list in the format 'Column: Value'. But don't add any extra piece of text."
-            " Ensure that each value corresponds accurately to the SQL query."
-            " IMPORTANT: Only give precise output in the format given without any additional text or tokens."
-            " If some location or keyword is incomplete, fill them with the most appropriate value from the data, e.g., replace 'redwood' with 'Redwood City'."
-            " Do not include any explanations or additional text.\n\n"
+        candidates = query_engine.query(f"SELECT {quote_columns(RANK_COLUMNS)} FROM ({base_sql})", version=version)
+    except Exception as e:
+        logger.info(f"Not ranking results ({e}); using SQL order.")
+        return execute_sql_query(sql_query, limit, offset, columns, state)
 
-            "### Query:\n"
-            f"\"{query}\"\n\n"
+    try:
+        start = time.perf_counter()
+        order = top_k_order(score_candidates(candidates, traits, state), offset + limit)[offset:]
+        page = candidates.iloc[order]
+        page_ids = [i.item() if hasattr(i, 'item') else i for i in page['id']]
+        if not page_ids:
+            return []
+        placeholders = ', '.join('?' for _ in page_ids)
+        if columns is not None:
+            columns = available_columns(sql_query, columns, state)
+        rows = query_engine.query(f'SELECT {quote_columns(columns)} FROM ({base_sql}) WHERE "id" IN ({placeholders})',
+                                  tuple(page_ids), version=version)
+        rows_by_id = {row['id']: row for row in frame_to_records(rows)}
+        result = [rows_by_id[i] for i in page_ids if i in rows_by_id]
+        logger.info(f"Ranked {len(candidates)} results in {time.perf_counter() - start:.3f}s; "
+                    f"returning {len(result)} from offset {offset}.")
+        return result
+    except Exception as e:
+        logger.error(f"Error executing ranked SQL query: {e}")
+        return None
 
-            "### User Intent:\n"
-            f"{user_intent}\n\n"
+# Helper function to count the rows matched by the generated SQL query
+def count_sql_query(sql_query):
+    """
+    Returns the total number of rows the SQL query matches, or None on error.
+    """
+    try:
+        state = data_manager.state
+        total = state['query_engine'].query(count_sql(sql_query), version=state['data_version'])['total']
+        return int(total.iloc[0])
+    except Exception as e:
+        logger.error(f"Error counting SQL query results: {e}")
+        return None
 
-            "### Traits:\n"
-            f"{', '.join(traits)}\n\n"
+# Helper function to build the OpenAI request for property keyword generation
+def build_property_keywords_request(query, user_intent, traits, key_phrases, sql_query) -> dict:
+    property_keywords_prompt = (
+        "Analyze the following real estate query, user intent, traits, key phrases, and SQL query to extract the values used for each column in the SQL statement."
+        " Do not miss any content or value from SQL."
+        " Format the output as a comma-separated list in the format 'Column: Value'. But don't add any extra piece of text."
+        " Ensure that each value corresponds accurately to the SQL query."
+        " IMPORTANT: Only give precise output in the format given without any additional text or tokens."
+        " If some location or keyword is incomplete, fill them with the most appropriate value from the data, e.g., replace 'redwood' with 'Redwood City'."
+        " Do not include any explanations or additional text.\n\n"
+
+        "### Query:\n"
+        f"\"{query}\"\n\n"
 
-            "### Key Phrases:\n"
-            f"{', '.join(key_phrases)}\n\n"
+        "### User Intent:\n"
+        f"{user_intent}\n\n"
 
-            "### SQL Query:\n"
-            f"{sql_query}\n\n"
+        "### Traits:\n"
+        f"{', '.join(traits)}\n\n"
 
-            "### PropertyKeywords:"
-        )
+        "### Key Phrases:\n"
+        f"{', '.join(key_phrases)}\n\n"
 
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
-                {"role": "user", "content": property_keywords_prompt}
-            ],
-            max_tokens=100,
-            temperature=0.0,
-            stop=["\n\n"]
-        )
+        "### SQL Query:\n"
+        f"{sql_query}\n\n"
+
+        "### PropertyKeywords:"
+    )
+
+    return dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are ChatGPT, a large language model trained by OpenAI."},
+            {"role": "user", "content": property_keywords_prompt}
+        ],
+        max_tokens=100,
+        temperature=0.0,
+        stop=["\n\n"],
+        usage_label='property_keywords'
+    )
+
+# Helper function to generate property keywords
+def generate_property_keywords(query, user_intent, traits, key_phrases, sql_query):
+    """
+    Generates property keywords based on the provided information using OpenAI.
+    """
+    try:
+        response = create_chat_completion(**build_property_keywords_request(
+            query, user_intent, traits, key_phrases, sql_query
+        ))
         property_keywords = response['choices'][0]['message']['content'].strip()
         if not property_keywords:
             property_keywords = "No keywords generated."
@@ -1094,108 +1884,613 @@ def generate_property_keywords(query, user_intent, traits, key_phrases, sql_quer
         logger.error(f"Error generating property keywords: {e}")
         return "No keywords generated."
 
-# Helper function to handle dynamic columns with dots logic
-def handle_dynamic_columns(result, traits):
+# Awaitable helper function to generate property keywords
+async def generate_property_keywords_async(query, user_intent, traits, key_phrases, sql_query):
     """
-    Adds dynamic columns to each record in the result based on traits.
-    Marks presence with '🟢', '🟡', or '⚪'.
+    Awaitable counterpart of generate_property_keywords, for the async OpenAI client's event loop.
     """
+    try:
+        response = await async_openai.create(**build_property_keywords_request(
+            query, user_intent, traits, key_phrases, sql_query
+        ))
+        property_keywords = response['choices'][0]['message']['content'].strip()
+        if not property_keywords:
+            property_keywords = "No keywords generated."
+        logger.info(f"Generated Property Keywords: {property_keywords}")
+        return property_keywords
+    except Exception as e:
+        logger.error(f"Error generating property keywords: {e}")
+        return "No keywords generated."
+
+# Helper function to choose unique column names for the trait columns
+def get_dynamic_column_names(result, traits):
+    column_names = []
+    existing_columns = set(result[0]) if result else set()
     for trait in traits:
         # Generate a concise column name from the trait
         column_name = extract_feature_from_trait(trait)
         # Ensure unique column names
         original_column_name = column_name
         counter = 1
-        while column_name in result[0]:
+        while column_name in existing_columns:
             column_name = f"{original_column_name}_{counter}"
             counter += 1
-        # Add dynamic column to result
-        for record in result:
-            # Use the 'is_trait_matched' function to determine the status
-            match_status = is_trait_matched(record, trait)
-            # Assign the appropriate colored dot
-            if match_status == 'yes':
-                record[column_name] = "🟢"
-            elif match_status == 'unsure':
-                record[column_name] = "🟡"
-            else:
-                record[column_name] = "⚪"
+        existing_columns.add(column_name)
+        column_names.append(column_name)
+    return column_names
+
+# Helper function to map a trait verdict to its colored dot
+def verdict_to_dot(match_status):
+    if match_status == 'yes':
+        return "🟢"
+    elif match_status == 'unsure':
+        return "🟡"
+    return "⚪"
+
+# Helper function to decide structural and feature traits locally
+def resolve_local_traits(result, traits):
+    """
+    Evaluates, vectorized over all records, the traits that the city, beds, baths and price
+    columns decide exactly (e.g. 'is in San Francisco', 'has 3 bed, 2 bath',
+    'is under $1,595,000') and the plain feature traits (e.g. 'has a swimming pool') that the
+    feature index over 'neighborhood_desc' decides. The index only decides the records whose
+    description mentions or negates the feature; the others are left to OpenAI.
+
+    Returns:
+    - dict: Position of each locally evaluated trait to its list of verdicts, one per record;
+      None for a record the trait could not be decided for.
+    """
+    if not TRAIT_RULES_ENABLED or not result:
+        return {}
+    local_verdicts = {}
+    state = data_manager.state
+
+    rules = {pos: parse_trait_rule(trait, state['unique_cities']) for pos, trait in enumerate(traits)}
+    rules = {pos: rule for pos, rule in rules.items() if rule is not None}
+    if rules:
+        records = pd.DataFrame.from_records(result, columns=['city', 'beds', 'baths', 'price'])
+        for pos, rule in rules.items():
+            local_verdicts[pos] = evaluate_trait_rule(records, rule).tolist()
+
+    for pos, trait in enumerate(traits):
+        if pos in local_verdicts:
+            continue
+        features = parse_feature_trait(trait)
+        if features:
+            local_verdicts[pos] = [
+                None if verdict == 'unsure' else verdict
+                for verdict in state['feature_index'].evaluate(result, features)
+            ]
+
+    if local_verdicts:
+        logger.info(f"Resolved {len(local_verdicts)} of {len(traits)} traits locally: "
+                    f"{[traits[pos] for pos in sorted(local_verdicts)]}")
+    return local_verdicts
+
+# Helper function to add the dots for some of the traits of one record
+def apply_trait_dots(result, idx, column_names, positions, record_verdicts, on_row=None):
+    dots = {
+        column_names[pos]: verdict_to_dot(match_status)
+        for pos, match_status in zip(positions, record_verdicts)
+    }
+    result[idx].update(dots)
+    if on_row:
+        on_row(idx, dots)
+
+# Helper function to add the locally decided dots and group the records by the traits left
+def apply_local_trait_dots(result, traits, column_names, on_row=None):
+    """
+    Adds the dots of the verdicts resolve_local_traits decides to every record, then groups
+    the records by the traits still to be evaluated by OpenAI.
+
+    Returns:
+    - list: (trait positions, record indexes) pairs, one per group of records that need the
+      same traits evaluated.
+    """
+    local_verdicts = resolve_local_traits(result, traits)
+    groups = {}
+    for idx in range(len(result)):
+        decided = [pos for pos in local_verdicts if local_verdicts[pos][idx] is not None]
+        if decided:
+            apply_trait_dots(result, idx, column_names, decided,
+                             [local_verdicts[pos][idx] for pos in decided], on_row)
+        remaining = tuple(pos for pos in range(len(traits)) if pos not in decided)
+        if remaining:
+            groups.setdefault(remaining, []).append(idx)
+    return list(groups.items())
+
+# Helper function to handle dynamic columns with dots logic
+def handle_dynamic_columns(result, traits, on_row=None):
+    """
+    Adds dynamic columns to each record in the result based on traits.
+    Marks presence with '🟢', '🟡', or '⚪'.
+    Structural traits, and feature traits the description settles, are decided locally
+    first; only the remaining (record, trait) pairs are sent to OpenAI.
+    If on_row is given, it is called with (index, {column: dot}) as dots are resolved.
+    """
+    column_names = get_dynamic_column_names(result, traits)
+
+    # Evaluate the remaining traits of each group of records using batched requests
+    for positions, indexes in apply_local_trait_dots(result, traits, column_names, on_row):
+        model_traits = [traits[pos] for pos in positions]
+        for group_idx, record_verdicts in iter_trait_verdicts([result[idx] for idx in indexes], model_traits):
+            apply_trait_dots(result, indexes[group_idx], column_names, positions, record_verdicts, on_row)
     return result
 
-# Route: /api/search
-@app.route('/api/search', methods=['POST'])
-def search():
+# Awaitable helper function to handle dynamic columns with dots logic
+async def handle_dynamic_columns_async(result, traits, on_row=None):
     """
-    Comprehensive search endpoint that takes a user query, extracts information, generates SQL,
-    executes SQL, generates property keywords, and compiles the response.
+    Awaitable counterpart of handle_dynamic_columns. The local (pandas) trait evaluation runs
+    in the loop's default executor.
     """
-    data = request.get_json()
-    query = data.get('query', '').strip()
+    column_names = get_dynamic_column_names(result, traits)
+
+    groups = await asyncio.to_thread(apply_local_trait_dots, result, traits, column_names, on_row)
+    for positions, indexes in groups:
+        model_traits = [traits[pos] for pos in positions]
+        async for group_idx, record_verdicts in iter_trait_verdicts_async([result[idx] for idx in indexes],
+                                                                          model_traits):
+            apply_trait_dots(result, indexes[group_idx], column_names, positions, record_verdicts, on_row)
+    return result
 
-    if not query:
-        return jsonify({'error': 'No query provided.'}), 400
+# Helper function to build the /api/search stage pipeline for a query
+def build_search_pipeline(query, data_version, on_stage_complete=None, on_row=None, use_async=False,
+                          offset=0, page_size=SEARCH_PAGE_SIZE, plan=None, fields=SEARCH_DEFAULT_FIELDS):
+    """
+    Registers the search stages for one page of a query. Later pages reuse the plan (intent,
+    traits, key phrases, SQL, property keywords and result count) cached for the first one.
+    Structured queries are answered by the local parser and paraphrases of earlier queries by
+    the semantic cache; otherwise the LLM stages run. Only the rows of the requested page are
+    fetched and have their traits evaluated, and only with the requested fields and the
+    columns their traits need.
+    With use_async, the stages return awaitables and the pipeline must be run with run_async()
+    on the async OpenAI client's event loop.
 
-    try:
+    Returns:
+    - tuple: (Pipeline, whether the intent/traits/key phrases/SQL were prefilled without the LLM)
+    """
+    pipeline = Pipeline(name='/api/search', max_workers=SEARCH_PIPELINE_WORKERS,
+                        on_stage_complete=on_stage_complete)
+
+    if use_async:
+        user_intent_fn, traits_fn, key_phrases_fn = (
+            extract_user_intent_async, extract_traits_async, extract_key_phrases_async
+        )
+        sql_query_fn, property_keywords_fn = generate_sql_query_async, generate_property_keywords_async
+        # The SQLite queries are short but blocking, so they run in the loop's default executor
+        execute_fn = functools.partial(asyncio.to_thread, execute_ranked_query)
+        count_fn = functools.partial(asyncio.to_thread, count_sql_query)
+        dynamic_columns_fn = handle_dynamic_columns_async
+    else:
+        user_intent_fn, traits_fn, key_phrases_fn = extract_user_intent, extract_traits, extract_key_phrases
+        sql_query_fn, property_keywords_fn = generate_sql_query, generate_property_keywords
+        execute_fn = execute_ranked_query
+        count_fn = count_sql_query
+        dynamic_columns_fn = handle_dynamic_columns
+
+    if plan is not None:
+        for stage in ['user_intent', 'traits', 'key_phrases', 'sql_query', 'property_keywords', 'total_results']:
+            pipeline.add_stage(stage, lambda value=plan[stage]: value)
+        add_page_stages(pipeline, execute_fn, dynamic_columns_fn, on_row, offset, page_size, fields)
+        return pipeline, True
+
+    # Purely structured queries are parsed locally; others escalate to the LLM stages
+    parsed = parse_structured_query(query, data_manager.state['unique_cities'])
+    if parsed is not None and parsed['confidence'] < FAST_PATH_MIN_CONFIDENCE:
+        logger.info(f"Fast path confidence {parsed['confidence']} too low; using LLM pipeline.")
+        parsed = None
+
+    # Near-duplicate queries reuse the intent, traits, key phrases and SQL of an earlier query
+    similar = semantic_cache.lookup(query, data_version) if parsed is None else None
+
+    prefilled = parsed or similar
+    if prefilled is not None:
+        for stage in ['user_intent', 'traits', 'key_phrases', 'sql_query']:
+            pipeline.add_stage(stage, lambda value=prefilled[stage]: value)
+    else:
         # Step 1: Extract User Intent
-        user_intent = extract_user_intent(query)
-        if not user_intent:
-            return jsonify({'error': 'Failed to extract user intent.'}), 500
+        pipeline.add_stage(
+            'user_intent', lambda: user_intent_fn(query),
+            error_message='Failed to extract user intent.'
+        )
 
         # Step 2: Extract Traits
-        traits = extract_traits(user_intent, query)
-        if not traits:
-            return jsonify({'error': 'Failed to extract traits.'}), 500
+        pipeline.add_stage(
+            'traits', lambda user_intent: traits_fn(user_intent, query),
+            deps=['user_intent'], error_message='Failed to extract traits.'
+        )
 
         # Step 3: Extract Key Phrases
-        key_phrases = extract_key_phrases(user_intent, traits, query)
-        if not key_phrases:
-            return jsonify({'error': 'Failed to extract key phrases.'}), 500
+        pipeline.add_stage(
+            'key_phrases', lambda user_intent, traits: key_phrases_fn(user_intent, traits, query),
+            deps=['user_intent', 'traits'], error_message='Failed to extract key phrases.'
+        )
 
         # Step 4: Generate SQL Query
-        sql_query = generate_sql_query(user_intent, traits, key_phrases, query)
-        if not sql_query:
-            return jsonify({'error': 'Failed to generate SQL query.'}), 500
+        pipeline.add_stage(
+            'sql_query',
+            lambda user_intent, traits, key_phrases: sql_query_fn(user_intent, traits, key_phrases, query),
+            deps=['user_intent', 'traits', 'key_phrases'], error_message='Failed to generate SQL query.'
+        )
 
-        # Step 5: Execute SQL Query
-        result = execute_sql_query(sql_query)
-        if result is None:
-            return jsonify({'error': 'Failed to execute SQL query.'}), 500
+    # Step 5: Count the SQL Query Results
+    pipeline.add_stage('total_results', count_fn, deps=['sql_query'])
 
-        # Step 6: Generate Property Keywords
-        property_keywords = generate_property_keywords(query, user_intent, traits, key_phrases, sql_query)
+    # Step 5b: Generate Property Keywords (runs alongside SQL execution and trait matching)
+    if parsed is not None:
+        pipeline.add_stage('property_keywords', lambda: parsed['property_keywords'])
+    else:
+        pipeline.add_stage(
+            'property_keywords',
+            lambda user_intent, traits, key_phrases, sql_query: property_keywords_fn(
+                query, user_intent, traits, key_phrases, sql_query
+            ),
+            deps=['user_intent', 'traits', 'key_phrases', 'sql_query']
+        )
 
-        # Step 7: Handle Dynamic Columns with Dots Logic
+    add_page_stages(pipeline, execute_fn, dynamic_columns_fn, on_row, offset, page_size, fields)
+    return pipeline, prefilled is not None
+
+# Helper function to register the stages that fetch one page of results and evaluate its traits
+def add_page_stages(pipeline, execute_fn, dynamic_columns_fn, on_row, offset, page_size, fields):
+    # Step 6: Execute SQL Query and rank its rows for the requested page
+    pipeline.add_stage(
+        'result',
+        lambda sql_query, traits: execute_fn(sql_query, traits, page_size, offset, fetch_columns(fields, traits)),
+        deps=['sql_query', 'traits'], error_message='Failed to execute SQL query.',
+        validate=lambda result: result is not None
+    )
+
+    # Step 7: Handle Dynamic Columns with Dots Logic
+    def dynamic_columns_stage(result, traits):
         if result:
-            result = handle_dynamic_columns(result, traits)
+            return dynamic_columns_fn(result, traits, on_row)
+        logger.info("No results to process for dynamic columns.")
+        return result
+
+    pipeline.add_stage('dynamic_result', dynamic_columns_stage, deps=['result', 'traits'])
+
+# Helper function to compile and cache the /api/search response
+def compile_search_response(query, stages, timings, prefilled, data_version, offset=0, page_size=SEARCH_PAGE_SIZE,
+                            fields=SEARCH_DEFAULT_FIELDS):
+    """
+    Builds the response for one page of a search from the pipeline stage results and stores
+    it in the whole-query cache, together with the plan later pages reuse (and, for
+    LLM-generated stages, in the semantic cache).
+    """
+    traits = stages['traits']
+
+    # Step 8: Extract Dynamic Columns
+    dynamic_columns = [extract_feature_from_trait(trait) for trait in traits]
+
+    # Step 9: Compile Response
+    response = OrderedDict()
+    response['query'] = query
+    response['user_intent'] = stages['user_intent']
+    response['traits'] = traits
+    response['key_phrases'] = stages['key_phrases']
+    response['property_keywords'] = stages['property_keywords']
+    response['sql_query'] = stages['sql_query']
+    response['result'] = project_records(stages['dynamic_result'], fields)
+    # After handle_dynamic_columns
+    response['dynamic_columns'] = dynamic_columns
+    response['page'] = page_info(offset, page_size, stages['total_results'])
+    response['timings'] = timings
+    response['cached'] = False
+
+    cache.set(search_cache_key(query, data_version, offset, page_size, fields_key(fields)), response,
+              timeout=SEARCH_CACHE_TIMEOUT)
+    cache.set(search_cache_key(query, data_version, 'plan'), {
+        stage: stages[stage]
+        for stage in ['user_intent', 'traits', 'key_phrases', 'sql_query', 'property_keywords', 'total_results']
+    }, timeout=SEARCH_CACHE_TIMEOUT)
+    if not prefilled:
+        semantic_cache.add(query, {
+            'user_intent': stages['user_intent'],
+            'traits': traits,
+            'key_phrases': stages['key_phrases'],
+            'sql_query': stages['sql_query'],
+        }, data_version)
+    return response
+
+# Helper function to report the timings of a response served from the whole-query cache
+def cache_hit_timings(start: float) -> dict:
+    """
+    Timings of a cache hit, measured from start (time.perf_counter()), in place of the stored
+    timings of the run that produced the cached response.
+    """
+    elapsed = round(time.perf_counter() - start, 3)
+    return {'cache_lookup': elapsed, 'total': elapsed}
+
+# Helper function to read the requested results page from a search request
+def parse_search_page(data: dict) -> tuple:
+    """
+    Read 'page_token' (from a previous response's 'page.next_page_token') or 'page_size'.
+
+    Returns:
+    - tuple: (offset, page size)
+
+    Raises:
+    - ValueError: If the token or page size is invalid.
+    """
+    if data.get('page_token'):
+        offset, page_size = decode_page_token(str(data['page_token']))
+    else:
+        offset = 0
+        try:
+            page_size = int(data.get('page_size') or SEARCH_PAGE_SIZE)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid page_size.")
+        if page_size <= 0:
+            raise ValueError("Invalid page_size.")
+    return offset, min(page_size, SEARCH_MAX_PAGE_SIZE)
+
+# Helper function to read the requested result fields from a search request
+def parse_search_fields(data: dict) -> list:
+    """
+    Read 'fields': a list or comma-separated string of listing columns, or '*' for all.
+
+    Returns:
+    - list: The requested columns, SEARCH_DEFAULT_FIELDS when absent, or None for all columns.
+
+    Raises:
+    - ValueError: If a field is not a listing column.
+    """
+    fields = data.get('fields')
+    if fields is None:
+        return SEARCH_DEFAULT_FIELDS
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    if not isinstance(fields, list):
+        raise ValueError("Invalid fields.")
+    fields = [str(field).strip() for field in fields if str(field).strip()]
+    if not fields:
+        return SEARCH_DEFAULT_FIELDS
+    if '*' in fields:
+        return None
+    columns = data_manager.state['zillow_data'].columns
+    unknown = [field for field in fields if field not in columns]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}.")
+    return list(dict.fromkeys(fields))
+
+# Helper function to name a set of result fields in cache keys
+def fields_key(fields) -> str:
+    return '*' if fields is None else ','.join(fields)
+
+# Helper function to list the columns to fetch for a results page
+def fetch_columns(fields, traits):
+    """
+    Returns the requested fields plus the columns that trait matching reads: 'id', the
+    city/beds/baths/price columns for rule-based traits and every trait-relevant column for
+    traits that may go to OpenAI (feature traits do for listings whose description does not
+    settle them). None (all columns) when all fields were requested.
+    """
+    if fields is None:
+        return None
+    columns = ['id'] + list(fields)
+    cities = data_manager.state['unique_cities']
+    for trait in traits:
+        if TRAIT_RULES_ENABLED and parse_trait_rule(trait, cities) is not None:
+            columns += ['city', 'beds', 'baths', 'price']
         else:
-            logger.info("No results to process for dynamic columns.")
+            columns += TRAIT_RELEVANT_COLUMNS
+    return list(dict.fromkeys(columns))
 
-        # Step 8: Sanitize Data
-        sanitized_result = sanitize_data(result)
+# Helper function to drop the columns fetched only for trait matching from the results
+def project_records(records, fields):
+    """
+    Returns a copy of each record with only the requested listing columns (all when fields
+    is None) and its trait dot columns.
+    """
+    if fields is None:
+        return [dict(record) for record in records]
+    hidden = set(data_manager.state['zillow_data'].columns) - set(fields)
+    return [{key: value for key, value in record.items() if key not in hidden} for record in records]
 
-        # Step 9: Extract Dynamic Columns
-        dynamic_columns = [extract_feature_from_trait(trait) for trait in traits]
+# Helper function to run a search with the async OpenAI client
+async def run_search_async(query, offset=0, page_size=SEARCH_PAGE_SIZE, fields=SEARCH_DEFAULT_FIELDS):
+    """
+    Serves one page of the query from the whole-query cache or runs the search pipeline with
+    awaitable stages. Must run on the async OpenAI client's event loop.
 
+    Returns:
+    - tuple: (response dict, HTTP status code)
+    """
+    # Serve repeated queries from the whole-query cache
+    data_version = data_manager.state['data_version']
+    start = time.perf_counter()
+    cached_response = await asyncio.to_thread(
+        cache.get, search_cache_key(query, data_version, offset, page_size, fields_key(fields))
+    )
+    if cached_response is not None:
+        logger.info(f"Search cache hit for query: {query}")
+        cached_response['query'] = query
+        cached_response['timings'] = cache_hit_timings(start)
+        cached_response['cached'] = True
+        return cached_response, 200
+
+    plan = await asyncio.to_thread(cache.get, search_cache_key(query, data_version, 'plan'))
+    # The local parser and the semantic cache lookup are CPU-bound
+    pipeline, prefilled = await asyncio.to_thread(functools.partial(
+        build_search_pipeline, query, data_version, use_async=True,
+        offset=offset, page_size=page_size, plan=plan, fields=fields
+    ))
+    try:
+        stages = await pipeline.run_async()
+    except StageFailed as e:
+        return {'error': e.message}, 500
 
+    # Projection and the cache writes are blocking, so they run off the event loop
+    response = await asyncio.to_thread(compile_search_response, query, stages, pipeline.timings, prefilled,
+                                       data_version, offset, page_size, fields)
+    return response, 200
 
-        # Step 9: Compile Response
-        response = OrderedDict()
-        response['query'] = query
-        response['user_intent'] = user_intent
-        response['traits'] = traits
-        response['key_phrases'] = key_phrases
-        response['property_keywords'] = property_keywords
-        response['sql_query'] = sql_query
-        response['result'] = sanitized_result
-        # After handle_dynamic_columns
-        response['dynamic_columns'] = dynamic_columns
+# Load data at startup
+data_manager.reload()
 
-        return jsonify(response), 200
+# Start this worker's data file watcher with its first request (after any fork)
+@app.before_request
+def start_data_watcher():
+    data_manager.start_watcher()
+
+# Responses smaller than this many bytes are sent uncompressed; COMPRESSION_LEVEL is the gzip
+# level (1-9) or brotli quality
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "5"))
+
+# Add ETags to GET responses, answer matching conditional requests with 304 and compress bodies
+@app.after_request
+def finalize_response(response):
+    """
+    GET responses get a weak ETag hashed from their uncompressed body, so a repeated request
+    with If-None-Match is answered with an empty 304. Bodies of at least COMPRESSION_MIN_SIZE
+    bytes are then compressed with brotli (when installed) or gzip, as the client's
+    Accept-Encoding allows. Streamed responses (e.g. /api/search/stream) are left alone.
+    """
+    if response.is_streamed or response.direct_passthrough:
+        return response
+    try:
+        if request.method == 'GET' and response.status_code == 200:
+            response.add_etag(weak=True)
+            response = response.make_conditional(request)
+
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+        response.vary.add('Accept-Encoding')
+        if (response.status_code != 200 or 'Content-Encoding' in response.headers
+                or response.content_length is None or response.content_length < COMPRESSION_MIN_SIZE):
+            return response
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+        response.set_data(compress_body(response.get_data(), encoding, COMPRESSION_LEVEL))
+        response.headers['Content-Encoding'] = encoding
+    except Exception as e:
+        logger.error(f"Error finalizing response: {e}")
+    return response
+
+# Route: /api/search
+@app.route('/api/search', methods=['POST'])
+async def search():
+    """
+    Comprehensive search endpoint that takes a user query, extracts information, generates SQL,
+    executes SQL, generates property keywords, and compiles the response.
+    The OpenAI calls are awaited on the shared async client, so they do not hold a thread each.
+    Results are paginated: optional 'page_size', or 'page_token' from the previous response's
+    'page.next_page_token' to fetch the next page. Optional 'fields' picks the listing columns
+    of each result (default SEARCH_DEFAULT_FIELDS, '*' for all).
+    """
+    data = request.get_json()
+    query = data.get('query', '').strip()
+
+    if not query:
+        return jsonify({'error': 'No query provided.'}), 400
+    try:
+        offset, page_size = parse_search_page(data)
+        fields = parse_search_fields(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        response, status = await async_openai.run(run_search_async(query, offset, page_size, fields))
+        return jsonify(response), status
 
     except Exception as e:
         logger.error(f"Unhandled exception in /api/search: {e}")
         return jsonify({'error': 'Internal server error.'}), 500
 
+# Helper function to format a Server-Sent Event
+def format_sse(event, data):
+    return f"event: {event}\ndata: {app.json.dumps(data)}\n\n"
+
+# Route: /api/search/stream
+@app.route('/api/search/stream', methods=['POST'])
+def search_stream():
+    """
+    Streaming variant of /api/search using Server-Sent Events.
+    Emits 'intent', 'traits', 'key_phrases', 'sql', 'rows' and 'property_keywords' as each
+    stage finishes, 'page' once the total number of results is known, then one 'trait_row'
+    event per property of the page as its trait dots resolve, and finally 'done' (or 'error').
+    Expects JSON payload with 'query' field, and optionally 'page_size' or 'page_token' and 'fields'.
+    """
+    data = request.get_json()
+    query = data.get('query', '').strip()
+
+    if not query:
+        return jsonify({'error': 'No query provided.'}), 400
+    try:
+        offset, page_size = parse_search_page(data)
+        fields = parse_search_fields(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        data_version = data_manager.state['data_version']
+        start = time.perf_counter()
+        cached_response = cache.get(search_cache_key(query, data_version, offset, page_size, fields_key(fields)))
+        if cached_response is not None:
+            logger.info(f"Search cache hit for query: {query}")
+            yield format_sse('intent', {'user_intent': cached_response['user_intent']})
+            yield format_sse('traits', {'traits': cached_response['traits'],
+                                        'dynamic_columns': cached_response['dynamic_columns']})
+            yield format_sse('key_phrases', {'key_phrases': cached_response['key_phrases']})
+            yield format_sse('sql', {'sql_query': cached_response['sql_query']})
+            yield format_sse('property_keywords', {'property_keywords': cached_response['property_keywords']})
+            yield format_sse('rows', {'result': cached_response['result']})
+            yield format_sse('page', cached_response['page'])
+            yield format_sse('done', {'timings': cache_hit_timings(start), 'cached': True})
+            return
+
+        events = queue.Queue()
+
+        def on_stage_complete(name, value):
+            if name == 'user_intent':
+                events.put(('intent', {'user_intent': value}))
+            elif name == 'traits':
+                events.put(('traits', {'traits': value,
+                                       'dynamic_columns': [extract_feature_from_trait(trait) for trait in value]}))
+            elif name == 'key_phrases':
+                events.put(('key_phrases', {'key_phrases': value}))
+            elif name == 'sql_query':
+                events.put(('sql', {'sql_query': value}))
+            elif name == 'property_keywords':
+                events.put(('property_keywords', {'property_keywords': value}))
+            elif name == 'result':
+                # Copy the rows before trait matching starts adding columns to them
+                events.put(('rows', {'result': project_records(value, fields)}))
+            elif name == 'total_results':
+                events.put(('page', page_info(offset, page_size, value)))
+
+        def on_row(idx, dots):
+            events.put(('trait_row', {'index': idx, 'values': dots}))
+
+        def run_pipeline():
+            try:
+                plan = cache.get(search_cache_key(query, data_version, 'plan'))
+                pipeline, prefilled = build_search_pipeline(query, data_version, on_stage_complete, on_row,
+                                                            offset=offset, page_size=page_size, plan=plan,
+                                                            fields=fields)
+                stages = pipeline.run()
+                compile_search_response(query, stages, pipeline.timings, prefilled, data_version,
+                                        offset, page_size, fields)
+                events.put(('done', {'timings': pipeline.timings, 'cached': False}))
+            except StageFailed as e:
+                events.put(('error', {'error': e.message}))
+            except Exception as e:
+                logger.error(f"Unhandled exception in /api/search/stream: {e}")
+                events.put(('error', {'error': 'Internal server error.'}))
+
+        threading.Thread(target=run_pipeline, daemon=True).start()
+        while True:
+            event, payload = events.get()
+            yield format_sse(event, payload)
+            if event in ('done', 'error'):
+                return
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 
 
 # # Route: /api/save_search
@@ -1397,6 +2692,7 @@ def get_broker_details_route():
     """
     Retrieve broker details based on the provided zip code.
     Expects 'zip_code' as a query parameter.
+    Responses are rendered when the data is loaded (see build_broker_index).
     """
     zip_code = request.args.get('zip_code', '').strip()
 
@@ -1404,35 +2700,65 @@ def get_broker_details_route():
         return jsonify({'error': 'No zip_code provided.'}), 400
 
     try:
-        # Filter brokers by zip code
-        filtered_brokers = broker_data[broker_data['zip_code'] == zip_code]
+        # Look up the pre-serialized brokers of the zip code
+        body = data_manager.state['broker_index'].get(zip_code)
 
-        if filtered_brokers.empty:
+        if body is None:
             logger.info(f"No brokers found for zip code: {zip_code}")
             return jsonify({'message': f'No brokers found for zip code: {zip_code}'}), 404
 
-        # Select and rename columns for better readability
-        display_brokers = filtered_brokers.rename(columns={
-            'broker': 'Broker Name',
-            'zip_code': 'Zip Code',
-            'city': 'City',
-            'state': 'State',
-            'reviews': 'Reviews',
-            'recent_homes_sold': 'Recent Homes Sold',
-            'negotiations_done': 'Negotiations Done',
-            'years_of_experience': 'Years of Experience',
-            'rating': 'Rating'
-        })[['Broker Name', 'City', 'State', 'Zip Code', 'Reviews', 'Recent Homes Sold', 'Negotiations Done', 'Years of Experience', 'Rating']]
+        return app.response_class(body, status=200, mimetype=app.json.mimetype)
 
-        # Convert to list of dictionaries
-        brokers_list = display_brokers.to_dict(orient='records')
-
-        return jsonify({'brokers': brokers_list}), 200
 
     except Exception as e:
         logger.error(f"Error retrieving broker details: {e}")
         return jsonify({'error': 'Internal server error.'}), 500
 
+# Route: /api/cache_stats
+@app.route('/api/cache_stats', methods=['GET'])
+def cache_stats_route():
+    """
+    Report hit/miss counters for the trait-verdict cache and OpenAI token usage per call type
+    of this worker process.
+    """
+    return jsonify({
+        'trait_cache': trait_cache.stats(),
+        'token_usage': token_usage.stats(),
+        'data': data_manager.stats()
+    }), 200
+
+# Route: /api/admin/reload
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload_route():
+    """
+    Reload the listings and broker data in the background without restarting the worker.
+    Requires the 'X-Admin-Token' header to match ADMIN_TOKEN; without a configured token only
+    local requests are accepted. Optional JSON payload: 'force' (true to reload even if the
+    files look unchanged) and 'wait' (true to respond once the reload finished), both JSON
+    booleans defaulting to false.
+    Other workers pick up changed files with their own watchers.
+    """
+    if ADMIN_TOKEN:
+        token = request.headers.get('X-Admin-Token', '')
+        if not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+            return jsonify({'error': 'Forbidden.'}), 403
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify({'error': 'Forbidden.'}), 403
+
+    data = request.get_json(silent=True) or {}
+    force, wait = data.get('force', False), data.get('wait', False)
+    if not isinstance(force, bool) or not isinstance(wait, bool):
+        return jsonify({'error': "'force' and 'wait' must be booleans."}), 400
+    try:
+        if wait:
+            reloaded = data_manager.reload(force=force)
+            return jsonify({'reloaded': reloaded, **data_manager.stats()}), 200
+        data_manager.reload_in_background(force=force)
+        return jsonify({'status': 'reloading', **data_manager.stats()}), 202
+    except Exception as e:
+        logger.error(f"Error reloading data: {e}")
+        return jsonify({'error': 'Internal server error.'}), 500
+
 # Route: /api/save_to_txt
 @app.route('/api/save_to_txt', methods=['POST'])
 def save_to_txt_route():
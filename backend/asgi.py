@@ -0,0 +1,93 @@
+# backend/asgi.py
+
+"""
+ASGI entry point.
+
+POST /api/search is served natively on the event loop and awaits the async OpenAI client,
+so a single worker can hold many searches in flight at once. Every other route is handed
+to the Flask app through asgiref's WSGI adapter.
+
+Run from the backend folder with:
+    uvicorn asgi:application --port 5001
+"""
+
+import json
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import (
+    app, async_openai, data_manager, parse_search_fields, parse_search_page, run_search_async, logger,
+    COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE
+)
+from utils.compression import choose_encoding, compress_body
+
+flask_application = WsgiToAsgi(app)
+
+# Helper function to read the full request body from the ASGI receive channel
+async def read_body(receive) -> bytes:
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+# Helper function to read a request header from the ASGI scope
+def get_header(scope, name: bytes) -> str:
+    for key, value in scope.get('headers', []):
+        if key.lower() == name:
+            return value.decode('latin-1')
+    return ''
+
+# Helper function to send a JSON response, serialized and compressed like the Flask app's
+async def send_json(send, payload, status: int, accept_encoding: str = ''):
+    body = app.json.dumps(payload).encode('utf-8')
+    headers = [
+        (b'content-type', b'application/json'),
+        (b'access-control-allow-origin', b'*'),
+        (b'vary', b'Accept-Encoding'),
+    ]
+    encoding = choose_encoding(accept_encoding) if len(body) >= COMPRESSION_MIN_SIZE else None
+    if encoding is not None:
+        body = compress_body(body, encoding, COMPRESSION_LEVEL)
+        headers.append((b'content-encoding', encoding.encode('ascii')))
+    headers.append((b'content-length', str(len(body)).encode('ascii')))
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': headers,
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+# Route: /api/search (native ASGI)
+async def search(scope, receive, send):
+    try:
+        data = json.loads(await read_body(receive) or b'{}')
+        query = str(data.get('query', '')).strip()
+    except (ValueError, AttributeError):
+        data, query = {}, ''
+
+    if not query:
+        await send_json(send, {'error': 'No query provided.'}, 400)
+        return
+    try:
+        offset, page_size = parse_search_page(data)
+        fields = parse_search_fields(data)
+    except ValueError as e:
+        await send_json(send, {'error': str(e)}, 400)
+        return
+
+    try:
+        response, status = await async_openai.run(run_search_async(query, offset, page_size, fields))
+    except Exception as e:
+        logger.error(f"Unhandled exception in /api/search: {e}")
+        response, status = {'error': 'Internal server error.'}, 500
+    await send_json(send, response, status, get_header(scope, b'accept-encoding'))
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['method'] == 'POST' and scope['path'] == '/api/search':
+        # Flask's before_request hooks do not run on this route
+        data_manager.start_watcher()
+        await search(scope, receive, send)
+    else:
+        await flask_application(scope, receive, send)
@@ -0,0 +1,37 @@
+# backend/build_snapshot.py
+
+"""
+Offline build step for the listings snapshot.
+
+Parses and preprocesses Zillow_Data.csv once and writes the binary snapshot that app.py
+loads at startup instead of the CSV, together with a sidecar holding the CSV's SHA-256.
+Run from the backend folder, e.g. as part of a deploy:
+    python build_snapshot.py
+"""
+
+import os
+import time
+import logging
+import argparse
+
+from utils.data_utils import load_zillow_data, schema_version, ZILLOW_SCHEMA
+from utils.snapshot import write_snapshot
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the binary snapshot of the Zillow listings data.")
+    parser.add_argument('--csv', default='data/Zillow_Data.csv', help="Path to the source CSV.")
+    parser.add_argument('--out', default=os.getenv("ZILLOW_SNAPSHOT_PATH", "data/snapshots/Zillow_Data.snapshot"),
+                        help="Path of the snapshot to write.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_zillow_data(args.csv)
+    meta = write_snapshot(df, args.out, args.csv, schema=schema_version(ZILLOW_SCHEMA))
+    logger.info(f"Built {meta['format']} snapshot of {meta['rows']} rows from {args.csv} "
+                f"(sha256 {meta['source_sha256'][:12]}) in {time.perf_counter() - start:.2f}s.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+# backend/gunicorn.conf.py
+
+"""
+Gunicorn settings for running several worker processes on one host.
+
+The app is imported once in the master (preload_app) before the workers are forked, so the
+listings DataFrame, the feature index and the other lookup tables are built once and shared
+copy-on-write, and the listings SQLite file (QUERY_ENGINE_PATH, on /dev/shm by default) is
+memory-mapped by every worker from the same page cache.
+
+Run from the backend folder with:
+    gunicorn -c gunicorn.conf.py app:app
+"""
+
+import gc
+import os
+import multiprocessing
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5001")
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = True
+
+# Master hook: runs once the preloaded app is ready, before any worker is forked
+def when_ready(server):
+    # Collect import-time garbage and move every surviving object into the permanent
+    # generation, so the workers' cyclic GC never touches (and un-shares) those pages
+    gc.collect()
+    gc.freeze()
+
+# Master hook: runs before each fork, including workers restarted later
+def pre_fork(server, worker):
+    gc.freeze()
@@ -0,0 +1,6 @@
+# The backend modules import each other as top-level packages ('from utils... import'), as
+# when run from the backend folder
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,20 @@
+import gzip
+
+from utils.compression import choose_encoding, compress_body, supported_encodings
+
+def test_chooses_a_supported_encoding():
+    assert choose_encoding('gzip, deflate') == 'gzip'
+    assert choose_encoding('*') == supported_encodings()[0]
+
+def test_refused_or_missing_encodings():
+    assert choose_encoding(None) is None
+    assert choose_encoding('') is None
+    assert choose_encoding('identity') is None
+    assert choose_encoding('gzip;q=0, deflate') is None
+
+def test_gzip_round_trips_and_is_deterministic():
+    body = b'{"result": []}' * 100
+    compressed = compress_body(body, 'gzip')
+    assert gzip.decompress(compressed) == body
+    assert compress_body(body, 'gzip') == compressed
+    assert len(compressed) < len(body)
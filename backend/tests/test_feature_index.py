@@ -0,0 +1,36 @@
+import pandas as pd
+
+from utils.feature_index import FeatureIndex, parse_feature_trait
+
+LISTINGS = pd.DataFrame({
+    'id': [1, 2, 3, 4, 5],
+    'neighborhood_desc': [
+        'Sparkling swimming pool and a cozy fireplace.',
+        'No pool, but a large garage.',
+        'Close to the Community Pool and parks.',
+        None,
+        'Hardwood floors throughout.',
+    ],
+})
+
+def test_parses_feature_only_traits():
+    assert parse_feature_trait("has a swimming pool") == ['pool']
+    assert parse_feature_trait("has hardwood floors and a fireplace") == ['fireplace', 'hardwood floors']
+    assert parse_feature_trait("has a big pool") is None
+    assert parse_feature_trait("is in Irvine") is None
+
+def test_mentions_negations_and_proximity_clauses():
+    index = FeatureIndex(LISTINGS)
+    assert index.evaluate_ids([1, 2, 3, 4, 5], ['pool']).tolist() == ['yes', 'no', 'unsure', 'unsure', 'unsure']
+
+def test_every_feature_is_required():
+    index = FeatureIndex(LISTINGS)
+    assert index.evaluate_ids([1, 2], ['pool', 'fireplace']).tolist() == ['yes', 'no']
+
+def test_unknown_ids_are_unsure():
+    index = FeatureIndex(LISTINGS)
+    assert index.evaluate([{'id': 99}, {'id': 1}], ['pool']) == ['unsure', 'yes']
+
+def test_missing_columns_build_an_empty_index():
+    index = FeatureIndex(LISTINGS.drop(columns=['neighborhood_desc']))
+    assert index.evaluate_ids([1], ['pool']).tolist() == ['unsure']
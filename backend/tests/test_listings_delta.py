@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+from utils.data_utils import diff_by_id
+from utils.feature_index import FeatureIndex
+from utils.query_engine import QueryEngine
+
+def listings(rows):
+    return pd.DataFrame(rows, columns=['id', 'price', 'city', 'neighborhood_desc'])
+
+OLD = listings([
+    (1, 500000, 'Irvine', 'Sunny yard with a pool.'),
+    (2, 750000, 'Irvine', 'Cozy fireplace.'),
+    (3, 900000, 'Tustin', 'No garage.'),
+])
+NEW = listings([
+    (1, 500000, 'Irvine', 'Sunny yard with a pool.'),
+    (2, 725000, 'Irvine', 'Cozy fireplace, no pool.'),
+    (4, 650000, 'Tustin', 'Pool and garage.'),
+])
+
+def engine_rows(engine):
+    return engine.query('SELECT * FROM zillow_data ORDER BY id').to_dict(orient='records')
+
+def test_diff_by_id_finds_changed_added_and_deleted_ids():
+    delta = diff_by_id(OLD, NEW)
+    assert delta['updated'] == [2]
+    assert delta['inserted'] == [4]
+    assert delta['deleted'] == [3]
+    assert delta['upserts']['id'].tolist() == [2, 4]
+
+def test_diff_by_id_rejects_tables_it_cannot_diff():
+    assert diff_by_id(OLD, NEW.drop(columns=['city'])) is None
+    assert diff_by_id(OLD, pd.concat([NEW, NEW.head(1)])) is None
+
+def test_apply_delta_matches_a_full_load(tmp_path):
+    delta = diff_by_id(OLD, NEW)
+    base = QueryEngine(path=str(tmp_path / 'v1.sqlite3'))
+    base.load(OLD, version='v1')
+    engine = QueryEngine(path=str(tmp_path / 'v2.sqlite3'))
+
+    assert engine.apply_delta(delta['upserts'], delta['deleted'], version='v2', base_version='v1', base=base)
+    assert engine.current_version() == 'v2'
+    assert engine_rows(engine) == NEW.to_dict(orient='records')
+    # The base database is left as it was
+    assert engine_rows(base) == OLD.to_dict(orient='records')
+
+def test_apply_delta_base_version_mismatch_returns_false_and_rebuilds():
+    delta = diff_by_id(OLD, NEW)
+    engine = QueryEngine()
+    engine.load(OLD, version='v0')
+
+    assert not engine.apply_delta(delta['upserts'], delta['deleted'], version='v2', base_version='v1')
+    assert engine.current_version() == 'v0'
+    engine.load(NEW, version='v2')
+    assert engine_rows(engine) == NEW.to_dict(orient='records')
+
+def test_apply_delta_at_target_version_is_a_no_op():
+    delta = diff_by_id(OLD, NEW)
+    engine = QueryEngine()
+    engine.load(NEW, version='v2')
+
+    assert engine.apply_delta(delta['upserts'], delta['deleted'], version='v2', base_version='v1')
+    assert engine_rows(engine) == NEW.to_dict(orient='records')
+
+def test_query_rejects_another_data_version():
+    engine = QueryEngine()
+    engine.load(OLD, version='v1')
+    assert len(engine.query('SELECT * FROM zillow_data', version='v1')) == 3
+    with pytest.raises(RuntimeError):
+        engine.query('SELECT * FROM zillow_data', version='v2')
+
+def test_feature_index_agrees_with_engine_after_delta():
+    delta = diff_by_id(OLD, NEW)
+    engine = QueryEngine()
+    engine.load(OLD, version='v1')
+    engine.apply_delta(delta['upserts'], delta['deleted'], version='v2', base_version='v1')
+    index = FeatureIndex(OLD).apply_delta(delta['upserts'], delta['deleted'])
+
+    ids = engine.query('SELECT id FROM zillow_data ORDER BY id')['id'].tolist()
+    assert sorted(index.ids) == ids
+    assert index.evaluate_ids(ids, ['pool']).tolist() == FeatureIndex(NEW).evaluate_ids(ids, ['pool']).tolist()
+    assert index.evaluate_ids(ids, ['pool']).tolist() == ['yes', 'no', 'yes']
+    assert index.evaluate_ids([3], ['garage']).tolist() == ['unsure']
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from utils.pagination import decode_page_token, encode_page_token, page_info, paginate_sql, count_sql
+from utils.query_engine import QueryEngine
+
+SQL = "SELECT * FROM zillow_data WHERE price > 0 ORDER BY id;"
+
+def test_page_token_round_trips():
+    assert decode_page_token(encode_page_token(50, 25)) == (50, 25)
+
+def test_invalid_page_tokens_are_rejected():
+    for token in ['', 'not-a-token', encode_page_token(-1, 25), encode_page_token(0, 0)]:
+        with pytest.raises(ValueError):
+            decode_page_token(token)
+
+def test_last_page_has_no_next_token():
+    assert page_info(20, 10, 30)['next_page_token'] is None
+    assert page_info(20, 10, None)['next_page_token'] is None
+
+def test_pages_cover_every_row_without_overlap():
+    engine = QueryEngine()
+    engine.load(pd.DataFrame({'id': range(1, 24), 'price': range(100, 123)}))
+    total = int(engine.query(count_sql(SQL))['total'].iloc[0])
+    offset, page_size, seen = 0, 10, []
+    while True:
+        page = engine.query(paginate_sql(SQL, ['id']), (page_size, offset))
+        seen += page['id'].tolist()
+        token = page_info(offset, page_size, total)['next_page_token']
+        if token is None:
+            break
+        offset, page_size = decode_page_token(token)
+    assert seen == list(range(1, 24))
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.pipeline import Pipeline, StageFailed
+
+def test_stages_receive_their_dependencies():
+    pipeline = Pipeline()
+    pipeline.add_stage('a', lambda: 2)
+    pipeline.add_stage('b', lambda: 3)
+    pipeline.add_stage('c', lambda a, b: a * b, deps=['a', 'b'])
+    assert pipeline.run() == {'a': 2, 'b': 3, 'c': 6}
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        Pipeline().add_stage('b', lambda a: a, deps=['a'])
+
+def test_invalid_result_fails_with_its_message():
+    pipeline = Pipeline()
+    pipeline.add_stage('traits', lambda: [], error_message="No traits.")
+    with pytest.raises(StageFailed) as excinfo:
+        pipeline.run()
+    assert excinfo.value.stage == 'traits'
+    assert excinfo.value.message == "No traits."
+
+def test_failure_does_not_wait_for_running_stages():
+    release = threading.Event()
+    pipeline = Pipeline(max_workers=2)
+    pipeline.add_stage('slow', lambda: release.wait(5))
+    pipeline.add_stage('bad', lambda: None, error_message="Bad stage.")
+    try:
+        with pytest.raises(StageFailed):
+            pipeline.run()
+        assert not release.is_set()
+    finally:
+        release.set()
+
+def test_on_stage_complete_sees_each_stage_before_its_dependents():
+    completed = []
+    pipeline = Pipeline(on_stage_complete=lambda name, result: completed.append(name))
+    pipeline.add_stage('a', lambda: 1)
+    pipeline.add_stage('b', lambda a: a + 1, deps=['a'])
+    pipeline.run()
+    assert completed == ['a', 'b']
+
+def test_run_async_awaits_stage_results():
+    async def double(a):
+        return a * 2
+
+    pipeline = Pipeline()
+    pipeline.add_stage('a', lambda: 4)
+    pipeline.add_stage('b', double, deps=['a'])
+    assert asyncio.run(pipeline.run_async()) == {'a': 4, 'b': 8}
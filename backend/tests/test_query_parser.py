@@ -0,0 +1,35 @@
+from utils.query_parser import parse_structured_query
+
+CITIES = ['Irvine', 'San Francisco', 'San Jose', 'Redwood City']
+
+def test_parses_structured_query():
+    parsed = parse_structured_query("3 bed 2 bath in Irvine under $1.2m", CITIES)
+    assert parsed['sql_query'] == (
+        "SELECT * FROM zillow_data WHERE beds = 3 AND baths = 2 AND city LIKE '%Irvine%' AND price <= 1200000;"
+    )
+    assert parsed['confidence'] == 1.0
+
+def test_no_more_than_is_a_price_bound():
+    parsed = parse_structured_query("3 bed in Irvine no more than 1m", CITIES)
+    assert 'price <= 1000000' in parsed['sql_query']
+
+def test_negated_feature_falls_through():
+    assert parse_structured_query("3 bed 2 bath in Irvine without pool", CITIES) is None
+    assert parse_structured_query("3 bed in Irvine with no garage", CITIES) is None
+
+def test_negated_price_falls_through():
+    assert parse_structured_query("3 bed in Irvine, not over 1m", CITIES) is None
+    assert parse_structured_query("3 bed in Irvine except under 500k", CITIES) is None
+
+def test_each_feature_is_required():
+    parsed = parse_structured_query("3 bed in Irvine with pool and fireplace", CITIES)
+    assert (
+        "(neighborhood_desc LIKE '%pool%' OR neighborhood_desc LIKE '%swimming pool%') AND "
+        "(neighborhood_desc LIKE '%fireplace%' OR neighborhood_desc LIKE '%hearth%')"
+    ) in parsed['sql_query']
+    assert parsed['traits'][-2:] == ['has a pool', 'has a fireplace']
+
+def test_loosely_matched_features_fall_through():
+    assert parse_structured_query("3 bed in Irvine with a view", CITIES) is None
+    assert parse_structured_query("3 bed in Irvine with a deck", CITIES) is None
+    assert parse_structured_query("3 bed in Irvine with a yard", CITIES) is None
@@ -0,0 +1,29 @@
+import numpy as np
+
+from utils.ranking import top_k_order
+
+def test_top_k_order_is_best_first():
+    assert top_k_order([0.1, 0.9, 0.5, 0.7], 2).tolist() == [1, 3]
+
+def test_top_k_order_ties_keep_original_order():
+    scores = [0.5, 1.0, 0.5, 0.5, 1.0]
+    assert top_k_order(scores, 3).tolist() == [1, 4, 0]
+    assert top_k_order(scores, 4).tolist() == [1, 4, 0, 2]
+
+def test_top_k_order_k_at_least_n_sorts_everything():
+    scores = [0.2, 0.8, 0.2, 0.5]
+    assert top_k_order(scores, 4).tolist() == [1, 3, 0, 2]
+    assert top_k_order(scores, 10).tolist() == [1, 3, 0, 2]
+
+def test_top_k_order_k_zero_or_no_scores_is_empty():
+    assert top_k_order([0.3, 0.1], 0).tolist() == []
+    assert top_k_order([], 5).tolist() == []
+
+def test_top_k_order_nan_scores_count_as_zero():
+    assert top_k_order([np.nan, 0.4, -0.1], 3).tolist() == [1, 0, 2]
+
+def test_top_k_order_pages_agree_with_a_full_sort():
+    scores = np.random.default_rng(0).integers(0, 5, size=50).astype(float)
+    full = top_k_order(scores, len(scores)).tolist()
+    pages = [top_k_order(scores, offset + 10)[offset:].tolist() for offset in range(0, 50, 10)]
+    assert sum(pages, []) == full
@@ -0,0 +1,32 @@
+from utils.semantic_cache import SemanticQueryCache
+
+def make_cache():
+    cache = SemanticQueryCache(threshold=0.8, guard_terms=['Irvine', 'San Jose'])
+    cache.add("3 bedroom homes in Irvine under $1.2m", 'irvine', data_version='v1')
+    return cache
+
+def test_paraphrase_hits():
+    assert make_cache().lookup("3 bed houses in irvine under 1.2 million", data_version='v1') == 'irvine'
+
+def test_different_numbers_miss():
+    assert make_cache().lookup("3 bedroom homes in Irvine under $1.5m", data_version='v1') is None
+
+def test_different_city_misses():
+    assert make_cache().lookup("3 bedroom homes in San Jose under $1.2m", data_version='v1') is None
+
+def test_negation_misses():
+    assert make_cache().lookup("3 bedroom homes in Irvine under $1.2m without pool", data_version='v1') is None
+
+def test_new_data_version_clears_entries():
+    cache = make_cache()
+    assert cache.lookup("3 bedroom homes in Irvine under $1.2m", data_version='v2') is None
+    cache.add("2 bath condos in San Jose", 'san jose', data_version='v2')
+    assert cache.lookup("3 bedroom homes in Irvine under $1.2m", data_version='v2') is None
+    assert cache.lookup("2 bath condos in San Jose", data_version='v2') == 'san jose'
+
+def test_full_cache_replaces_oldest_entry():
+    cache = SemanticQueryCache(max_entries=2)
+    for query in ["homes with a pool", "condos with a view", "lofts with a garage"]:
+        cache.add(query, query)
+    assert cache.lookup("homes with a pool") is None
+    assert cache.lookup("lofts with a garage") == "lofts with a garage"
@@ -0,0 +1,46 @@
+import time
+
+from utils.sqlite_cache import SQLiteCache
+
+def test_set_get_and_delete(tmp_path):
+    cache = SQLiteCache(path=str(tmp_path / 'cache.sqlite3'))
+    assert cache.set('key', {'result': [1, 2]})
+    assert cache.get('key') == {'result': [1, 2]}
+    assert cache.has('key')
+    assert cache.delete('key')
+    assert cache.get('key') is None
+    assert not cache.has('key')
+
+def test_add_keeps_existing_value(tmp_path):
+    cache = SQLiteCache(path=str(tmp_path / 'cache.sqlite3'))
+    assert cache.add('key', 'first')
+    assert not cache.add('key', 'second')
+    assert cache.get('key') == 'first'
+
+def test_entries_expire(tmp_path):
+    cache = SQLiteCache(path=str(tmp_path / 'cache.sqlite3'))
+    cache.set('key', 'value', timeout=1)
+    cache.set('forever', 'value', timeout=0)
+    time.sleep(1.1)
+    assert cache.get('key') is None
+    assert cache.get('forever') == 'value'
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SQLiteCache(path=str(tmp_path / 'cache.sqlite3'), max_size_bytes=2000, compression_level=0,
+                        prune_interval=1, touch_interval=0)
+    cache.set('old', b'x' * 800)
+    cache.set('used', b'x' * 800)
+    cache.get('used')
+    cache.set('new', b'x' * 800)
+    assert cache.get('old') is None
+    assert cache.get('used') is not None
+    assert cache.get('new') is not None
+
+def test_errors_degrade_to_misses(tmp_path):
+    cache = SQLiteCache(path=str(tmp_path / 'cache.sqlite3'))
+    cache.set('key', 'value')
+    cache._connection().execute("DROP TABLE cache")
+    assert cache.get('key') is None
+    assert not cache.has('key')
+    assert not cache.set('key', 'value')
+    assert not cache.clear()
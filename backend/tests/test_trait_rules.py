@@ -0,0 +1,33 @@
+import pandas as pd
+
+from utils.trait_rules import parse_trait_rule, evaluate_trait_rule
+
+CITIES = ['Irvine', 'San Francisco', 'Redwood City']
+
+LISTINGS = pd.DataFrame({
+    'city': ['Irvine', 'San Francisco', None],
+    'beds': [3, 2, 4],
+    'baths': [2, 1, None],
+    'price': [1100000, 1500000, 900000],
+})
+
+def test_parses_structured_traits():
+    assert parse_trait_rule("is in San Francisco", CITIES) == {'cities': ['San Francisco']}
+    assert parse_trait_rule("has 3 bed, 2 bath", CITIES) == {'beds': (3.0, False), 'baths': (2.0, False)}
+    assert parse_trait_rule("has 2+ bed", CITIES) == {'beds': (2.0, True)}
+    assert parse_trait_rule("is under $1,595,000", CITIES) == {'price_max': 1595000}
+
+def test_traits_the_columns_cannot_answer_are_not_rules():
+    assert parse_trait_rule("has a pool", CITIES) is None
+    assert parse_trait_rule("is in Irvine with a view", CITIES) is None
+
+def test_evaluates_rules_per_row():
+    rule = parse_trait_rule("has 3 bed", CITIES)
+    assert evaluate_trait_rule(LISTINGS, rule).tolist() == ['yes', 'no', 'no']
+    rule = parse_trait_rule("is in Irvine", CITIES)
+    assert evaluate_trait_rule(LISTINGS, rule).tolist() == ['yes', 'no', 'unsure']
+
+def test_missing_values_are_unsure():
+    rule = parse_trait_rule("has 2 bath", CITIES)
+    assert evaluate_trait_rule(LISTINGS, rule).tolist() == ['yes', 'no', 'unsure']
+    assert evaluate_trait_rule(LISTINGS.drop(columns=['price']), {'price_max': 1000000}).tolist() == ['unsure'] * 3
@@ -0,0 +1,122 @@
+# backend/utils/async_openai.py
+
+import os
+import atexit
+import asyncio
+import logging
+import threading
+
+import aiohttp
+import openai
+
+from .cache import completion_cache_key
+from .concurrency import call_with_backoff_async
+
+logger = logging.getLogger(__name__)
+
+class AsyncOpenAIClient:
+    """
+    Async OpenAI chat client backed by one pooled aiohttp session.
+
+    The session lives on a dedicated event loop thread, so every coroutine that talks to
+    OpenAI shares the same keep-alive connections no matter which thread or event loop the
+    request came from. Coroutines are handed to that loop with submit() or run(). The loop
+    is started lazily and restarted in forked worker processes.
+    """
+    def __init__(self, rate_limiter, max_concurrency: int = 8, max_retries: int = 5,
+                 cache=None, cache_timeout: int = None, max_connections: int = None, token_usage=None):
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.cache = cache
+        self.cache_timeout = cache_timeout
+        self.max_connections = max_connections or max_concurrency
+        self.token_usage = token_usage
+        self.lock = threading.Lock()
+        self.loop = None
+        self.session = None
+        self.semaphore = None
+        self.pid = None
+        atexit.register(self.close)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self.lock:
+            if self.loop is not None and self.pid == os.getpid():
+                return self.loop
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='async-openai', daemon=True).start()
+            asyncio.run_coroutine_threadsafe(self._open_session(), loop).result()
+            self.loop, self.pid = loop, os.getpid()
+            logger.info(f"Started async OpenAI event loop (pid {self.pid}, "
+                        f"{self.max_connections} pooled connections).")
+            return loop
+
+    async def _open_session(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def close(self):
+        """
+        Close the pooled session and stop the event loop of this process.
+        """
+        with self.lock:
+            loop, self.loop = self.loop, None
+            if loop is None or self.pid != os.getpid():
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self.session.close(), loop).result(timeout=5)
+            except Exception as e:
+                logger.warning(f"Error closing async OpenAI session: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the client's event loop.
+
+        Returns:
+        - concurrent.futures.Future: Resolves to the coroutine's result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def run(self, coro):
+        """
+        Await a coroutine on the client's event loop from any other event loop.
+        """
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def create(self, **kwargs):
+        """
+        Awaitable counterpart of create_chat_completion; must run on the client's event loop.
+
+        Waits for the shared rate limiter, retries with exponential backoff on rate-limit (429)
+        and transient server errors, and serves deterministic completions from the cache. Cache
+        reads and writes are blocking (SQLite), so they run in the loop's default executor.
+        """
+        usage_label = kwargs.pop('usage_label', 'other')
+        cacheable = self.cache is not None and kwargs.get('temperature') == 0.0
+        if cacheable:
+            cache_key = completion_cache_key(**kwargs)
+            cached_response = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached_response is not None:
+                return cached_response
+
+        async def _acreate():
+            await self.rate_limiter.acquire_async()
+            async with self.semaphore:
+                # openai reads the session from a context variable, which is local to this task
+                openai.aiosession.set(self.session)
+                return await openai.ChatCompletion.acreate(**kwargs)
+
+        response = await call_with_backoff_async(
+            _acreate,
+            retry_on=(openai.error.RateLimitError, openai.error.ServiceUnavailableError, openai.error.Timeout),
+            max_retries=self.max_retries
+        )
+        if self.token_usage is not None:
+            self.token_usage.record(usage_label, response)
+        if cacheable:
+            if hasattr(response, 'to_dict_recursive'):
+                response = response.to_dict_recursive()
+            await asyncio.to_thread(self.cache.set, cache_key, response, timeout=self.cache_timeout)
+        return response
@@ -1,9 +1,35 @@
 # backend/utils/cache.py
 
+import os
+import json
+import hashlib
+
 from flask_caching import Cache
 from flask import Flask
 
-cache = Cache(config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 300})
+def get_cache_config() -> dict:
+    """
+    Build the Flask-Caching configuration from environment variables.
+
+    Defaults to the shared on-disk SQLite backend so that every worker on a host reuses the
+    same OpenAI completions; set CACHE_TYPE=SimpleCache for a per-process in-memory cache.
+    """
+    return {
+        'CACHE_TYPE': os.getenv('CACHE_TYPE', 'utils.sqlite_cache.SQLiteCache'),
+        'CACHE_DEFAULT_TIMEOUT': int(os.getenv('CACHE_DEFAULT_TIMEOUT', '300')),
+        'CACHE_SQLITE_PATH': os.getenv('CACHE_SQLITE_PATH', 'cache/cache.sqlite3'),
+        'CACHE_MAX_SIZE_BYTES': int(os.getenv('CACHE_MAX_SIZE_MB', '256')) * 1024 * 1024,
+        'CACHE_COMPRESSION_LEVEL': int(os.getenv('CACHE_COMPRESSION_LEVEL', '6')),
+    }
+
+def completion_cache_key(**params) -> str:
+    """
+    Build a cache key for an OpenAI completion from all of its request parameters.
+    """
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return f"openai:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+cache = Cache(config=get_cache_config())
 
 def init_cache(app: Flask):
     """
@@ -21,8 +47,7 @@ class CacheResponse:
     def get(self, key):
         return self.cache.get(key)
 
-    def set(self, key, value):
-        self.cache.set(key, value)
+    def set(self, key, value, timeout=None):
+        self.cache.set(key, value, timeout=timeout)
 
 cache_response = CacheResponse(cache)
-
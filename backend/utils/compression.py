@@ -0,0 +1,68 @@
+# backend/utils/compression.py
+
+import gzip
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Response mimetypes worth compressing
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html', 'text/csv'}
+
+def supported_encodings() -> list:
+    """
+    Content encodings this server can produce, preferred first.
+    """
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def choose_encoding(accept_encoding) -> str:
+    """
+    Pick the content encoding for a request.
+
+    Parameters:
+    - accept_encoding: The request's Accept-Encoding, parsed (werkzeug's accept_encodings)
+      or as the raw header string.
+
+    Returns:
+    - str: 'br' or 'gzip', or None if the client accepts neither.
+    """
+    if not accept_encoding:
+        return None
+    if isinstance(accept_encoding, str):
+        accepted = {}
+        for part in accept_encoding.split(','):
+            name, _, params = part.strip().partition(';')
+            quality = 1.0
+            if params.strip().startswith('q='):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip().lower()] = quality
+        quality_of = lambda encoding: accepted.get(encoding, accepted.get('*', 0.0))
+    else:
+        quality_of = accept_encoding.quality
+    for encoding in supported_encodings():
+        if quality_of(encoding) > 0:
+            return encoding
+    return None
+
+def compress_body(body: bytes, encoding: str, level: int = 5) -> bytes:
+    """
+    Compress a response body with the given content encoding.
+
+    Parameters:
+    - body (bytes): The uncompressed body.
+    - encoding (str): 'br' or 'gzip'.
+    - level (int): gzip level (1-9); brotli uses the matching quality.
+
+    Returns:
+    - bytes: The compressed body.
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
@@ -0,0 +1,139 @@
+# backend/utils/concurrency.py
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to keep outgoing API calls under a requests-per-minute budget.
+    """
+    def __init__(self, rate_per_minute: float, capacity: int = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, int(self.rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, tokens: int = 1):
+        """
+        Block until the requested number of tokens is available, then consume them.
+        """
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 1):
+        """
+        Wait without blocking the event loop until the requested number of tokens is
+        available, then consume them. Shares the budget with acquire().
+        """
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+def call_with_backoff(func, *args, retry_on=(Exception,), max_retries: int = 5,
+                      base_delay: float = 1.0, max_delay: float = 30.0, **kwargs):
+    """
+    Call a function, retrying with exponential backoff and jitter when it raises one of
+    the given exception types.
+
+    Parameters:
+    - func (callable): The function to call.
+    - retry_on (tuple): Exception types that trigger a retry.
+    - max_retries (int): Maximum number of retries before the exception is re-raised.
+    - base_delay (float): Delay before the first retry, in seconds.
+    - max_delay (float): Upper bound on the delay between retries, in seconds.
+
+    Returns:
+    - The return value of func.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except retry_on as e:
+            if attempt >= max_retries:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt)) * (0.5 + random.random() / 2)
+            logger.warning(f"{type(e).__name__} on attempt {attempt + 1}; retrying in {delay:.1f}s.")
+            time.sleep(delay)
+            attempt += 1
+
+async def call_with_backoff_async(func, *args, retry_on=(Exception,), max_retries: int = 5,
+                                  base_delay: float = 1.0, max_delay: float = 30.0, **kwargs):
+    """
+    Awaitable counterpart of call_with_backoff for coroutine functions.
+
+    Returns:
+    - The awaited return value of func.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await func(*args, **kwargs)
+        except retry_on as e:
+            if attempt >= max_retries:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt)) * (0.5 + random.random() / 2)
+            logger.warning(f"{type(e).__name__} on attempt {attempt + 1}; retrying in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+def run_in_parallel(func, items: list, max_workers: int) -> list:
+    """
+    Apply func to every item using a bounded thread pool.
+
+    Parameters:
+    - func (callable): Function taking a single item.
+    - items (list): Items to process.
+    - max_workers (int): Maximum number of concurrent calls.
+
+    Returns:
+    - list: Results in the same order as items.
+    """
+    if not items:
+        return []
+    if max_workers <= 1 or len(items) == 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+def iter_in_parallel(func, items: list, max_workers: int):
+    """
+    Apply func to every item using a bounded thread pool, yielding results as they complete.
+
+    Parameters:
+    - func (callable): Function taking a single item.
+    - items (list): Items to process.
+    - max_workers (int): Maximum number of concurrent calls.
+
+    Yields:
+    - tuple: (index of the item in items, result), in completion order.
+    """
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        futures = {executor.submit(func, item): idx for idx, item in enumerate(items)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -0,0 +1,111 @@
+# backend/utils/data_manager.py
+
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class DataManager:
+    """
+    Owns the listings data and everything derived from it, and reloads it without a restart.
+
+    build_state(previous) loads the data files and returns a new state dict (DataFrames,
+    indexes, city list, data version); it is passed the current state, or None on the first
+    load, so that it can update it incrementally. A reload builds the new state while requests
+    keep using the current one, then swaps it in with a single assignment, so a request that
+    reads `state` once sees one consistent version. A watcher thread polls the data files and reloads when they change;
+    reload() can also be called directly. Each worker process runs its own watcher, started
+    lazily so that it survives a fork.
+    """
+    def __init__(self, build_state, watch_paths: list, poll_interval: float = 60, on_reload=None):
+        self.build_state = build_state
+        self.watch_paths = list(watch_paths)
+        self.poll_interval = poll_interval
+        self.on_reload = on_reload
+        self.state = None
+        self.signature = None
+        self.loaded_at = None
+        self.lock = threading.Lock()
+        self.watcher_pid = None
+
+    def _signature(self) -> tuple:
+        signature = []
+        for path in self.watch_paths:
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild the state if the data files changed since the last load.
+
+        Parameters:
+        - force (bool): Rebuild even if the files look unchanged.
+
+        Returns:
+        - bool: True if a new state was swapped in. A failed build is logged and the current
+          state is kept.
+        """
+        with self.lock:
+            signature = self._signature()
+            if not force and self.state is not None and signature == self.signature:
+                return False
+            start = time.perf_counter()
+            try:
+                state = self.build_state(self.state)
+            except Exception as e:
+                if self.state is None:
+                    raise
+                logger.error(f"Data reload failed; keeping the current data: {e}")
+                return False
+            previous, self.state = self.state, state
+            self.signature, self.loaded_at = signature, time.time()
+
+        if self.on_reload is not None:
+            self.on_reload(state, previous)
+        logger.info(f"Loaded data version {state.get('data_version')} in {time.perf_counter() - start:.2f}s.")
+        return True
+
+    def reload_in_background(self, force: bool = False) -> threading.Thread:
+        """
+        Run reload() on a separate thread and return that thread.
+        """
+        thread = threading.Thread(target=self.reload, kwargs={'force': force}, name='data-reload', daemon=True)
+        thread.start()
+        return thread
+
+    def start_watcher(self):
+        """
+        Start the file watcher of this process if it is not running yet. Cheap enough to call
+        on every request.
+        """
+        if self.poll_interval <= 0 or self.watcher_pid == os.getpid():
+            return
+        with self.lock:
+            if self.watcher_pid == os.getpid():
+                return
+            self.watcher_pid = os.getpid()
+        threading.Thread(target=self._watch, name='data-watcher', daemon=True).start()
+        logger.info(f"Watching {', '.join(self.watch_paths)} for changes every {self.poll_interval}s "
+                    f"(pid {self.watcher_pid}).")
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Error checking data files for changes: {e}")
+
+    def stats(self) -> dict:
+        state = self.state or {}
+        return {
+            'data_version': state.get('data_version'),
+            'loaded_at': self.loaded_at,
+            'watching': self.watcher_pid == os.getpid(),
+        }
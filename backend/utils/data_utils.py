@@ -1,25 +1,95 @@
 # backend/utils/data_utils.py
 
 import os
+import json
+import hashlib
+import logging
+
+import numpy as np
 import pandas as pd
 
-def load_zillow_data(file_path='data/Zillow_Data.csv') -> pd.DataFrame:
+logger = logging.getLogger(__name__)
+
+# Columns kept from the Zillow CSV and the dtype each is stored as. Only the columns that the
+# SQL engine, the trait prompts and the responses use are read; everything else
+# ('search_criteria', 'coord', 'crawl_url_result', ...) is skipped while parsing. Integer
+# columns are nullable so that missing values survive; a column holding non-integral values
+# falls back to float32.
+ZILLOW_SCHEMA = {
+    'id': 'Int64',
+    'address': 'object',
+    'listingurl': 'object',
+    'price': 'Int32',
+    'beds': 'Int32',
+    'baths': 'Int32',
+    'area': 'float32',
+    'listing_agent': 'object',
+    'year_built': 'Int32',
+    'hoa_fees': 'float32',
+    'property_tax': 'float32',
+    'school_ratings': 'object',
+    'neighborhood_desc': 'object',
+    'broker': 'category',
+    'city': 'category',
+    'state': 'category',
+    'zip_code': 'category',
+}
+
+def schema_version(schema: dict) -> str:
+    """
+    Fingerprint a schema, used to tell snapshots built with a different schema apart.
+    """
+    return hashlib.sha1(json.dumps(schema, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+def convert_column(series: pd.Series, dtype: str) -> pd.Series:
+    """
+    Convert a raw CSV column to its schema dtype.
+
+    Parameters:
+    - series (pd.Series): The column as parsed.
+    - dtype (str): The target dtype from the schema.
+
+    Returns:
+    - pd.Series: The converted column.
+    """
+    if dtype in ('object', 'category'):
+        return series.astype(dtype)
+    values = pd.to_numeric(series.astype(str).str.replace(',', '') if series.dtype == object else series,
+                           errors='coerce')
+    if dtype.lower().startswith('int'):
+        if (values.dropna() % 1 != 0).any():
+            logger.warning(f"'{series.name}' has non-integral values; storing it as float32.")
+            return values.astype('float32')
+        return values.astype(dtype)
+    return values.astype(dtype)
+
+def load_zillow_data(file_path='data/Zillow_Data.csv', schema: dict = None) -> pd.DataFrame:
     """
     Load and preprocess Zillow property data from CSV.
 
     Parameters:
     - file_path (str): Path to the Zillow data CSV file.
+    - schema (dict): Columns to keep and their dtypes; defaults to ZILLOW_SCHEMA. Pass an
+      empty dict to keep every column with the dtypes pandas infers.
 
     Returns:
     - pd.DataFrame: Preprocessed Zillow data.
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"CSV file not found at path: {file_path}")
+    schema = ZILLOW_SCHEMA if schema is None else schema
 
-    df = pd.read_csv(file_path)
+    if schema:
+        skipped = [col for col in pd.read_csv(file_path, nrows=0).columns if col.strip().lower() not in schema]
+        df = pd.read_csv(file_path, usecols=lambda col: col.strip().lower() in schema)
+    else:
+        skipped = []
+        df = pd.read_csv(file_path)
 
     # Standardize column names
     df.columns = df.columns.str.strip().str.lower()
+    # Measured after the skipped columns were pruned by read_csv, so it understates the total saving
+    pruned_bytes = df.memory_usage(deep=True).sum()
 
     # Drop 'crawl_url_result' if present
     if 'crawl_url_result' in df.columns:
@@ -29,36 +99,43 @@ def load_zillow_data(file_path='data/Zillow_Data.csv') -> pd.DataFrame:
     if 'price' in df.columns:
         df['price'] = pd.to_numeric(df['price'].astype(str).str.replace(',', ''), errors='coerce')
     else:
-        pass  # Optionally log a warning
+        logger.warning("'price' column not found in Zillow data.")
 
     # Convert 'beds' and 'baths' to numeric
-    if 'beds' in df.columns:
-        df['beds'] = pd.to_numeric(df['beds'], errors='coerce')
-    else:
-        pass  # Optionally log a warning
-
-    if 'baths' in df.columns:
-        df['baths'] = pd.to_numeric(df['baths'], errors='coerce')
-    else:
-        pass  # Optionally log a warning
+    for col in ['beds', 'baths']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        else:
+            logger.warning(f"'{col}' column not found in Zillow data.")
 
     # Convert 'city' and 'state' to title and upper case for consistent matching
     if 'city' in df.columns:
         df['city'] = df['city'].str.title()
     else:
-        pass  # Optionally log a warning
+        logger.warning("'city' column not found in Zillow data.")
 
     if 'state' in df.columns:
         df['state'] = df['state'].str.upper()
     else:
-        pass  # Optionally log a warning
+        logger.warning("'state' column not found in Zillow data.")
 
     # Ensure 'zip_code' is string
     if 'zip_code' in df.columns:
         df['zip_code'] = df['zip_code'].astype(str)
     else:
-        pass  # Optionally log a warning
-
+        logger.warning("'zip_code' column not found in Zillow data.")
+
+    # Store every column in its compact schema dtype
+    for col, dtype in schema.items():
+        if col in df.columns:
+            df[col] = convert_column(df[col], dtype)
+        else:
+            logger.warning(f"Schema column '{col}' not found in Zillow data.")
+
+    compact_bytes = df.memory_usage(deep=True).sum()
+    logger.info(f"Loaded {len(df)} listings with {len(df.columns)} columns from {file_path}, skipping "
+                f"{len(skipped)} unused columns: {pruned_bytes / 1024:.0f} KiB as parsed after column pruning, "
+                f"{compact_bytes / 1024:.0f} KiB with compact dtypes.")
     return df
 
 def load_broker_data(file_path='data/broker_data.csv') -> pd.DataFrame:
@@ -112,3 +189,50 @@ def get_unique_cities(df: pd.DataFrame) -> list:
         return sorted(df['city'].dropna().unique())
     else:
         return []
+
+def compute_data_version(df: pd.DataFrame) -> str:
+    """
+    Compute a content fingerprint of the DataFrame, used to version caches that depend on it.
+
+    Parameters:
+    - df (pd.DataFrame): The data to fingerprint.
+
+    Returns:
+    - str: A short hex digest that changes whenever the data changes.
+    """
+    digest = hashlib.sha1(','.join(df.columns).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+def diff_by_id(old_df: pd.DataFrame, new_df: pd.DataFrame, id_column: str = 'id') -> dict:
+    """
+    Diff two versions of a table whose rows are identified by an id column.
+
+    Parameters:
+    - old_df (pd.DataFrame): The current table.
+    - new_df (pd.DataFrame): The incoming table.
+    - id_column (str): Column identifying a row.
+
+    Returns:
+    - dict: 'upserts' (DataFrame of new and changed rows, as in new_df), 'inserted',
+      'updated' and 'deleted' (lists of ids), or None if the tables cannot be diffed (different
+      columns, or a missing or non-unique id column).
+    """
+    if list(old_df.columns) != list(new_df.columns) or id_column not in new_df.columns:
+        return None
+    old_ids, new_ids = pd.Index(old_df[id_column]), pd.Index(new_df[id_column])
+    if not old_ids.is_unique or not new_ids.is_unique or new_ids.hasnans:
+        return None
+
+    old_hashes = pd.util.hash_pandas_object(old_df, index=False).to_numpy()
+    new_hashes = pd.util.hash_pandas_object(new_df, index=False).to_numpy()
+    positions = old_ids.get_indexer(new_ids)
+    inserted = positions < 0
+    updated = ~inserted & (old_hashes[np.where(inserted, 0, positions)] != new_hashes)
+    deleted = old_ids[~old_ids.isin(new_ids)]
+    return {
+        'upserts': new_df[inserted | updated],
+        'inserted': new_ids[inserted].tolist(),
+        'updated': new_ids[updated].tolist(),
+        'deleted': deleted.tolist(),
+    }
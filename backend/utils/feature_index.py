@@ -0,0 +1,144 @@
+# backend/utils/feature_index.py
+
+import re
+import copy
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .search_cache import normalize_query
+from .query_parser import FEATURE_SYNONYMS, FILLER_WORDS
+
+logger = logging.getLogger(__name__)
+
+# Words that may surround a feature in a trait, e.g. 'includes a swimming pool'
+FEATURE_TRAIT_FILLER_WORDS = FILLER_WORDS | {
+    'includes', 'include', 'including', 'features', 'feature', 'offers', 'offering', 'comes',
+    'equipped', 'or', 'both', 'it', 'its', 'own',
+}
+
+# Mentions of amenities nearby rather than on the property ('close to ... Community Pool')
+PROXIMITY_CLAUSE_RE = re.compile(
+    r'\b(?:close to|near|nearby|steps (?:from|to)|minutes (?:from|to)|walking distance|walk to|'
+    r'proximity to|access to|community|public|neighborhood)\b[^.;,]*'
+)
+
+NEGATION_PREFIX = r'\b(?:no|without|lacks?|not|never)\s+(?:a\s+|an\s+|any\s+)?'
+
+def synonym_pattern(feature: str, include_name: bool = False) -> str:
+    synonyms = FEATURE_SYNONYMS[feature] + ([feature] if include_name else [])
+    synonyms = sorted(set(synonyms), key=len, reverse=True)
+    return r'(?:' + '|'.join(re.escape(synonym) for synonym in synonyms) + r')\b'
+
+def parse_feature_trait(trait: str) -> list:
+    """
+    Parse a trait that only asks for known features, such as 'has a swimming pool' or
+    'has hardwood floors and a fireplace'.
+
+    Returns:
+    - list: The canonical features named by the trait, or None if the trait says anything
+      else (a qualifier such as 'big', a location, a number).
+    """
+    text = re.sub(r'[^\w ]', ' ', normalize_query(trait))
+    features = []
+    for feature in FEATURE_SYNONYMS:
+        pattern = r'\b' + synonym_pattern(feature, include_name=True)
+        if re.search(pattern, text):
+            features.append(feature)
+            text = re.sub(pattern, ' ', text)
+    leftover = [w for w in text.split() if w not in FEATURE_TRAIT_FILLER_WORDS]
+    if not features or leftover:
+        return None
+    return features
+
+class FeatureIndex:
+    """
+    Precomputed feature matrix over 'neighborhood_desc'.
+
+    Every listing is scanned once, when the data is loaded, for each feature in
+    FEATURE_SYNONYMS. A feature counts as present when the description mentions it outside a
+    proximity clause ('close to ... Community Pool') and as absent when the mention is negated
+    ('no HOA', 'without a garage'). Rows are looked up by listing id.
+    """
+    def __init__(self, df: pd.DataFrame, id_column: str = 'id', text_column: str = 'neighborhood_desc'):
+        self.features = list(FEATURE_SYNONYMS)
+        self.feature_positions = {feature: pos for pos, feature in enumerate(self.features)}
+        self.id_column = id_column
+        self.text_column = text_column
+        if id_column in df.columns and text_column in df.columns:
+            self.ids = pd.Index(df[id_column])
+            self.present, self.negated, self.known = self._scan(df[text_column])
+        else:
+            self.ids = pd.Index([])
+            self.present = self.negated = np.zeros((0, len(self.features)), dtype=bool)
+            self.known = np.zeros(0, dtype=bool)
+        logger.info(f"Built feature index over {len(self.ids)} listings and {len(self.features)} features; "
+                    f"{int(self.present.sum())} feature mentions.")
+
+    def _scan(self, descriptions: pd.Series) -> tuple:
+        text = descriptions.astype('string').str.lower()
+        known = text.notna().to_numpy()
+        own_text = text.fillna('').str.replace(PROXIMITY_CLAUSE_RE, ' ', regex=True)
+        present = np.zeros((len(text), len(self.features)), dtype=bool)
+        negated = np.zeros_like(present)
+        for pos, feature in enumerate(self.features):
+            pattern = synonym_pattern(feature)
+            negated[:, pos] = own_text.str.contains(NEGATION_PREFIX + pattern, regex=True).to_numpy(dtype=bool)
+            present[:, pos] = own_text.str.contains(r'\b' + pattern, regex=True).to_numpy(dtype=bool) & ~negated[:, pos]
+        return present, negated, known
+
+    def apply_delta(self, upserts: pd.DataFrame, deleted_ids: list) -> 'FeatureIndex':
+        """
+        Return a new index with deleted and changed listings dropped and the new and changed
+        listings in upserts scanned, leaving the rest of the matrix as it is.
+        """
+        if self.id_column not in upserts.columns or self.text_column not in upserts.columns:
+            return self
+        removed = pd.Index(list(deleted_ids)).append(pd.Index(upserts[self.id_column]))
+        keep = ~self.ids.isin(removed)
+        present, negated, known = self._scan(upserts[self.text_column])
+
+        index = copy.copy(self)
+        index.ids = self.ids[keep].append(pd.Index(upserts[self.id_column]))
+        index.present = np.concatenate([self.present[keep], present])
+        index.negated = np.concatenate([self.negated[keep], negated])
+        index.known = np.concatenate([self.known[keep], known])
+        return index
+
+    def evaluate(self, records: list, features: list) -> list:
+        """
+        Decide a feature trait for each record from the index.
+
+        Parameters:
+        - records (list): Property dictionaries; must carry the id column.
+        - features (list): Canonical features that must all be present.
+
+        Returns:
+        - list: 'yes' when every feature is mentioned, 'no' when one is explicitly negated,
+          'unsure' otherwise (not mentioned, no description, or a listing not in the index).
+        """
+        ids = [record.get(self.id_column) for record in records]
+        return self.evaluate_ids(ids, features).tolist()
+
+    def evaluate_ids(self, ids, features: list) -> np.ndarray:
+        """
+        Vectorized form of evaluate() over a sequence of listing ids.
+
+        Returns:
+        - np.ndarray: 'yes', 'no' or 'unsure' per id.
+        """
+        columns = [self.feature_positions[feature] for feature in features]
+        rows = self.ids.get_indexer(ids) if len(self.ids) and self.ids.is_unique else np.full(len(ids), -1)
+        found = rows >= 0
+        safe_rows = np.where(found, rows, 0)
+
+        if len(self.ids):
+            present = self.present[safe_rows][:, columns].all(axis=1)
+            negated = self.negated[safe_rows][:, columns].any(axis=1)
+            known = self.known[safe_rows]
+        else:
+            present = negated = known = np.zeros(len(ids), dtype=bool)
+        present &= found & known
+        negated &= found & known
+        return np.where(negated, 'no', np.where(present, 'yes', 'unsure'))
@@ -3,7 +3,7 @@
 import os
 import openai
 from flask import current_app
-from .cache import cache_response
+from .cache import cache_response, completion_cache_key
 
 def initialize_openai_client():
     """
@@ -36,7 +36,8 @@ def get_openai_completion(prompt: str, model: str = "gpt-4", max_tokens: int = 1
     - str: The generated completion text.
     """
     prompt = replace_curly_quotes(prompt)
-    cached_response = cache_response.get(prompt)
+    cache_key = completion_cache_key(model=model, prompt=prompt, max_tokens=max_tokens, temperature=temperature, stop=stop)
+    cached_response = cache_response.get(cache_key)
     if cached_response:
         return cached_response
     
@@ -52,7 +53,7 @@ def get_openai_completion(prompt: str, model: str = "gpt-4", max_tokens: int = 1
             stop=stop
         )
         content = response['choices'][0]['message']['content'].strip()
-        cache_response.set(prompt, content)
+        cache_response.set(cache_key, content, timeout=int(os.getenv("OPENAI_CACHE_TIMEOUT", "604800")))
         return content
     except Exception as e:
         current_app.logger.error(f"OpenAI API Error: {e}")
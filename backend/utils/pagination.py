@@ -0,0 +1,68 @@
+# backend/utils/pagination.py
+
+import re
+import json
+import base64
+
+def encode_page_token(offset: int, page_size: int) -> str:
+    """
+    Encode the position of a results page as an opaque, URL-safe token.
+    """
+    payload = json.dumps({'o': offset, 'n': page_size}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_page_token(token: str) -> tuple:
+    """
+    Decode a token made by encode_page_token.
+
+    Returns:
+    - tuple: (offset, page size)
+
+    Raises:
+    - ValueError: If the token is malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        offset, page_size = int(payload['o']), int(payload['n'])
+    except Exception:
+        raise ValueError("Invalid page token.")
+    if offset < 0 or page_size <= 0:
+        raise ValueError("Invalid page token.")
+    return offset, page_size
+
+def strip_sql_terminator(sql_query: str) -> str:
+    return re.sub(r'[\s;]+$', '', sql_query)
+
+def quote_columns(columns: list = None) -> str:
+    """
+    SELECT list of the given columns, or '*' for all of them.
+    """
+    if columns is None:
+        return '*'
+    return ', '.join('"' + col.replace('"', '""') + '"' for col in columns)
+
+def paginate_sql(sql_query: str, columns: list = None) -> str:
+    """
+    Wrap a SELECT statement so that it returns one page, with only the given columns;
+    binds (limit, offset).
+    """
+    return f"SELECT {quote_columns(columns)} FROM ({strip_sql_terminator(sql_query)}) LIMIT ? OFFSET ?"
+
+def count_sql(sql_query: str) -> str:
+    """
+    Wrap a SELECT statement so that it returns its number of rows.
+    """
+    return f"SELECT COUNT(*) AS total FROM ({strip_sql_terminator(sql_query)})"
+
+def page_info(offset: int, page_size: int, total_results: int) -> dict:
+    """
+    Describe a results page, with the token of the next page or None on the last one.
+    """
+    has_next = total_results is not None and offset + page_size < total_results
+    return {
+        'offset': offset,
+        'page_size': page_size,
+        'total_results': total_results,
+        'next_page_token': encode_page_token(offset + page_size, page_size) if has_next else None,
+    }
@@ -0,0 +1,153 @@
+# backend/utils/pipeline.py
+
+import time
+import asyncio
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+class StageFailed(Exception):
+    """
+    Raised when a pipeline stage produces an unusable result.
+    """
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+        self.message = message
+
+class Pipeline:
+    """
+    Dependency-aware stage scheduler.
+
+    Each stage is started as soon as all of the stages it depends on have finished, so
+    independent stages run concurrently. The outputs of a stage's dependencies are passed
+    to it as keyword arguments named after those stages. If on_stage_complete is given, it is
+    called with (name, result) as each stage finishes, before any dependent stage starts.
+    """
+    def __init__(self, name: str = 'pipeline', max_workers: int = 4, on_stage_complete=None):
+        self.name = name
+        self.max_workers = max_workers
+        self.on_stage_complete = on_stage_complete
+        self.stages = {}
+        self.results = {}
+        self.timings = {}
+
+    def add_stage(self, name: str, func, deps: list = None, error_message: str = None, validate=None):
+        """
+        Register a stage.
+
+        Parameters:
+        - name (str): Unique stage name; also the keyword its result is passed under.
+        - func (callable): Called with the results of deps as keyword arguments.
+        - deps (list): Names of the stages this stage needs.
+        - error_message (str): If set, the pipeline fails with this message when validate rejects the result.
+        - validate (callable): Check applied to the result; defaults to truthiness when error_message is set.
+        """
+        for dep in deps or []:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'.")
+        self.stages[name] = {
+            'func': func,
+            'deps': list(deps or []),
+            'error_message': error_message,
+            'validate': validate or bool,
+        }
+        return self
+
+    def _run_stage(self, name: str):
+        stage = self.stages[name]
+        start = time.perf_counter()
+        try:
+            return stage['func'](**{dep: self.results[dep] for dep in stage['deps']})
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+
+    async def _run_stage_async(self, name: str):
+        stage = self.stages[name]
+        start = time.perf_counter()
+        try:
+            result = stage['func'](**{dep: self.results[dep] for dep in stage['deps']})
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+
+    def _complete_stage(self, name: str, result):
+        stage = self.stages[name]
+        if stage['error_message'] and not stage['validate'](result):
+            raise StageFailed(name, stage['error_message'])
+        if self.on_stage_complete:
+            self.on_stage_complete(name, result)
+        self.results[name] = result
+
+    def run(self) -> dict:
+        """
+        Execute all stages.
+
+        Returns:
+        - dict: Stage name to result.
+
+        Raises:
+        - StageFailed: If a stage with an error_message produced an invalid result.
+        """
+        start = time.perf_counter()
+        remaining = dict(self.stages)
+        running = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while remaining or running:
+                for name in [n for n, s in remaining.items() if all(d in self.results for d in s['deps'])]:
+                    running[executor.submit(self._run_stage, name)] = name
+                    del remaining[name]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self._complete_stage(name, future.result())
+        except Exception:
+            # Return the error right away instead of waiting for in-flight stages (LLM calls);
+            # they finish in the background and their results are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        else:
+            executor.shutdown(wait=True)
+        finally:
+            self.timings['total'] = round(time.perf_counter() - start, 3)
+            logger.info(f"{self.name} stage timings (s): {self.timings}")
+        return self.results
+
+    async def run_async(self) -> dict:
+        """
+        Execute all stages as tasks on the running event loop. Stage functions may return
+        awaitables, which are awaited; they must not block the loop themselves.
+
+        Returns:
+        - dict: Stage name to result.
+
+        Raises:
+        - StageFailed: If a stage with an error_message produced an invalid result.
+        """
+        start = time.perf_counter()
+        remaining = dict(self.stages)
+        running = {}
+        try:
+            while remaining or running:
+                for name in [n for n, s in remaining.items() if all(d in self.results for d in s['deps'])]:
+                    running[asyncio.ensure_future(self._run_stage_async(name))] = name
+                    del remaining[name]
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    self._complete_stage(name, task.result())
+        except BaseException:
+            for task in running:
+                task.cancel()
+            raise
+        finally:
+            self.timings['total'] = round(time.perf_counter() - start, 3)
+            logger.info(f"{self.name} stage timings (s): {self.timings}")
+        return self.results
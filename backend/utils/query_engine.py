@@ -0,0 +1,314 @@
+# backend/utils/query_engine.py
+
+import os
+import glob
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columns indexed for the filters generated by generate_sql_query, and 'id' for apply_delta()
+DEFAULT_INDEX_COLUMNS = ['id', 'city', 'state', 'zip_code', 'price', 'beds', 'baths']
+
+# Text columns indexed case-insensitively so that LIKE 'Prefix%' can use the index
+NOCASE_INDEX_COLUMNS = {'city', 'state'}
+
+def namespaced_path(path: str, key: str, version: str = None) -> str:
+    """
+    Give a database file a name of its own for the given key, e.g. the data file it is built
+    from, so that instances serving different data never share (and overwrite) one file.
+
+    Parameters:
+    - path (str): The configured database path.
+    - key (str): What the file holds.
+    - version (str): Data version of the file; each version then gets a file of its own.
+
+    Returns:
+    - str: path with a short hash of key (and the version) before its extension; None for no path.
+    """
+    if not path:
+        return None
+    root, ext = os.path.splitext(path)
+    root = f"{root}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+    if version is not None:
+        root = f"{root}-{version}"
+    return f"{root}{ext}"
+
+def prune_database_files(path: str, keep: list, retention: float):
+    """
+    Delete the files of data versions that were superseded more than retention seconds ago.
+    A file counts as superseded when the next newer version's file was written, so workers
+    that have not reloaded yet keep reading their version for that long.
+
+    Parameters:
+    - path (str): The namespaced path (without version) whose versioned files are pruned.
+    - keep (list): Paths never deleted, e.g. the current and previous versions.
+    - retention (float): Seconds a superseded file is kept.
+    """
+    if not path:
+        return
+    root, ext = os.path.splitext(path)
+    files = []
+    for file_path in glob.glob(f"{glob.escape(root)}-*{ext}"):
+        try:
+            files.append((os.path.getmtime(file_path), file_path))
+        except OSError:
+            continue
+    files.sort()
+    now = time.time()
+    for (_, older), (superseded_at, _) in zip(files, files[1:]):
+        if older in keep or now - superseded_at < retention:
+            continue
+        try:
+            os.remove(older)
+            logger.info(f"Removed query engine file {older} of a superseded data version.")
+        except OSError as e:
+            logger.warning(f"Could not remove query engine file {older}: {e}")
+
+class QueryEngine:
+    """
+    Persistent, indexed SQLite database for running generated SQL against a DataFrame.
+
+    The table is written once per load() instead of once per query. Without a path the
+    database is private to the process and kept in memory behind one shared connection. With
+    a path (e.g. on /dev/shm) it is written to that file, which every worker process opens
+    read-only with its own per-thread connections and memory-maps, so all workers read the
+    same pages instead of each holding a copy of the listings. A new load() or apply_delta()
+    atomically replaces the file; connections notice and reopen on their next query. Queries
+    may name the data version they expect, and fail instead of reading another version.
+
+    To switch data versions without ever touching the database being queried, create one
+    engine per version (with a path from namespaced_path(..., version)) and build it with
+    load(), or with apply_delta() from the previous version's engine.
+    """
+    def __init__(self, table_name: str = 'zillow_data', index_columns: list = None,
+                 path: str = None, mmap_size: int = 256 * 1024 * 1024):
+        self.table_name = table_name
+        self.index_columns = index_columns or DEFAULT_INDEX_COLUMNS
+        self.path = path
+        self.mmap_size = mmap_size
+        self.connection = None
+        self.connection_version = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def _sql_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        # SQLite stores REAL as doubles; widen float32 columns through their shortest decimal
+        # form so that 0.1 is stored (and returned) as 0.1 rather than 0.10000000149
+        float32_columns = [col for col in df.columns if df[col].dtype == 'float32']
+        if float32_columns:
+            df = df.copy()
+            for col in float32_columns:
+                df[col] = pd.to_numeric(df[col].astype(str), errors='coerce')
+        return df
+
+    def _set_version(self, connection: sqlite3.Connection, version: str):
+        connection.execute('CREATE TABLE IF NOT EXISTS "query_engine_meta" ("version" TEXT)')
+        connection.execute('DELETE FROM "query_engine_meta"')
+        if version is not None:
+            connection.execute('INSERT INTO "query_engine_meta" VALUES (?)', (version,))
+
+    def _build(self, connection: sqlite3.Connection, df: pd.DataFrame, version: str = None):
+        df = self._sql_frame(df)
+        df.to_sql(self.table_name, connection, index=False)
+
+        for col in self.index_columns:
+            if col not in df.columns:
+                logger.warning(f"Cannot index missing column '{col}' on {self.table_name}.")
+                continue
+            collate = ' COLLATE NOCASE' if col in NOCASE_INDEX_COLUMNS else ''
+            connection.execute(
+                f'CREATE INDEX "idx_{self.table_name}_{col}" ON "{self.table_name}" ("{col}"{collate})'
+            )
+        connection.execute('ANALYZE')
+        self._set_version(connection, version)
+        connection.commit()
+
+    def _read_version(self, connection: sqlite3.Connection) -> str:
+        row = connection.execute('SELECT "version" FROM "query_engine_meta"').fetchone()
+        return row[0] if row else None
+
+    def current_version(self) -> str:
+        """
+        Return the data version recorded in the current database, or None.
+        """
+        try:
+            if self.path is not None:
+                if not os.path.exists(self.path):
+                    return None
+                self._file_connection()
+                return self.local.version
+            with self.lock:
+                return self.connection_version
+        except sqlite3.Error:
+            return None
+
+    def _new_database(self) -> tuple:
+        """
+        Open a writable database to build the next version in.
+
+        Returns:
+        - tuple: (connection, path of the temporary file or None when in memory)
+        """
+        if self.path is None:
+            return sqlite3.connect(':memory:', check_same_thread=False), None
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp{os.getpid()}"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        connection = sqlite3.connect(tmp_path)
+        connection.execute('PRAGMA journal_mode = OFF')
+        connection.execute('PRAGMA synchronous = OFF')
+        return connection, tmp_path
+
+    def _swap(self, connection: sqlite3.Connection, tmp_path: str):
+        """
+        Make a database built by _new_database() the current one.
+        """
+        if tmp_path is None:
+            # Generated SQL must never modify the shared table
+            connection.execute('PRAGMA query_only = ON')
+            version = self._read_version(connection)
+            with self.lock:
+                previous, self.connection = self.connection, connection
+                self.connection_version = version
+            if previous is not None:
+                previous.close()
+        else:
+            connection.close()
+            os.replace(tmp_path, self.path)
+
+    def load(self, df: pd.DataFrame, version: str = None):
+        """
+        Build a new database from the DataFrame and swap it in.
+
+        Parameters:
+        - df (pd.DataFrame): The table contents.
+        - version (str): Data version of df. A database already holding this version (e.g. a
+          file written by another worker) is reused instead of being rebuilt.
+        """
+        start = time.perf_counter()
+        if version is not None and self.current_version() == version:
+            logger.info(f"Query engine ({self.path or 'in memory'}) already holds data version {version}.")
+            return
+        connection, tmp_path = self._new_database()
+        try:
+            self._build(connection, df, version)
+        except Exception:
+            connection.close()
+            raise
+        self._swap(connection, tmp_path)
+        logger.info(f"Loaded {len(df)} rows into query engine table '{self.table_name}' "
+                    f"({self.path or 'in memory'}) in {time.perf_counter() - start:.2f}s.")
+
+    def apply_delta(self, upserts: pd.DataFrame, deleted_ids: list, id_column: str = 'id',
+                    version: str = None, base_version: str = None, base: 'QueryEngine' = None) -> bool:
+        """
+        Apply inserted, updated and deleted rows to a copy of the base database and swap it in,
+        instead of rebuilding the table and its indexes from scratch.
+
+        Parameters:
+        - upserts (pd.DataFrame): New and changed rows; they replace any row with the same id.
+        - deleted_ids (list): Ids of rows to remove.
+        - id_column (str): Column identifying a row.
+        - version (str): Data version after the delta.
+        - base_version (str): Data version the delta was computed against.
+        - base (QueryEngine): Engine holding base_version; defaults to this one.
+
+        Returns:
+        - bool: False if the base database does not hold base_version (e.g. another worker
+          already moved it on), in which case the caller should load() the full table.
+        """
+        start = time.perf_counter()
+        base = base or self
+        if version is not None and self.current_version() == version:
+            logger.info(f"Query engine ({self.path or 'in memory'}) already holds data version {version}.")
+            return True
+        current = base.current_version()
+        if current is None or current != base_version:
+            return False
+
+        connection, tmp_path = self._new_database()
+        try:
+            if base.path is None:
+                with base.lock:
+                    base.connection.backup(connection)
+            else:
+                source = sqlite3.connect(f"file:{base.path}?mode=ro", uri=True)
+                try:
+                    source.backup(connection)
+                finally:
+                    source.close()
+
+            ids = list(deleted_ids) + upserts[id_column].tolist()
+            connection.executemany(
+                f'DELETE FROM "{self.table_name}" WHERE "{id_column}" = ?',
+                [(i.item() if hasattr(i, 'item') else i,) for i in ids]
+            )
+            self._sql_frame(upserts).to_sql(self.table_name, connection, index=False, if_exists='append')
+            self._set_version(connection, version)
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        self._swap(connection, tmp_path)
+        logger.info(f"Applied {len(upserts)} upserts and {len(deleted_ids)} deletes to query engine table "
+                    f"'{self.table_name}' ({self.path or 'in memory'}) in {time.perf_counter() - start:.2f}s.")
+        return True
+
+    def _file_connection(self) -> sqlite3.Connection:
+        """
+        Return this thread's read-only connection to the database file, reopening it after a
+        fork or after load() replaced the file. The file is never modified in place, so its
+        data version is read once per connection.
+        """
+        inode = os.stat(self.path).st_ino
+        local = self.local
+        if getattr(local, 'pid', None) == os.getpid() and local.inode == inode:
+            return local.connection
+        if getattr(local, 'pid', None) == os.getpid():
+            local.connection.close()
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        connection.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        connection.execute('PRAGMA query_only = ON')
+        local.connection, local.pid, local.inode = connection, os.getpid(), inode
+        local.version = self._read_version(connection)
+        return connection
+
+    def _check_version(self, current: str, version: str):
+        if version is not None and current != version:
+            raise RuntimeError(f"Query engine holds data version {current}, not {version}.")
+
+    def query(self, sql_query: str, params: tuple = None, version: str = None) -> pd.DataFrame:
+        """
+        Execute a single SELECT statement against the loaded table.
+
+        Parameters:
+        - sql_query (str): The SQL query.
+        - params (tuple): Values bound to the query's '?' placeholders.
+        - version (str): Data version the caller expects; None accepts any.
+
+        Returns:
+        - pd.DataFrame: The query result.
+
+        Raises:
+        - RuntimeError: If no data is loaded or the database holds another data version.
+        """
+        if self.path is not None:
+            if not os.path.exists(self.path):
+                raise RuntimeError("Query engine has no data loaded.")
+            connection = self._file_connection()
+            self._check_version(self.local.version, version)
+            return pd.read_sql_query(sql_query, connection, params=params)
+        if self.connection is None:
+            raise RuntimeError("Query engine has no data loaded.")
+        with self.lock:
+            self._check_version(self.connection_version, version)
+            return pd.read_sql_query(sql_query, self.connection, params=params)
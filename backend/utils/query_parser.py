@@ -0,0 +1,232 @@
+# backend/utils/query_parser.py
+
+import re
+import warnings
+
+with warnings.catch_warnings():
+    # fuzzywuzzy warns when python-Levenshtein is not installed; the pure-Python matcher is fine here
+    warnings.simplefilter('ignore')
+    from fuzzywuzzy import fuzz, process
+
+from .search_cache import normalize_query
+
+# Feature keywords recognized in queries and traits, mapped to the phrases that
+# indicate them in 'neighborhood_desc'
+FEATURE_SYNONYMS = {
+    'pool': ['pool', 'swimming pool'],
+    'fireplace': ['fireplace', 'hearth'],
+    'garage': ['garage', 'carport'],
+    'backyard': ['backyard', 'back yard', 'yard'],
+    'hardwood floors': ['hardwood'],
+    'garden': ['garden'],
+    'view': ['view', 'views'],
+    'balcony': ['balcony'],
+    'patio': ['patio'],
+    'deck': ['deck'],
+    'basement': ['basement'],
+    'home gym': ['home gym', 'gym'],
+    'home theater': ['home theater', 'theater', 'media room'],
+    'renovated': ['renovated', 'remodeled', 'updated'],
+    'modern kitchen': ['modern kitchen', 'updated kitchen', 'renovated kitchen'],
+}
+
+# Features whose synonyms are too short or common for a LIKE substring match ('view' in
+# 'overview', 'yard' in 'courtyard'); queries naming them go to the LLM pipeline
+SUBSTRING_UNSAFE_FEATURES = {'view', 'deck', 'backyard'}
+
+# Words that negate a constraint ('without pool', 'not over 1m'), which the rules below cannot express
+NEGATION_RE = re.compile(r'\b(?:no|not|without|except|excluding|never)\b')
+
+# Words that carry no search constraint of their own
+FILLER_WORDS = {
+    'a', 'an', 'the', 'in', 'at', 'of', 'for', 'with', 'and', 'to', 'on', 'near', 'around',
+    'i', 'im', 'me', 'my', 'we', 'us', 'want', 'need', 'would', 'like', 'looking', 'searching',
+    'seeking', 'search', 'find', 'show', 'please', 'some', 'any', 'that', 'has', 'have', 'having',
+    'is', 'are', 'house', 'houses', 'home', 'homes', 'property', 'properties', 'place', 'listing',
+    'listings', 'buy', 'sale', 'located', 'priced', 'price', 'budget', 'dollars', 'usd', 'city',
+    'within', 'which',
+}
+
+AMOUNT = r'\$?\s*(\d+(?:\.\d+)?)\s*(k|thousand|m|mm|mil|million)?\b'
+AMOUNT_MULTIPLIERS = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'mm': 1e6, 'mil': 1e6, 'million': 1e6}
+
+BEDS_RE = re.compile(r'\b(\d+)\s*(\+|or more)?\s*-?\s*(?:bed|beds|bedroom|bedrooms|bd|br|bdr)\b')
+BATHS_RE = re.compile(r'\b(\d+(?:\.5)?)\s*(\+|or more)?\s*-?\s*(?:bath|baths|bathroom|bathrooms|ba)\b')
+PRICE_BETWEEN_RE = re.compile(r'\bbetween\s*' + AMOUNT + r'\s*(?:and|to|-)\s*' + AMOUNT)
+PRICE_MAX_RE = re.compile(
+    r'\b(?:under|below|less than|cheaper than|max|maximum|up to|no more than|at most)\s*(?:of\s*)?' + AMOUNT
+)
+PRICE_MIN_RE = re.compile(r'\b(?:over|above|more than|at least|min|minimum|starting at)\s*(?:of\s*)?' + AMOUNT)
+
+def parse_amount(value: str, suffix: str) -> int:
+    """
+    Convert a matched amount such as ('1.5', 'm') into an integer (1500000).
+    """
+    return int(round(float(value) * AMOUNT_MULTIPLIERS.get(suffix or '', 1)))
+
+def sql_literal(value: str) -> str:
+    return value.replace("'", "''")
+
+def match_city(words: list, cities: list):
+    """
+    Find the city mentioned in a list of words, exactly or approximately.
+
+    Returns:
+    - tuple: (city, index of the first matched word, matched word count) or (None, 0, 0).
+    """
+    by_lower = {city.lower(): city for city in cities}
+    first_words = {}
+    for city in cities:
+        first = city.lower().split()[0]
+        if ' ' in city and len(first) >= 5:
+            first_words.setdefault(first, city)
+
+    for size in (3, 2, 1):
+        for start in range(len(words) - size + 1):
+            ngram = ' '.join(words[start:start + size])
+            if ngram in by_lower:
+                return by_lower[ngram], start, size
+            if size == 1 and ngram in first_words:
+                return first_words[ngram], start, size
+    for size in (3, 2, 1):
+        for start in range(len(words) - size + 1):
+            ngram = ' '.join(words[start:start + size])
+            if len(ngram) < 5:
+                continue
+            match = process.extractOne(ngram, list(by_lower), scorer=fuzz.ratio, score_cutoff=85)
+            if match:
+                return by_lower[match[0]], start, size
+    return None, 0, 0
+
+def parse_structured_query(query: str, cities: list) -> dict:
+    """
+    Parse a purely structured query (beds, baths, price bounds, city, known features) without OpenAI.
+
+    Parameters:
+    - query (str): The user query.
+    - cities (list): Cities present in the listings data.
+
+    Returns:
+    - dict: 'user_intent', 'traits', 'key_phrases', 'sql_query', 'property_keywords' and a
+      'confidence' between 0 and 1, or None if the query has no recognizable constraint or
+      contains constructs (several cities or room counts, negations, loosely matched
+      features) that need the LLM pipeline.
+    """
+    text = normalize_query(query)
+    text = re.sub(r'[^\w$.+\- ]', ' ', text)
+    all_words = [w for w in re.findall(r'[a-z0-9.$+]+', text) if w not in FILLER_WORDS]
+    if not all_words:
+        return None
+
+    constraints = {}
+
+    def consume(pattern, key):
+        nonlocal text
+        matches = list(pattern.finditer(text))
+        if len(matches) > 1:
+            raise ValueError(f"multiple {key} constraints")
+        if matches:
+            constraints[key] = matches[0].groups()
+            text = text[:matches[0].start()] + ' ' + text[matches[0].end():]
+
+    try:
+        consume(BEDS_RE, 'beds')
+        consume(BATHS_RE, 'baths')
+        consume(PRICE_BETWEEN_RE, 'price_between')
+        consume(PRICE_MAX_RE, 'price_max')
+        consume(PRICE_MIN_RE, 'price_min')
+    except ValueError:
+        return None
+
+    # Checked after the price bounds are consumed, so that 'no more than 1m' is still parsed
+    # while 'not over 1m' is not
+    if NEGATION_RE.search(text):
+        return None
+
+    features = []
+    for feature, synonyms in FEATURE_SYNONYMS.items():
+        for synonym in sorted(synonyms, key=len, reverse=True):
+            if re.search(rf'\b{re.escape(synonym)}\b', text):
+                features.append(feature)
+                text = re.sub(rf'\b{re.escape(synonym)}\b', ' ', text)
+                break
+    if SUBSTRING_UNSAFE_FEATURES.intersection(features):
+        return None
+
+    words = [w for w in re.findall(r'[a-z0-9.$+]+', text) if w not in FILLER_WORDS]
+    city, start, size = match_city(words, cities)
+    if city:
+        words = words[:start] + words[start + size:]
+        # Several cities need the LLM to pair each with its own constraints
+        if match_city(words, cities)[0]:
+            return None
+
+    if not constraints and not features and not city:
+        return None
+
+    conditions, traits, key_phrases, keywords = [], [], [], []
+    rooms = []
+    if 'beds' in constraints:
+        beds, at_least = constraints['beds']
+        conditions.append(f"beds {'>=' if at_least else '='} {int(beds)}")
+        rooms.append(f"{int(beds)}{'+' if at_least else ''} bed")
+        key_phrases.append(f"{int(beds)} bedroom home")
+        keywords.append(f"Beds: {int(beds)}")
+    if 'baths' in constraints:
+        baths, at_least = constraints['baths']
+        baths = float(baths)
+        baths_text = f"{baths:g}"
+        conditions.append(f"baths {'>=' if at_least else '='} {baths_text}")
+        rooms.append(f"{baths_text}{'+' if at_least else ''} bath")
+        keywords.append(f"Baths: {baths_text}")
+    if rooms:
+        traits.append(f"has {', '.join(rooms)}")
+    if city:
+        conditions.append(f"city LIKE '%{sql_literal(city)}%'")
+        traits.append(f"is in {city}")
+        key_phrases.append(f"{city} real estate")
+        keywords.append(f"City: {city}")
+    if 'price_between' in constraints:
+        low = parse_amount(*constraints['price_between'][:2])
+        high = parse_amount(*constraints['price_between'][2:])
+        low, high = min(low, high), max(low, high)
+        conditions.append(f"price BETWEEN {low} AND {high}")
+        traits.append(f"is between ${low:,} and ${high:,}")
+        keywords.append(f"Price: {low}-{high}")
+    if 'price_max' in constraints:
+        price = parse_amount(*constraints['price_max'])
+        conditions.append(f"price <= {price}")
+        traits.append(f"is under ${price:,}")
+        keywords.append(f"Price: {price}")
+    if 'price_min' in constraints:
+        price = parse_amount(*constraints['price_min'])
+        conditions.append(f"price >= {price}")
+        traits.append(f"is over ${price:,}")
+        keywords.append(f"Price: {price}")
+    if features:
+        # Every feature must be present, through any of its synonyms
+        for feature in features:
+            synonym_conditions = [
+                f"neighborhood_desc LIKE '%{sql_literal(synonym)}%'" for synonym in FEATURE_SYNONYMS[feature]
+            ]
+            conditions.append(f"({' OR '.join(synonym_conditions)})")
+        for feature in features:
+            traits.append(f"has a {feature}")
+            key_phrases.append(feature)
+            keywords.append(f"Neighborhood_desc: {feature}")
+
+    sql_query = f"SELECT * FROM zillow_data WHERE {' AND '.join(conditions)};"
+    user_intent = f"The user is looking for a property that {', '.join(traits)}."
+
+    # Share of meaningful words in the query that the rules above accounted for
+    unexplained = [w for w in words if not re.fullmatch(r'[$.+\-]+', w)]
+    confidence = 1 - len(unexplained) / len(all_words)
+
+    return {
+        'user_intent': user_intent,
+        'traits': traits,
+        'key_phrases': key_phrases,
+        'sql_query': sql_query,
+        'property_keywords': ', '.join(keywords),
+        'confidence': round(confidence, 3),
+    }
@@ -0,0 +1,72 @@
+# backend/utils/ranking.py
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Contribution of a local trait verdict to a listing's trait score
+VERDICT_SCORES = {'yes': 1.0, 'unsure': 0.5, 'no': 0.0}
+
+# An explicit ORDER BY in the generated SQL (e.g. 'cheapest first') wins over relevance ranking
+ORDER_BY_RE = re.compile(r'\border\s+by\b', re.IGNORECASE)
+
+def has_order_by(sql_query: str) -> bool:
+    return bool(ORDER_BY_RE.search(sql_query))
+
+def verdict_score(verdicts) -> np.ndarray:
+    """
+    Map an array of 'yes'/'no'/'unsure' verdicts to scores between 0 and 1.
+    """
+    verdicts = np.asarray(verdicts)
+    scores = np.full(len(verdicts), VERDICT_SCORES['unsure'])
+    scores[verdicts == 'yes'] = VERDICT_SCORES['yes']
+    scores[verdicts == 'no'] = VERDICT_SCORES['no']
+    return scores
+
+def school_rating_score(ratings: pd.Series) -> np.ndarray:
+    """
+    Average of the ratings in each 'school_ratings' value ('7 8 8'), scaled to 0-1; a
+    listing without ratings gets the neutral 0.5 rather than being ranked below every rated one.
+    """
+    if len(ratings) == 0:
+        return np.zeros(0)
+    text = ratings.reset_index(drop=True).astype('string').fillna('')
+    values = text.str.extractall(r'(\d+(?:\.\d+)?)')[0].astype(float)
+    means = values.groupby(level=0).mean()
+    scores = means.reindex(range(len(ratings))).to_numpy(dtype=float) / 10.0
+    return np.clip(np.nan_to_num(scores, nan=0.5), 0.0, 1.0)
+
+def price_fit_score(prices: pd.Series, price_min: float = None, price_max: float = None) -> np.ndarray:
+    """
+    How well each price fits the requested range: 1 inside it, falling linearly with the
+    relative distance outside it, 0 for a missing price. All 0 when no range was requested.
+    """
+    values = pd.to_numeric(prices, errors='coerce').to_numpy(dtype=float)
+    if price_min is None and price_max is None:
+        return np.zeros(len(values))
+    scores = np.ones(len(values))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if price_max:
+            scores -= np.clip((values - price_max) / price_max, 0.0, None)
+        if price_min:
+            scores -= np.clip((price_min - values) / price_min, 0.0, None)
+    scores[np.isnan(values)] = 0.0
+    return np.clip(scores, 0.0, 1.0)
+
+def top_k_order(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k highest scores, best first, in O(n + k log k). Ties keep their
+    original order, so consecutive pages are consistent.
+    """
+    scores = np.nan_to_num(np.asarray(scores, dtype=float), nan=0.0)
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=int)
+    if k >= n:
+        return np.lexsort((np.arange(n), -scores))
+    threshold = np.partition(-scores, k - 1)[k - 1]
+    better = np.flatnonzero(-scores < threshold)
+    tied = np.flatnonzero(-scores == threshold)[:k - len(better)]
+    top = np.concatenate([better, tied])
+    return top[np.lexsort((top, -scores[top]))]
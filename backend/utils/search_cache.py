@@ -0,0 +1,29 @@
+# backend/utils/search_cache.py
+
+import re
+import hashlib
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so that trivially different spellings share a cache entry,
+    e.g. '3 bed in Irvine' and ' 3 bed  in irvine.' both become '3 bed in irvine'.
+    """
+    query = query.lower().strip()
+    query = re.sub(r'(?<=\d),(?=\d)', '', query)  # 1,600,000 -> 1600000
+    query = re.sub(r'\s+', ' ', query)
+    return query.strip(' .!?;:')
+
+def search_cache_key(query: str, data_version: str, *parts) -> str:
+    """
+    Build the cache key for a full /api/search response.
+
+    Parameters:
+    - query (str): The raw user query.
+    - data_version (str): Fingerprint of the listings data; a reload yields new keys.
+    - parts: Any further request options that change the response.
+
+    Returns:
+    - str: The cache key.
+    """
+    payload = '\x1f'.join([normalize_query(query)] + [str(part) for part in parts])
+    return f"search:{data_version}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
@@ -0,0 +1,173 @@
+# backend/utils/semantic_cache.py
+
+import re
+import zlib
+import logging
+import threading
+
+import numpy as np
+
+from .search_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = {
+    'a', 'an', 'the', 'in', 'at', 'of', 'for', 'with', 'and', 'or', 'to', 'on', 'near',
+    'i', 'im', 'me', 'my', 'we', 'want', 'need', 'looking', 'searching', 'seeking', 'find',
+    'show', 'please', 'some', 'any', 'that', 'which', 'is', 'are', 'has', 'have',
+}
+
+# Common real estate paraphrases mapped to one canonical term before vectorizing
+CANONICAL_TERMS = [
+    (r'\b(bedrooms?|beds|bd|br|bdr)\b', 'bed'),
+    (r'\b(bathrooms?|baths|ba)\b', 'bath'),
+    (r'\b(houses?|homes|property|properties|places?|residences?)\b', 'home'),
+    (r'\b(below|less than|cheaper than|up to|max|maximum|at most|no more than)\b', 'under'),
+    (r'\b(above|more than|at least|min|minimum)\b', 'over'),
+    (r'\bswimming pool\b', 'pool'),
+    (r'\bsf\b', 'san francisco'),
+    (r'\bnyc\b', 'new york'),
+]
+
+# Words that flip the meaning of a query; both queries must use the same ones to match
+NEGATIONS = {'no', 'not', 'without', 'except', 'excluding'}
+
+NUMBER_RE = re.compile(r'\$?(\d+(?:\.\d+)?)\s*(k|thousand|m|mm|mil|million)?\b')
+
+NUMBER_MULTIPLIERS = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'mm': 1e6, 'mil': 1e6, 'million': 1e6}
+
+def extract_numbers(text: str) -> frozenset:
+    """
+    Extract the numeric values mentioned in a query, expanding suffixes such as '2M',
+    '$2 million' or '800k', so that paraphrases with different figures never match.
+    """
+    text = normalize_query(text)
+    numbers = set()
+    for value, suffix in NUMBER_RE.findall(text):
+        numbers.add(int(round(float(value) * NUMBER_MULTIPLIERS.get(suffix, 1))))
+    return frozenset(numbers)
+
+def canonicalize_query(text: str) -> str:
+    """
+    Normalize a query and rewrite common paraphrases and numeric amounts to canonical terms.
+    """
+    text = normalize_query(text)
+    for pattern, replacement in CANONICAL_TERMS:
+        text = re.sub(pattern, replacement, text)
+    return NUMBER_RE.sub(
+        lambda m: f" n{int(round(float(m.group(1)) * NUMBER_MULTIPLIERS.get(m.group(2), 1)))} ", text
+    )
+
+def query_features(text: str) -> list:
+    """
+    Word unigrams, word bigrams and character trigrams of a canonicalized query, without stopwords.
+    """
+    words = [w for w in re.findall(r'[a-z0-9]+', canonicalize_query(text)) if w not in STOPWORDS]
+    features = list(words)
+    features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"#{word}#"
+        features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    return features
+
+class SemanticQueryCache:
+    """
+    Nearest-neighbour cache over past queries.
+
+    Queries are embedded with a hashed TF-IDF vectorizer and compared by cosine similarity
+    against a NumPy matrix of previously answered queries. A lookup only matches when the
+    similarity reaches the threshold, the numeric values in both queries are identical, and
+    both queries mention the same guard terms (e.g. city names) and negations.
+    """
+    def __init__(self, threshold: float = 0.9, max_entries: int = 500, dims: int = 4096, guard_terms: list = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dims = dims
+        self.guard_terms = [term.lower() for term in (guard_terms or [])]
+        self.lock = threading.Lock()
+        self.clear()
+
+    def set_guard_terms(self, guard_terms: list):
+        self.guard_terms = [term.lower() for term in (guard_terms or [])]
+
+    def clear(self, data_version: str = None):
+        with self.lock:
+            self._reset(data_version)
+
+    def _reset(self, data_version: str = None):
+        # Callers hold self.lock
+        self.data_version = data_version
+        self.matrix = np.zeros((self.max_entries, self.dims), dtype=np.float32)
+        self.doc_freq = np.zeros(self.dims, dtype=np.float32)
+        self.entries = [None] * self.max_entries
+        self.size = 0
+        self.next_slot = 0
+
+    def _term_frequencies(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dims, dtype=np.float32)
+        for feature in query_features(text):
+            vector[zlib.crc32(feature.encode('utf-8')) % self.dims] += 1
+        return np.log1p(vector)
+
+    def _guards(self, text: str) -> frozenset:
+        text = canonicalize_query(text)
+        words = set(re.findall(r'[a-z]+', text))
+        return frozenset([term for term in self.guard_terms if term in text] + list(words & NEGATIONS))
+
+    def lookup(self, query: str, data_version: str = None):
+        """
+        Find the payload of the most similar previously cached query.
+
+        Returns:
+        - The cached payload, or None if no entry is similar enough.
+        """
+        tf = self._term_frequencies(query)
+        if not tf.any():
+            return None
+        numbers, guards = extract_numbers(query), self._guards(query)
+
+        with self.lock:
+            if data_version != self.data_version or self.size == 0:
+                return None
+            idf = np.log((1 + self.size) / (1 + self.doc_freq)) + 1
+            docs = self.matrix[:self.size] * idf
+            doc_norms = np.linalg.norm(docs, axis=1)
+            q = tf * idf
+            similarities = docs @ q / np.maximum(doc_norms * np.linalg.norm(q), 1e-12)
+
+            for slot in np.argsort(similarities)[::-1]:
+                if similarities[slot] < self.threshold:
+                    break
+                entry = self.entries[slot]
+                if entry['numbers'] == numbers and entry['guards'] == guards:
+                    logger.info(f"Semantic cache hit ({similarities[slot]:.3f}): "
+                                f"'{query}' ~ '{entry['query']}'")
+                    return entry['payload']
+        return None
+
+    def add(self, query: str, payload, data_version: str = None):
+        """
+        Store the payload for a query, replacing the oldest entry when full.
+        """
+        tf = self._term_frequencies(query)
+        if not tf.any():
+            return
+        entry = {
+            'query': query,
+            'numbers': extract_numbers(query),
+            'guards': self._guards(query),
+            'payload': payload,
+        }
+        with self.lock:
+            # Checked and cleared under the same lock as the insert, so that no other writer
+            # can add entries between the check and the clear
+            if data_version != self.data_version:
+                self._reset(data_version)
+            slot = self.next_slot
+            if self.entries[slot] is not None:
+                self.doc_freq -= self.matrix[slot] > 0
+            self.matrix[slot] = tf
+            self.doc_freq += tf > 0
+            self.entries[slot] = entry
+            self.next_slot = (slot + 1) % self.max_entries
+            self.size = min(self.size + 1, self.max_entries)
@@ -0,0 +1,58 @@
+# backend/utils/serialization.py
+
+import logging
+
+import pandas as pd
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Columns never sent to clients
+EXCLUDED_COLUMNS = ['crawl_url_result']
+
+def frame_to_records(df: pd.DataFrame, exclude: list = EXCLUDED_COLUMNS) -> list:
+    """
+    Convert a query result to JSON-ready records in one vectorized pass.
+
+    Parameters:
+    - df (pd.DataFrame): The query result.
+    - exclude (list): Columns dropped before the conversion.
+
+    Returns:
+    - list: One dict per row, with NaN and missing values as None.
+    """
+    df = df.drop(columns=[col for col in exclude if col in df.columns])
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes with orjson when it is installed, writing the response
+    bytes directly, and falls back to the standard library encoder otherwise. Output matches
+    the default provider: sorted keys, compact unless in debug mode, dates as HTTP dates, and
+    NumPy values serialized natively; NaN becomes null.
+    """
+    def _orjson_options(self, indent: bool = False) -> int:
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
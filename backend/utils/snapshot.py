@@ -0,0 +1,106 @@
+# backend/utils/snapshot.py
+
+import os
+import json
+import pickle
+import hashlib
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow is optional
+    feather = None
+
+# Arrow IPC (Feather v2, uncompressed so it can be memory-mapped) when pyarrow is installed,
+# otherwise a pickle of the DataFrame
+SNAPSHOT_FORMAT = 'feather' if feather is not None else 'pickle'
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def snapshot_meta_path(snapshot_path: str) -> str:
+    return f"{snapshot_path}.json"
+
+def write_snapshot(df: pd.DataFrame, snapshot_path: str, source_path: str, schema: str = None) -> dict:
+    """
+    Write a preprocessed DataFrame as a binary snapshot, with a JSON sidecar recording the
+    SHA-256 of the CSV it was built from and the version of the schema it was parsed with.
+    Both files are replaced atomically.
+
+    Returns:
+    - dict: The sidecar metadata.
+    """
+    directory = os.path.dirname(snapshot_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    source_stat = os.stat(source_path)
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'source_sha256': file_sha256(source_path),
+        'source_size': source_stat.st_size,
+        'source_mtime_ns': source_stat.st_mtime_ns,
+        'schema': schema,
+        'rows': len(df),
+        'columns': list(df.columns),
+    }
+
+    tmp_path = f"{snapshot_path}.tmp{os.getpid()}"
+    if SNAPSHOT_FORMAT == 'feather':
+        df.reset_index(drop=True).to_feather(tmp_path, compression='uncompressed')
+    else:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(df, f, protocol=5)
+    os.replace(tmp_path, snapshot_path)
+
+    tmp_meta_path = f"{snapshot_meta_path(snapshot_path)}.tmp{os.getpid()}"
+    with open(tmp_meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_meta_path, snapshot_meta_path(snapshot_path))
+    logger.info(f"Wrote {SNAPSHOT_FORMAT} snapshot of {len(df)} rows to {snapshot_path}.")
+    return meta
+
+def read_snapshot(snapshot_path: str, source_path: str, schema: str = None) -> pd.DataFrame:
+    """
+    Load a snapshot if it was built from the current contents of the source CSV with the
+    given schema version.
+
+    The CSV is only hashed when its size or modification time differ from those recorded
+    in the sidecar. Feather snapshots are memory-mapped.
+
+    Returns:
+    - pd.DataFrame: The snapshot data, or None if it is missing, stale or unreadable.
+    """
+    try:
+        with open(snapshot_meta_path(snapshot_path)) as f:
+            meta = json.load(f)
+        if meta.get('schema') != schema:
+            logger.info(f"Snapshot {snapshot_path} was built with a different schema.")
+            return None
+        source_stat = os.stat(source_path)
+        unchanged = (meta.get('source_size') == source_stat.st_size
+                     and meta.get('source_mtime_ns') == source_stat.st_mtime_ns)
+        if not unchanged and meta.get('source_sha256') != file_sha256(source_path):
+            logger.info(f"Snapshot {snapshot_path} is stale; {source_path} has changed.")
+            return None
+
+        if meta.get('format') == 'feather':
+            if feather is None:
+                logger.warning(f"Snapshot {snapshot_path} needs pyarrow, which is not installed.")
+                return None
+            table = feather.read_table(snapshot_path, memory_map=True)
+            return table.to_pandas(split_blocks=True, self_destruct=True)
+        with open(snapshot_path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not read snapshot {snapshot_path}: {e}")
+        return None
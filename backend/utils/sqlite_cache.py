@@ -0,0 +1,164 @@
+# backend/utils/sqlite_cache.py
+
+import os
+import time
+import zlib
+import pickle
+import logging
+import sqlite3
+import threading
+
+from flask_caching.backends.base import BaseCache
+
+logger = logging.getLogger(__name__)
+
+class SQLiteCache(BaseCache):
+    """
+    Flask-Caching backend storing entries in a local SQLite file.
+
+    Every gunicorn worker on a host opens the same file, so an OpenAI completion paid for by
+    one worker is reused by all of them and survives restarts and deploys. Values are pickled
+    and zlib-compressed, entries expire after their timeout, and once the stored size exceeds
+    max_size_bytes the least recently used entries are evicted.
+    """
+    def __init__(self, path='cache/cache.sqlite3', default_timeout=300, max_size_bytes=256 * 1024 * 1024,
+                 compression_level=6, prune_interval=100, touch_interval=60):
+        super().__init__(default_timeout=default_timeout)
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.compression_level = compression_level
+        self.prune_interval = prune_interval
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        self._sets_since_prune = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " size INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache (accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at)")
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(dict(
+            path=config.get('CACHE_SQLITE_PATH', 'cache/cache.sqlite3'),
+            max_size_bytes=config.get('CACHE_MAX_SIZE_BYTES', 256 * 1024 * 1024),
+            compression_level=config.get('CACHE_COMPRESSION_LEVEL', 6),
+        ))
+        return cls(*args, **kwargs)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and per process; connections must not cross a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _expires_at(self, timeout) -> float:
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else 0
+
+    def _dumps(self, value) -> bytes:
+        return zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self.compression_level)
+
+    def _loads(self, blob: bytes):
+        return pickle.loads(zlib.decompress(blob))
+
+    def get(self, key):
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, expires_at, accessed_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at, accessed_at = row
+            now = time.time()
+            if expires_at and expires_at <= now:
+                conn.execute("DELETE FROM cache WHERE key = ? AND expires_at = ?", (key, expires_at))
+                return None
+            # Recency is tracked coarsely to avoid a write on every read
+            if now - accessed_at > self.touch_interval:
+                conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return self._loads(value)
+        except Exception as e:
+            logger.warning(f"SQLiteCache get failed for {key!r}: {e}")
+            return None
+
+    def set(self, key, value, timeout=None):
+        try:
+            blob = self._dumps(value)
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, self._expires_at(timeout), time.time(), len(blob) + len(key))
+            )
+            self._sets_since_prune += 1
+            if self._sets_since_prune >= self.prune_interval:
+                self._sets_since_prune = 0
+                self._prune()
+            return True
+        except Exception as e:
+            logger.warning(f"SQLiteCache set failed for {key!r}: {e}")
+            return False
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def delete(self, key):
+        try:
+            cursor = self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+            return cursor.rowcount > 0
+        except Exception as e:
+            logger.warning(f"SQLiteCache delete failed for {key!r}: {e}")
+            return False
+
+    def has(self, key):
+        try:
+            row = self._connection().execute(
+                "SELECT expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            return row is not None and (not row[0] or row[0] > time.time())
+        except Exception as e:
+            logger.warning(f"SQLiteCache has failed for {key!r}: {e}")
+            return False
+
+    def clear(self):
+        try:
+            self._connection().execute("DELETE FROM cache")
+            return True
+        except Exception as e:
+            logger.warning(f"SQLiteCache clear failed: {e}")
+            return False
+
+    def _prune(self):
+        """
+        Drop expired entries, then evict least recently used entries until the cache fits
+        within max_size_bytes.
+        """
+        conn = self._connection()
+        conn.execute("DELETE FROM cache WHERE expires_at > 0 AND expires_at <= ?", (time.time(),))
+        total_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+        cursor = conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            " SELECT key FROM ("
+            "  SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running_size FROM cache"
+            " ) WHERE running_size > ?)",
+            (self.max_size_bytes,)
+        )
+        logger.info(f"SQLiteCache evicted {cursor.rowcount} entries ({total_size} bytes over limit {self.max_size_bytes}).")
@@ -0,0 +1,45 @@
+# backend/utils/token_usage.py
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class TokenUsage:
+    """
+    Thread-safe per-call-type counters of the tokens reported by the OpenAI API.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.totals = {}
+
+    def record(self, label: str, response):
+        """
+        Add the 'usage' block of an OpenAI response to the counters for label.
+        """
+        usage = response.get('usage') if hasattr(response, 'get') else None
+        if not usage:
+            return
+        prompt_tokens = int(usage.get('prompt_tokens', 0))
+        completion_tokens = int(usage.get('completion_tokens', 0))
+        logger.debug(f"{label}: {prompt_tokens} prompt + {completion_tokens} completion tokens")
+        with self.lock:
+            totals = self.totals.setdefault(label, {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+            totals['calls'] += 1
+            totals['prompt_tokens'] += prompt_tokens
+            totals['completion_tokens'] += completion_tokens
+
+    def stats(self) -> dict:
+        """
+        Returns:
+        - dict: Per label, the call count, token totals and average tokens per call.
+        """
+        with self.lock:
+            return {
+                label: dict(
+                    totals,
+                    prompt_tokens_per_call=round(totals['prompt_tokens'] / totals['calls'], 1),
+                    completion_tokens_per_call=round(totals['completion_tokens'] / totals['calls'], 1),
+                )
+                for label, totals in self.totals.items()
+            }
@@ -0,0 +1,64 @@
+# backend/utils/trait_cache.py
+
+import json
+import hashlib
+import threading
+
+from .search_cache import normalize_query
+
+def record_fingerprint(record: dict, columns: list) -> str:
+    """
+    Stable hash of the fields of a record that a trait verdict depends on.
+    """
+    payload = json.dumps([record.get(col) for col in columns], default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+class TraitCache:
+    """
+    Content-addressed cache of trait verdicts.
+
+    Keys combine the listing id, a hash of the listing fields sent to the model, and the
+    trait normalized like a search query ('Has a pool.' and 'has a  pool' share an entry), so
+    two listings never share a verdict and a listing whose details change is re-evaluated.
+    Hit and miss counts are kept per process.
+    """
+    def __init__(self, cache, columns: list, id_column: str = 'id', prefix: str = 'trait', timeout: int = None):
+        self.cache = cache
+        self.columns = columns
+        self.id_column = id_column
+        self.prefix = prefix
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def key(self, record: dict, trait: str) -> str:
+        trait_hash = hashlib.sha1(normalize_query(trait).encode('utf-8')).hexdigest()[:16]
+        return f"{self.prefix}:{record.get(self.id_column, '')}:{record_fingerprint(record, self.columns)}:{trait_hash}"
+
+    def get(self, record: dict, trait: str, count: bool = True):
+        """
+        Return the cached verdict or None. With count=False the lookup is left out of the hit
+        and miss counts, for a repeated lookup of a pair that was already counted.
+        """
+        verdict = self.cache.get(self.key(record, trait))
+        if not count:
+            return verdict
+        with self.lock:
+            if verdict is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return verdict
+
+    def set(self, record: dict, trait: str, verdict: str):
+        self.cache.set(self.key(record, trait), verdict, timeout=self.timeout)
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
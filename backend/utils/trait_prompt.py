@@ -0,0 +1,169 @@
+# backend/utils/trait_prompt.py
+
+import re
+
+import pandas as pd
+
+from .query_parser import match_city
+
+# Words in a trait that make a listing column relevant to it. 'neighborhood_desc' is sent
+# whenever a trait has words these columns do not explain, since free-text descriptions can
+# mention almost any feature.
+TRAIT_COLUMN_HINTS = {
+    'price': ['price', 'cost', 'budget', 'afford', 'cheap', 'expensive', 'luxury', 'under', 'over',
+              'below', 'above', 'between', 'million', '$'],
+    'beds': ['bed', 'bedroom', 'br', 'bd'],
+    'baths': ['bath', 'bathroom', 'ba'],
+    'area': ['sqft', 'square', 'area', 'size', 'spacious', 'large', 'big', 'small', 'compact'],
+    'listing_agent': ['agent'],
+    'year_built': ['built', 'year', 'new', 'newer', 'old', 'older', 'historic', 'modern', 'construction'],
+    'property_tax': ['tax', 'taxes'],
+    'school_ratings': ['school', 'schools', 'education', 'rated', 'rating'],
+    'broker': ['broker', 'brokerage', 'realty'],
+    'city': ['located', 'near', 'city', 'downtown', 'neighborhood'],
+    'state': ['state'],
+    'zip_code': ['zip', 'zipcode', 'postal'],
+    'hoa_fees': ['hoa', 'association', 'fees', 'fee'],
+}
+
+# Words that carry no feature of their own in a trait
+TRAIT_FILLER_WORDS = {
+    'is', 'are', 'has', 'have', 'a', 'an', 'the', 'in', 'with', 'of', 'and', 'or', 'at', 'to',
+    'for', 'least', 'more', 'than', 'less', 'no', 'k', 'm', 'beds', 'baths', 'bedrooms', 'bathrooms',
+}
+
+# Cities sent with a compact prompt when the trait names a place, the named cities first
+MAX_CANDIDATE_CITIES = 5
+
+# Leading zip code digits two cities must share to count as nearby (the postal sectional center)
+NEARBY_ZIP_PREFIX_LENGTH = 3
+
+COMPACT_TRAIT_INSTRUCTIONS = (
+    "You evaluate whether a real estate property satisfies a trait. "
+    "Answer with exactly one word: 'yes' if the property details clearly satisfy the trait, "
+    "'no' if they clearly do not, or 'unsure' if the details are insufficient or only partially match. "
+    "Map partial or misspelled city names to the closest candidate city, e.g. 'Redwood' is 'Redwood City'. "
+    "Candidate cities list the cities the trait names followed by cities near them: a property in a nearby city "
+    "satisfies 'near <city>' but not 'in <city>'.\n\n"
+    "Property: Price: 850000; Neighborhood Desc: Spacious backyard with a swimming pool.\n"
+    "Trait: Has a swimming pool.\n"
+    "Answer: yes\n\n"
+    "Property: City: Redwood; Neighborhood Desc: Beautiful garden.\n"
+    "Candidate Cities: Redwood City\n"
+    "Trait: Located in Redwood City.\n"
+    "Answer: yes\n\n"
+    "Property: City: San Carlos; Neighborhood Desc: Quiet cul-de-sac.\n"
+    "Candidate Cities: Redwood City, San Carlos\n"
+    "Trait: Near Redwood City.\n"
+    "Answer: yes\n\n"
+    "Property: Neighborhood Desc: Modern kitchen appliances.\n"
+    "Trait: Has a fireplace.\n"
+    "Answer: unsure"
+)
+
+COMPACT_TRAIT_BATCH_INSTRUCTIONS = (
+    "You evaluate whether real estate properties satisfy a list of traits. "
+    "For every property and trait answer 'yes' if the property details clearly satisfy the trait, "
+    "'no' if they clearly do not, or 'unsure' if the details are insufficient or only partially match. "
+    "Map partial or misspelled city names to the closest candidate city, e.g. 'Redwood' is 'Redwood City'. "
+    "Candidate cities list the cities the traits name followed by cities near them: a property in a nearby city "
+    "satisfies 'near <city>' but not 'in <city>'. "
+    "Answer with exactly one line per property, in the format 'P<number>: <verdict for T1>, <verdict for T2>, ...', "
+    "and no other text.\n\n"
+    "Traits:\nT1: Has a swimming pool.\nT2: Located in Irvine.\n"
+    "Properties:\nP1: City: Tustin; Neighborhood Desc: Pool and spa.\nP2: City: Irvine; Neighborhood Desc: Quiet street.\n"
+    "Answer:\nP1: yes, no\nP2: unsure, yes"
+)
+
+def match_trait_cities(trait: str, cities: list, limit: int = MAX_CANDIDATE_CITIES) -> tuple:
+    """
+    Find the known cities a trait refers to, exactly or approximately.
+
+    Returns:
+    - tuple: (list of matched cities, list of the trait's words that did not name a city)
+    """
+    words = re.findall(r'[a-z]+|\$', trait.lower())
+    matched = []
+    while len(matched) < limit:
+        city, start, size = match_city(words, cities)
+        if not city:
+            break
+        matched.append(city)
+        words = words[:start] + words[start + size:]
+    return matched, words
+
+def nearby_city_index(df: pd.DataFrame, prefix_length: int = NEARBY_ZIP_PREFIX_LENGTH) -> dict:
+    """
+    Map each city to the other cities in the same state that share a zip code prefix with it,
+    the ones with the most listings in the shared prefixes first.
+
+    Parameters:
+    - df (pd.DataFrame): Listings with 'city', 'state' and 'zip_code' columns.
+    - prefix_length (int): Leading zip code digits compared.
+
+    Returns:
+    - dict: City to list of nearby cities; cities without neighbours are left out.
+    """
+    if not {'city', 'state', 'zip_code'}.issubset(df.columns):
+        return {}
+    areas = pd.DataFrame({
+        'city': df['city'].astype(object),
+        'area': df['state'].astype(str) + ':' + df['zip_code'].astype(str).str.strip().str[:prefix_length],
+    }).dropna()
+    counts = areas.groupby(['area', 'city']).size()
+    nearby = {}
+    for area, area_counts in counts.groupby(level='area'):
+        ranked = area_counts.droplevel('area').sort_values(ascending=False, kind='stable')
+        for city in ranked.index:
+            neighbours = nearby.setdefault(city, {})
+            for other, count in ranked.items():
+                if other != city:
+                    neighbours[other] = neighbours.get(other, 0) + count
+    return {
+        city: sorted(neighbours, key=lambda other: (-neighbours[other], other))
+        for city, neighbours in nearby.items() if neighbours
+    }
+
+def compact_prompt_context(traits: list, columns: list, cities: list, nearby: dict = None) -> tuple:
+    """
+    Pick the listing columns and cities a compact prompt needs for the given traits.
+
+    Parameters:
+    - traits (list): Traits being evaluated.
+    - columns (list): All columns that may be sent, in display order.
+    - cities (list): Cities present in the listings data.
+    - nearby (dict): City to nearby cities, from nearby_city_index.
+
+    Returns:
+    - tuple: (relevant columns in the order of columns, cities the traits refer to followed
+      by the cities near them).
+    """
+    candidates, words = [], set()
+    for trait in traits:
+        trait_cities, trait_words = match_trait_cities(trait, cities)
+        candidates += [city for city in trait_cities if city not in candidates]
+        words.update(trait_words)
+    for city in list(candidates):
+        candidates += [other for other in (nearby or {}).get(city, []) if other not in candidates]
+    has_number = any(re.search(r'\d', trait) for trait in traits)
+    structural_words = set(TRAIT_FILLER_WORDS).union(*TRAIT_COLUMN_HINTS.values())
+
+    selected = []
+    for column in columns:
+        hints = TRAIT_COLUMN_HINTS.get(column)
+        if hints is None:
+            # Free-text columns only help with words the structured columns cannot answer
+            if words - structural_words:
+                selected.append(column)
+        elif words.intersection(hints):
+            selected.append(column)
+        elif candidates and column in ('city', 'state'):
+            selected.append(column)
+        elif column == 'price' and has_number and not words.intersection(['bed', 'bath', 'year', 'built']):
+            selected.append(column)
+    return selected, candidates[:MAX_CANDIDATE_CITIES]
+
+def format_compact_details(property_record: dict, columns: list) -> str:
+    return "; ".join(
+        f"{col.replace('_', ' ').title()}: {property_record.get(col, 'N/A')}" for col in columns
+    )
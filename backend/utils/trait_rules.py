@@ -0,0 +1,107 @@
+# backend/utils/trait_rules.py
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from .search_cache import normalize_query
+from .query_parser import (
+    BEDS_RE, BATHS_RE, PRICE_BETWEEN_RE, PRICE_MAX_RE, PRICE_MIN_RE, FILLER_WORDS,
+    parse_amount, match_city
+)
+
+# Words that may remain in a structural trait once its constraints are removed
+TRAIT_RULE_FILLER_WORDS = FILLER_WORDS | {'or', 'either', 'both', 'than', 'located', 'it', 'its'}
+
+def parse_trait_rule(trait: str, cities: list) -> dict:
+    """
+    Parse a trait that the structured columns decide exactly, such as 'is in San Francisco',
+    'has 3 bed, 2 bath', 'has 2+ bed' or 'is under $1,595,000'.
+
+    Parameters:
+    - trait (str): The trait text.
+    - cities (list): Cities present in the listings data.
+
+    Returns:
+    - dict: Constraints keyed by 'cities', 'beds', 'baths', 'price_min' and 'price_max', or
+      None if the trait mentions anything the columns cannot answer.
+    """
+    text = normalize_query(trait)
+    text = re.sub(r'[^\w$.+\- ]', ' ', text)
+    rule = {}
+
+    for key, pattern in (('beds', BEDS_RE), ('baths', BATHS_RE)):
+        matches = list(pattern.finditer(text))
+        if len(matches) > 1:
+            return None
+        if matches:
+            count, at_least = matches[0].groups()
+            rule[key] = (float(count), bool(at_least))
+            text = text[:matches[0].start()] + ' ' + text[matches[0].end():]
+
+    price_patterns = (('price_between', PRICE_BETWEEN_RE), ('price_max', PRICE_MAX_RE), ('price_min', PRICE_MIN_RE))
+    for key, pattern in price_patterns:
+        match = pattern.search(text)
+        if not match:
+            continue
+        groups = match.groups()
+        if key == 'price_between':
+            low, high = parse_amount(*groups[:2]), parse_amount(*groups[2:])
+            rule['price_min'], rule['price_max'] = min(low, high), max(low, high)
+        else:
+            rule[key] = parse_amount(*groups)
+        text = text[:match.start()] + ' ' + text[match.end():]
+
+    words = [w for w in re.findall(r'[a-z0-9.$+]+', text) if w not in TRAIT_RULE_FILLER_WORDS]
+    matched_cities = []
+    while True:
+        city, start, size = match_city(words, cities)
+        if not city:
+            break
+        matched_cities.append(city)
+        words = words[:start] + words[start + size:]
+    if matched_cities:
+        rule['cities'] = matched_cities
+
+    # Anything left over (a feature, a property type, a second price) needs the model
+    if not rule or any(not re.fullmatch(r'[$.+\-]+', w) for w in words):
+        return None
+    return rule
+
+def evaluate_trait_rule(df: pd.DataFrame, rule: dict) -> np.ndarray:
+    """
+    Evaluate a parsed trait rule against every row of a DataFrame at once.
+
+    Returns:
+    - np.ndarray: 'yes' or 'no' per row, or 'unsure' where a needed value is missing.
+    """
+    satisfied = np.ones(len(df), dtype=bool)
+    missing = np.zeros(len(df), dtype=bool)
+
+    def column(name):
+        if name not in df.columns:
+            return pd.Series(np.nan, index=df.index)
+        return df[name]
+
+    if 'cities' in rule:
+        city = column('city').astype('string').str.strip().str.lower()
+        satisfied &= city.isin([c.lower() for c in rule['cities']]).fillna(False).to_numpy(dtype=bool)
+        missing |= city.isna().to_numpy()
+    for key in ('beds', 'baths'):
+        if key in rule:
+            count, at_least = rule[key]
+            values = pd.to_numeric(column(key), errors='coerce').to_numpy(dtype=float)
+            with np.errstate(invalid='ignore'):
+                satisfied &= values >= count if at_least else values == count
+            missing |= np.isnan(values)
+    if 'price_min' in rule or 'price_max' in rule:
+        values = pd.to_numeric(column('price'), errors='coerce').to_numpy(dtype=float)
+        with np.errstate(invalid='ignore'):
+            if 'price_min' in rule:
+                satisfied &= values >= rule['price_min']
+            if 'price_max' in rule:
+                satisfied &= values <= rule['price_max']
+        missing |= np.isnan(values)
+
+    return np.where(missing, 'unsure', np.where(satisfied, 'yes', 'no'))
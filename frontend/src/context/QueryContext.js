@@ -13,6 +13,10 @@ export const QueryProvider = ({ children }) => {
   const [sqlQuery, setSqlQuery] = useState('');
   const [results, setResults] = useState([]);
   const [dynamicColumns, setDynamicColumns] = useState([]);
+  // 'idle' | 'streaming' | 'done' while a streamed search is in progress
+  const [searchStatus, setSearchStatus] = useState('idle');
+  // Position of the loaded results: offset, page_size, total_results, next_page_token
+  const [page, setPage] = useState(null);
 
   // Add a state variable to trigger refresh of saved searches
   const [refreshSavedSearches, setRefreshSavedSearches] = useState(false);
@@ -31,6 +35,8 @@ export const QueryProvider = ({ children }) => {
     setSqlQuery(savedResponse.sql_query || '');
     setResults(savedResponse.result || []);
     setDynamicColumns(savedResponse.dynamic_columns || []);
+    setPage(savedResponse.page || null);
+    setSearchStatus('done');
   };
 
   return (
@@ -52,6 +58,10 @@ export const QueryProvider = ({ children }) => {
         setResults,
         dynamicColumns,
         setDynamicColumns,
+        searchStatus,
+        setSearchStatus,
+        page,
+        setPage,
         refreshSavedSearches,
         triggerRefreshSavedSearches,
         setContextFromSavedSearch,
@@ -3,7 +3,7 @@
 import React, { useContext, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { QueryContext } from '../context/QueryContext';
-import { searchProperties } from '../services/api';
+import { streamSearchProperties } from '../services/api';
 import axios from 'axios';
 
 const Home = () => {
@@ -16,6 +16,8 @@ const Home = () => {
     setSqlQuery,
     setResults,
     setDynamicColumns,
+    setSearchStatus,
+    setPage,
     triggerRefreshSavedSearches, // Import the trigger function
   } = useContext(QueryContext);
 
@@ -30,43 +32,90 @@ const Home = () => {
       return;
     }
 
+    const query = input.trim();
+
+    // Accumulate the streamed response so the search can be saved once it completes
+    const data = { query, result: [] };
+    let navigated = false;
+    let failed = false;
+
     setLoading(true);
+    setSearchStatus('streaming');
+    setQuery(query);
+    setResults([]);
+    setDynamicColumns([]);
+    setPage(null);
     try {
-      console.log(`Performing search for: "${input.trim()}"`);
-      const data = await searchProperties(input.trim());
+      console.log(`Performing streamed search for: "${query}"`);
+      await streamSearchProperties(query, (event, payload) => {
+        switch (event) {
+          case 'intent':
+            data.user_intent = payload.user_intent;
+            setUserIntent(payload.user_intent);
+            // Show the extracted information as soon as the first stage is ready
+            if (!navigated) {
+              navigated = true;
+              navigate('/information');
+            }
+            break;
+          case 'traits':
+            data.traits = payload.traits;
+            data.dynamic_columns = payload.dynamic_columns;
+            setTraits(payload.traits);
+            setDynamicColumns(payload.dynamic_columns);
+            break;
+          case 'key_phrases':
+            data.key_phrases = payload.key_phrases;
+            setKeyPhrases(payload.key_phrases);
+            break;
+          case 'sql':
+            data.sql_query = payload.sql_query;
+            setSqlQuery(payload.sql_query);
+            break;
+          case 'property_keywords':
+            data.property_keywords = payload.property_keywords;
+            setPropertyKeywords(payload.property_keywords);
+            break;
+          case 'rows':
+            data.result = payload.result;
+            setResults(payload.result);
+            break;
+          case 'page':
+            data.page = payload;
+            setPage(payload);
+            break;
+          case 'trait_row':
+            // Fill in the trait dots of one property as soon as they resolve
+            data.result[payload.index] = { ...data.result[payload.index], ...payload.values };
+            setResults((prev) => {
+              const next = [...prev];
+              next[payload.index] = { ...next[payload.index], ...payload.values };
+              return next;
+            });
+            break;
+          case 'done':
+            data.timings = payload.timings;
+            break;
+          case 'error':
+            failed = true;
+            alert(payload.error);
+            break;
+          default:
+            break;
+        }
+      });
 
-      if (data.error) {
-        alert(data.error);
-        setLoading(false);
+      if (failed) {
         return;
       }
 
-      // Update context with the received data
-      setQuery(data.query);
-      setUserIntent(data.user_intent);
-      setTraits(data.traits);
-      setKeyPhrases(data.key_phrases);
-      setPropertyKeywords(data.property_keywords);
-      setSqlQuery(data.sql_query);
-      setResults(data.result);
-      setDynamicColumns(data.dynamic_columns); // Set dynamic columns
-
-      console.log('Context Updated:', {
-        query: data.query,
-        userIntent: data.user_intent,
-        traits: data.traits,
-        keyPhrases: data.key_phrases,
-        propertyKeywords: data.property_keywords,
-        sqlQuery: data.sql_query,
-        results: data.result,
-        dynamicColumns: data.dynamic_columns,
-      });
+      console.log('Search Completed:', data);
 
       // Save the search and its response to the backend
       try {
-        console.log(`Saving search: "${input.trim()}"`);
+        console.log(`Saving search: "${query}"`);
         const saveResponse = await axios.post('/api/save_search', {
-          search: input.trim(),
+          search: query,
           response: data, // Send the entire response object
         });
         if (saveResponse.data && saveResponse.data.message) {
@@ -78,13 +127,11 @@ const Home = () => {
         console.error('Error saving search:', saveError);
         // Optionally, alert the user or handle silently
       }
-
-      // Navigate to the Information page after successful search
-      navigate('/information');
     } catch (error) {
       console.error('Error fetching results:', error);
-      alert('Failed to fetch results. Please try again.');
+      alert(error.error || 'Failed to fetch results. Please try again.');
     } finally {
+      setSearchStatus('done');
       setLoading(false);
     }
   };
@@ -5,17 +5,22 @@ import './Results.css'; // Ensure this imports your CSS file
 import { useNavigate } from 'react-router-dom';
 import { QueryContext } from '../context/QueryContext';
 import InformationContent from '../components/InformationContent';
+import { searchProperties } from '../services/api';
 
 const Results = () => {
   const navigate = useNavigate();
-  const { results, dynamicColumns } = useContext(QueryContext);
+  const { query, results, setResults, dynamicColumns, searchStatus, page, setPage } = useContext(QueryContext);
+  const streaming = searchStatus === 'streaming';
   const [showThinking, setShowThinking] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   console.log('Results Data:', { results, dynamicColumns });
 
   // If results are still loading
   if (results.length === 0) {
-    return <div className="results-container">No Results Found...</div>;
+    return (
+      <div className="results-container">{streaming ? 'Searching...' : 'No Results Found...'}</div>
+    );
   }
 
   // Handler for viewing brokers
@@ -23,6 +28,21 @@ const Results = () => {
     navigate(`/broker-details?zip_code=${zipCode}`);
   };
 
+  // Handler for fetching the next page of results; its trait dots are evaluated on demand
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await searchProperties(query, { page_token: page.next_page_token });
+      setResults((prev) => [...prev, ...(data.result || [])]);
+      setPage(data.page || null);
+    } catch (error) {
+      console.error('Error loading more results:', error);
+      alert(error.error || 'Failed to load more results. Please try again.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Handler for receiving realtor proposal (Placeholder)
   const handleRealtorProposal = () => {
     alert('Realtor proposal has been sent!');
@@ -87,7 +107,8 @@ const Results = () => {
                       {property[col] === '🟢' && <span title="Yes">🟢</span>}
                       {property[col] === '🟡' && <span title="Unsure">🟡</span>}
                       {property[col] === '⚪' && <span title="No">⚪</span>}
-                      {!['🟢', '🟡', '⚪'].includes(property[col]) && 'N/A'}
+                      {!['🟢', '🟡', '⚪'].includes(property[col]) &&
+                        (streaming ? <span title="Evaluating">⏳</span> : 'N/A')}
                     </td>
                   ))}
 
@@ -120,6 +141,18 @@ const Results = () => {
             </tbody>
           </table>
 
+          {/* Pagination */}
+          {page && page.total_results != null && (
+            <p className="mt-2">
+              Showing {results.length} of {page.total_results} properties
+            </p>
+          )}
+          {page && page.next_page_token && !streaming && (
+            <button onClick={handleLoadMore} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          )}
+
           {/* Download Button */}
           <button
             onClick={() => {
@@ -6,9 +6,10 @@ import axios from 'axios';
 const API_BASE_URL = '/api';
 
 // Search API
-export const searchProperties = async (query) => {
+// options may hold 'page_size', or 'page_token' (a previous response's page.next_page_token)
+export const searchProperties = async (query, options = {}) => {
   try {
-    const response = await axios.post(`${API_BASE_URL}/search`, { query });
+    const response = await axios.post(`${API_BASE_URL}/search`, { query, ...options });
     return response.data;
   } catch (error) {
     console.error('Error in searchProperties:', error);
@@ -16,6 +17,47 @@ export const searchProperties = async (query) => {
   }
 };
 
+// Streaming Search API (Server-Sent Events over a POST request)
+// Calls onEvent(eventName, data) for every event until 'done' or 'error'.
+export const streamSearchProperties = async (query, onEvent) => {
+  const response = await fetch(`${API_BASE_URL}/search/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify({ query }),
+  });
+
+  if (!response.ok || !response.body) {
+    const error = await response.json().catch(() => ({ error: 'Network Error' }));
+    throw error;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let eventName = 'message';
+      let data = '';
+      rawEvent.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) eventName = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      });
+      onEvent(eventName, data ? JSON.parse(data) : {});
+    }
+  }
+};
+
 // Get Broker Details API
 export const getBrokerDetails = async (zipCode) => {
   try {